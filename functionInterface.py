@@ -6,21 +6,32 @@ import threading
 import traceback
 import importlib
 import hashlib
-from typing import Any, Dict, List, Optional, Tuple
+import shutil
+import functools
+import queue
+import base64
+import binascii
+import io
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from pathlib import Path
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
 
 # Protocol buffers compatibility fix
 os.environ["PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION"] = "python"
 
 import cv2
 import yaml
+import urllib3
 import numpy as np
 import tensorflow as tf
+from PIL import Image
 from minio import Minio
 from minio.error import S3Error
 
 from src.idImage.retinaface_detector.retinaface_detection import RetinaFaceDetectionONNX
-from src.idOCR.rapidocr_onnx.rapidocr_onxx import RapidOCRONNX
+from src.idOCR.rapidocr_onnx.rapidocr_onxx import RapidOCRONNX, load_rapidocr_config, split_ocr_results
+from src.ort_session import get_session_config
 
 # Configure logging
 logging.basicConfig(
@@ -55,16 +66,36 @@ class ImageProcessingError(IDProcessorError):
     pass
 
 
+class UploadRejectedError(ImageProcessingError):
+    """Raised when an upload fails the size, dimension or format limits before decoding."""
+
+    def __init__(self, message: str, reason: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+class ModelNotReadyError(IDProcessorError):
+    """Models still loading when a request arrives."""
+    pass
+
+
+class EnginePoolExhaustedError(ModelNotReadyError):
+    """No free engine instance within the checkout timeout."""
+    pass
+
+
 class MinIOModelDownloader:
     """Simple MinIO downloader for models directory with OPCO-specific configuration."""
     
-    def __init__(self, opco_config: Dict[str, Any], opco: str):
+    def __init__(self, opco_config: Dict[str, Any], opco: str, models_root: Path = Path('.')):
         """Initialize MinIO client with OPCO-specific configuration."""
         self.opco = opco
         self.opco_config = opco_config
         self.minio_config = opco_config.get('minio_config', {})
         self.client = None
-        self.models_dir = Path('./models')
+        self.models_root = models_root
+        self.models_dir = models_root / 'models'
+        self.remote_manifests = {}
         
         # Expected model subdirectories
         self.expected_model_dirs = ['idImage', 'idUpright', 'idType', 'idOCR']
@@ -128,8 +159,8 @@ class MinIOModelDownloader:
                     continue
                 
                 # Convert MinIO path to local path
-                # models/idImage/file.txt -> ./models/idImage/file.txt
-                local_path = Path('.') / obj.object_name
+                # models/idImage/file.txt -> <models_root>/models/idImage/file.txt
+                local_path = self.models_root / obj.object_name
                 
                 try:
                     # Create parent directories
@@ -163,6 +194,50 @@ class MinIOModelDownloader:
             logger.error(f"Failed to download models directory for {self.opco}: {str(e)}")
             return False
     
+    def sync_model_directory(self, local_dir: Path) -> bool:
+        """Download a model directory again if its objects changed in MinIO.
+
+        The first call only records the remote ETags as the baseline. Changed
+        objects are downloaded into a staging directory which then replaces the
+        local one, so a model is never loaded from a half-written tree.
+        """
+        prefix = local_dir.relative_to(self.models_root).as_posix().rstrip('/') + '/'
+        bucket = self.minio_config['minio_bucket_name']
+
+        objects = [
+            obj for obj in self.client.list_objects(bucket, prefix=prefix, recursive=True)
+            if not obj.object_name.endswith('/')
+        ]
+        manifest = {obj.object_name: obj.etag for obj in objects}
+
+        previous = self.remote_manifests.get(prefix)
+        self.remote_manifests[prefix] = manifest
+        if previous is None or previous == manifest:
+            return False
+
+        logger.info(f"New model version in MinIO for {self.opco}: {prefix}")
+        staging_dir = local_dir.with_name(local_dir.name + '.staging')
+        old_dir = local_dir.with_name(local_dir.name + '.old')
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+        try:
+            for obj in objects:
+                local_path = staging_dir / Path(obj.object_name).relative_to(prefix)
+                local_path.parent.mkdir(parents=True, exist_ok=True)
+                self.client.fget_object(bucket, obj.object_name, str(local_path))
+        except Exception as e:
+            # Forget the manifest so the next poll retries the download
+            self.remote_manifests[prefix] = previous
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise ModelDownloadError(f"Failed to download {prefix} for {self.opco}: {str(e)}")
+
+        shutil.rmtree(old_dir, ignore_errors=True)
+        if local_dir.exists():
+            local_dir.rename(old_dir)
+        staging_dir.rename(local_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+        return True
+
     def ensure_models_directory(self) -> bool:
         """Ensure models directory exists, download if necessary."""
         if self._models_directory_exists():
@@ -173,6 +248,87 @@ class MinIOModelDownloader:
         return self._download_models_directory()
 
 
+OBJECT_URI_SCHEMES = ('s3://', 'minio://')
+
+
+def is_object_uri(image_source: Any) -> bool:
+    """Whether an image input names an object in the object store."""
+    return isinstance(image_source, str) and image_source.startswith(OBJECT_URI_SCHEMES)
+
+
+def parse_object_uri(uri: str) -> Tuple[str, str]:
+    """Split s3://bucket/key (or minio://bucket/key) into bucket and key."""
+    bucket, _, key = uri.split('://', 1)[1].partition('/')
+    if not bucket or not key:
+        raise ImageProcessingError(f"Invalid object URI: {uri}")
+    return bucket, key
+
+
+class MinIOImageReader:
+    """Reads input images from an S3-compatible object store over one pooled keep-alive client."""
+
+    def __init__(self, store_config: Dict[str, Any]):
+        """Initialize the pooled client and the prefetch workers."""
+        self.store_config = store_config
+        # Environment override so a local MinIO stand-in can be used without editing config.yaml
+        self.endpoint = os.environ.get('object_store_endpoint') or store_config.get('endpoint')
+        if not self.endpoint:
+            raise ConfigurationError("Object store endpoint is not configured")
+
+        pool_size = int(store_config.get('max_connections', 10))
+        http_client = urllib3.PoolManager(
+            maxsize=pool_size,
+            block=False,
+            timeout=urllib3.Timeout(
+                connect=float(store_config.get('connect_timeout', 5)),
+                read=float(store_config.get('read_timeout', 30))
+            ),
+            retries=urllib3.Retry(
+                total=int(store_config.get('retries', 3)),
+                backoff_factor=0.2,
+                status_forcelist=[500, 502, 503, 504]
+            )
+        )
+        self.client = Minio(
+            self.endpoint,
+            access_key=store_config.get('access_key'),
+            secret_key=store_config.get('secret_key'),
+            secure=store_config.get('secure', False),
+            # A fixed region skips the bucket-location lookup before every first read
+            region=store_config.get('region', 'us-east-1'),
+            http_client=http_client
+        )
+        self.prefetch_executor = ThreadPoolExecutor(
+            max_workers=pool_size, thread_name_prefix="id-image-fetch"
+        )
+        logger.info(f"Object store image reader initialized for endpoint: {self.endpoint}")
+
+    def read(self, uri: str, max_bytes: Optional[int] = None) -> bytes:
+        """Fetch an object's bytes into memory; the connection goes back to the pool.
+
+        An object larger than max_bytes is rejected from its Content-Length, before the body is read.
+        """
+        bucket, key = parse_object_uri(uri)
+        response = None
+        try:
+            response = self.client.get_object(bucket, key)
+            if response.headers.get('Content-Length'):
+                check_file_size(int(response.headers['Content-Length']), max_bytes)
+            return response.read()
+        except S3Error as e:
+            raise ImageProcessingError(f"Failed to read image {uri}: {str(e)}")
+        except urllib3.exceptions.HTTPError as e:
+            raise ImageProcessingError(f"Object store unreachable for {uri}: {str(e)}")
+        finally:
+            if response is not None:
+                response.close()
+                response.release_conn()
+
+    def prefetch(self, uri: str, max_bytes: Optional[int] = None) -> Future:
+        """Start fetching an object in the background."""
+        return self.prefetch_executor.submit(self.read, uri, max_bytes)
+
+
 def load_config(config_path: str = './config.yaml') -> dict:
     """Load configuration file with error handling."""
     try:
@@ -194,6 +350,69 @@ def load_config(config_path: str = './config.yaml') -> dict:
         raise ConfigurationError(f"Failed to load configuration: {str(e)}")
 
 
+def parse_cpu_set(cpu_set: str) -> List[int]:
+    """Parse a CPU list such as "0-3,6" into core ids."""
+    cpus = []
+    for part in str(cpu_set).split(','):
+        part = part.strip()
+        if '-' in part:
+            start, end = part.split('-')
+            cpus.extend(range(int(start), int(end) + 1))
+        elif part:
+            cpus.append(int(part))
+    return cpus
+
+
+def apply_cpu_budget(budget_cfg: Dict[str, Any]) -> Dict[str, Any]:
+    """Split this worker's cores between TensorFlow, ONNX Runtime and OpenCV.
+
+    Must run before TensorFlow executes its first op, otherwise its thread
+    pools are already sized and the TensorFlow part is reported as not applied.
+    """
+    allocation = {"enabled": bool(budget_cfg.get('enabled', False))}
+    if not allocation["enabled"]:
+        return allocation
+
+    # Optionally pin this worker to its own CPU set
+    cpu_sets = budget_cfg.get('cpu_sets') or []
+    if cpu_sets and hasattr(os, 'sched_setaffinity'):
+        worker_index = int(os.environ.get('worker_index', 0))
+        cpus = parse_cpu_set(cpu_sets[worker_index % len(cpu_sets)])
+        os.sched_setaffinity(0, cpus)
+        allocation["cpu_set"] = cpus
+
+    available = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+    cores = int(budget_cfg.get('total_cores') or available)
+    allocation["cores"] = cores
+
+    tf_cfg = budget_cfg.get('tensorflow') or {}
+    tf_threads = {
+        "intra_op_threads": max(1, int(cores * float(tf_cfg.get('share', 0.5)))),
+        "inter_op_threads": int(tf_cfg.get('inter_op_threads', 1)),
+    }
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(tf_threads["intra_op_threads"])
+        tf.config.threading.set_inter_op_parallelism_threads(tf_threads["inter_op_threads"])
+        tf_threads["applied"] = True
+    except RuntimeError as e:
+        logger.warning(f"TensorFlow thread pools already initialized, budget not applied: {str(e)}")
+        tf_threads["applied"] = False
+    allocation["tensorflow"] = tf_threads
+
+    ort_cfg = budget_cfg.get('onnxruntime') or {}
+    allocation["onnxruntime"] = {
+        "intra_op_num_threads": max(1, int(cores * float(ort_cfg.get('share', 0.5)))),
+        "inter_op_num_threads": int(ort_cfg.get('inter_op_threads', 1)),
+    }
+
+    opencv_threads = int((budget_cfg.get('opencv') or {}).get('threads', 1))
+    cv2.setNumThreads(opencv_threads)
+    allocation["opencv"] = {"threads": cv2.getNumThreads()}
+
+    logger.info(f"CPU budget applied: {allocation}")
+    return allocation
+
+
 def dynamic_import(name: str):
     """
     Dynamically import a modules with enhanced error handling.
@@ -218,28 +437,194 @@ def dynamic_import(name: str):
             raise
 
 
-def validate_and_load_image(image_path: str) -> np.ndarray:
-    """Load and validate image with enhanced error handling."""
-    if not image_path:
+# A file path, encoded image bytes, a base64 string (optionally a data URI) or a decoded BGR array
+ImageSource = Union[str, bytes, bytearray, memoryview, np.ndarray]
+
+# Leading bytes of the encoded formats a base64 string is accepted as
+IMAGE_MAGIC_BYTES = (b'\xff\xd8\xff', b'\x89PNG\r\n\x1a\n', b'GIF8', b'BM', b'II*\x00', b'MM\x00*', b'RIFF')
+
+# Decode-time downscaling; JPEG uses DCT scaling, other formats are resized after decoding
+REDUCED_DECODE_FLAGS = {
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+def check_file_size(size: int, max_bytes: Optional[int]):
+    """Reject an encoded image larger than max_bytes before it is read or decoded."""
+    if max_bytes and size > max_bytes:
+        raise UploadRejectedError(
+            f"Image file too large: {size} bytes exceeds the limit of {max_bytes} bytes", 'file_size'
+        )
+
+
+def read_image_source(image_source: ImageSource, max_bytes: Optional[int] = None) -> Union[bytes, np.ndarray]:
+    """Resolve an image input to encoded bytes, or pass a decoded array through, without temp files.
+
+    Sizes are checked against max_bytes before a file is read or a base64 payload decoded.
+    """
+    if image_source is None or (not isinstance(image_source, np.ndarray) and len(image_source) == 0):
         raise ImageProcessingError("Image path is missing.")
 
-    if not Path(image_path).exists():
-        raise ImageProcessingError(f"Image file not found: {image_path}")
+    if isinstance(image_source, np.ndarray):
+        return image_source
+    if isinstance(image_source, (bytes, bytearray, memoryview)):
+        check_file_size(len(image_source), max_bytes)
+        return bytes(image_source)
+
+    if image_source.startswith('data:'):
+        payload = image_source.split(',', 1)[-1]
+        check_file_size(len(payload) * 3 // 4, max_bytes)
+        return decode_base64_image(payload)
+
+    # An existing file wins; anything else has to be a base64-encoded image
+    if is_existing_file(image_source):
+        check_file_size(Path(image_source).stat().st_size, max_bytes)
+        return Path(image_source).read_bytes()
+    check_file_size(len(image_source) * 3 // 4, max_bytes)
+    image_data = read_base64_image(image_source)
+    if image_data is None:
+        shown = image_source if len(image_source) <= 200 else f"{image_source[:200]}..."
+        raise ImageProcessingError(f"Image file not found: {shown}")
+    return image_data
+
+
+def is_existing_file(image_source: str) -> bool:
+    """Whether a string names an existing file; base64 payloads can be too long to be a path at all."""
+    try:
+        return Path(image_source).is_file()
+    except (OSError, ValueError):
+        return False
+
+
+def decode_base64_image(payload: str) -> bytes:
+    """Decode a base64 image payload."""
+    try:
+        return base64.b64decode(''.join(payload.split()), validate=True)
+    except (binascii.Error, ValueError) as e:
+        raise ImageProcessingError(f"Invalid base64 image data: {str(e)}")
+
+
+def read_base64_image(payload: str) -> Optional[bytes]:
+    """Decoded bytes of a base64 string holding an encoded image, None for anything else."""
+    try:
+        image_data = base64.b64decode(''.join(payload.split()), validate=True)
+    except (binascii.Error, ValueError):
+        return None
+    return image_data if image_data.startswith(IMAGE_MAGIC_BYTES) else None
+
+
+def read_image_header(image_data: bytes) -> Optional[Tuple[str, int, int]]:
+    """Format, width and height from the image header, without decoding any pixels."""
+    try:
+        with Image.open(io.BytesIO(image_data)) as header:
+            return header.format, header.size[0], header.size[1]
+    except Exception as e:
+        logger.debug(f"Could not read image header: {str(e)}")
+        return None
+
+
+def read_image_size(image_data: bytes) -> Optional[Tuple[int, int]]:
+    """Width and height from the image header, without decoding any pixels."""
+    header = read_image_header(image_data)
+    return header[1:] if header else None
+
+
+def choose_pixel_limit_factor(image_size: Tuple[int, int], max_pixels: int) -> Optional[int]:
+    """Smallest reduced-decode factor that brings an image under max_pixels, None when none does."""
+    width, height = image_size
+    for factor in [1] + sorted(REDUCED_DECODE_FLAGS):
+        if (width // factor) * (height // factor) <= max_pixels:
+            return factor
+    return None
+
+
+def choose_decode_factor(image_size: Optional[Tuple[int, int]], min_long_side: int, min_short_side: int) -> int:
+    """Largest reduced-decode factor that keeps the image at least as big as every stage needs."""
+    if image_size is None:
+        return 1
+    long_side, short_side = max(image_size), min(image_size)
+    for factor in sorted(REDUCED_DECODE_FLAGS, reverse=True):
+        if long_side // factor >= min_long_side and short_side // factor >= min_short_side:
+            return factor
+    return 1
+
 
-    image = cv2.imread(image_path)
+def decode_image(image_data: Union[bytes, np.ndarray], reduce_factor: int = 1) -> np.ndarray:
+    """Decode encoded bytes, or validate a decoded array, into a 3-channel BGR image.
+
+    Arrays are always copied: the result is cached, and the caller may reuse its array.
+    """
+    if isinstance(image_data, np.ndarray):
+        if image_data.dtype != np.uint8 or image_data.ndim not in (2, 3) or image_data.size == 0:
+            raise ImageProcessingError(
+                f"Unsupported image array: dtype={image_data.dtype}, shape={image_data.shape}"
+            )
+        if image_data.ndim == 2:
+            return cv2.cvtColor(image_data, cv2.COLOR_GRAY2BGR)
+        if image_data.shape[2] == 4:
+            return cv2.cvtColor(image_data, cv2.COLOR_BGRA2BGR)
+        if image_data.shape[2] != 3:
+            raise ImageProcessingError(f"Unsupported number of channels: {image_data.shape[2]}")
+        return image_data.copy()
+
+    flags = REDUCED_DECODE_FLAGS.get(reduce_factor, cv2.IMREAD_COLOR)
+    image = cv2.imdecode(np.frombuffer(image_data, dtype=np.uint8), flags)
     if image is None:
-        raise ImageProcessingError(f"Failed to load image from path: {image_path}")
+        raise ImageProcessingError("Failed to decode image data")
+    return image
 
-    logger.debug(f"Successfully loaded image: {image_path}")
+
+def validate_and_load_image(image_source: ImageSource) -> np.ndarray:
+    """Load and validate image from a path, encoded bytes, base64 or an array."""
+    image = decode_image(read_image_source(image_source))
+    logger.debug(f"Successfully loaded image: {image.shape}")
     return image
 
 
-def preprocess_image(image: np.ndarray, img_size: int, normalize: bool = True) -> np.ndarray:
-    """Preprocess image for model input with validation and optional normalization."""
+_input_buffers = threading.local()
+
+
+def get_input_buffer(shape: Tuple[int, ...], dtype: Any) -> np.ndarray:
+    """Reusable per-thread model input buffer of a given shape and dtype.
+
+    The contents are only valid until the same thread asks for the same buffer again,
+    so callers must be done with the model call before preprocessing the next input.
+    """
+    buffers = _input_buffers.__dict__.setdefault('buffers', {})
+    key = (tuple(shape), np.dtype(dtype).str)
+    if key not in buffers:
+        buffers[key] = np.empty(shape, dtype=dtype)
+    return buffers[key]
+
+
+def preprocess_image(image: np.ndarray, img_size: int, normalize: bool = True,
+                     reuse_buffer: bool = False) -> np.ndarray:
+    """Preprocess image for model input with validation and optional normalization.
+
+    With reuse_buffer the resize, color conversion and scaling write into this
+    thread's preallocated input buffers instead of allocating new arrays.
+    """
     try:
         if image is None or image.size == 0:
             raise ImageProcessingError("Invalid input image")
 
+        if reuse_buffer:
+            # Resizing first converts fewer pixels; the channel swap commutes with the resize
+            batch_shape = (1, img_size, img_size, 3)
+            if normalize:
+                resized = get_input_buffer(batch_shape[1:], np.uint8)
+                batch = get_input_buffer(batch_shape, np.float32)
+            else:
+                batch = get_input_buffer(batch_shape, np.uint8)
+                resized = batch[0]
+            cv2.resize(image, (img_size, img_size), dst=resized, interpolation=cv2.INTER_LINEAR)
+            cv2.cvtColor(resized, cv2.COLOR_BGR2RGB, dst=resized)
+            if normalize:
+                np.divide(resized, np.float32(255.0), out=batch[0], casting='unsafe')
+            return batch
+
         image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
         image_resized = cv2.resize(image_rgb, (img_size, img_size), interpolation=cv2.INTER_LINEAR)
         
@@ -254,6 +639,84 @@ def preprocess_image(image: np.ndarray, img_size: int, normalize: bool = True) -
         raise ImageProcessingError(f"Image preprocessing failed: {str(e)}")
 
 
+def build_resize_pyramid(image: np.ndarray, long_sides: List[int]) -> List[np.ndarray]:
+    """Area-downscale an image once per working resolution, largest level first.
+
+    Each level is resized from the one above it; the image itself is level 0.
+    """
+    pyramid = [image]
+    height, width = image.shape[:2]
+    for long_side in sorted(long_sides, reverse=True):
+        if long_side >= max(pyramid[-1].shape[:2]):
+            continue
+        scale = long_side / max(height, width)
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        pyramid.append(cv2.resize(pyramid[-1], size, interpolation=cv2.INTER_AREA))
+    return pyramid
+
+
+def select_pyramid_level(pyramid: List[np.ndarray], min_long_side: int = 0, min_short_side: int = 0) -> np.ndarray:
+    """Smallest pyramid level still at least as big as a stage's input, so the stage only downscales."""
+    for level in reversed(pyramid):
+        if max(level.shape[:2]) >= min_long_side and min(level.shape[:2]) >= min_short_side:
+            return level
+    return pyramid[0]
+
+
+def scale_face_detections(bbox: Optional[np.ndarray], landmarks: Optional[np.ndarray],
+                          scale: float) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """Map face boxes and landmarks from a pyramid level back to level-0 coordinates."""
+    if scale == 1.0 or bbox is None:
+        return bbox, landmarks
+    bbox = bbox.copy()
+    bbox[:, :4] *= scale
+    return bbox, (landmarks * scale if landmarks is not None else None)
+
+
+def crop_fractional_region(image: np.ndarray, region: List[float]) -> Tuple[np.ndarray, Tuple[int, int]]:
+    """Cut [x1, y1, x2, y2] given as fractions of the image; returns the crop and its top-left corner."""
+    height, width = image.shape[:2]
+    x1, y1 = int(region[0] * width), int(region[1] * height)
+    x2, y2 = int(np.ceil(region[2] * width)), int(np.ceil(region[3] * height))
+    return image[y1:y2, x1:x2], (x1, y1)
+
+
+def offset_face_detections(bbox: Optional[np.ndarray], landmarks: Optional[np.ndarray],
+                           offset: Tuple[int, int]) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """Move face boxes and landmarks found in a crop back to the coordinates of the image it was cut from."""
+    if bbox is None or offset == (0, 0):
+        return bbox, landmarks
+    bbox = bbox.copy()
+    bbox[:, [0, 2]] += offset[0]
+    bbox[:, [1, 3]] += offset[1]
+    if landmarks is not None:
+        landmarks = landmarks + np.array(offset, dtype=landmarks.dtype)
+    return bbox, landmarks
+
+
+def scale_ocr_detections(detections: List[Any], scale: float) -> List[Any]:
+    """Map OCR box corners from a pyramid level back to level-0 coordinates."""
+    if scale == 1.0:
+        return detections
+    return [[[[x * scale, y * scale] for x, y in box], text] for box, text in detections]
+
+
+def orientation_from_landmarks(landmarks: np.ndarray, max_angle: float = 30.0) -> Optional[str]:
+    """Orientation label of an image from one face's five landmarks, or None when the face is too tilted.
+
+    The eye midpoint lies above the mouth midpoint on an upright face. The labels
+    follow rectify_image_orientation, e.g. "90" when the face's top points right.
+    """
+    eyes = landmarks[0:2].mean(axis=0)
+    mouth = landmarks[3:5].mean(axis=0)
+    up_x, up_y = eyes - mouth
+    angle = float(np.degrees(np.arctan2(up_x, -up_y)))
+    nearest = round(angle / 90) * 90
+    if abs(angle - nearest) > max_angle:
+        return None
+    return str(nearest % 360)
+
+
 def rectify_image_orientation(image: np.ndarray, orientation: str = "0") -> np.ndarray:
     """Rectify image orientation with validation."""
     if image is None:
@@ -291,6 +754,91 @@ def load_model_safe(model_path: str):
         raise ModelLoadError(f"Failed to load model {model_path}: {str(e)}")
 
 
+class TFLiteClassifier:
+    """TFLite interpreter exposing the Keras predict() call used by the pipeline.
+
+    The interpreter memory-maps the flatbuffer, so instances in every worker process
+    read the weights from one shared page-cache copy. An interpreter is not thread-safe;
+    engine pools hand each instance to one request at a time.
+    """
+
+    def __init__(self, tflite_path: str, num_threads: Optional[int] = None):
+        self.interpreter = tf.lite.Interpreter(model_path=tflite_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input_details = self.interpreter.get_input_details()[0]
+        self.output_details = self.interpreter.get_output_details()[0]
+
+    def predict(self, inputs: np.ndarray, verbose: int = 0) -> np.ndarray:
+        inputs = np.asarray(inputs, dtype=self.input_details['dtype'])
+        # Cascade passes feed a smaller size than the full pass
+        if tuple(self.input_details['shape']) != inputs.shape:
+            self.interpreter.resize_tensor_input(self.input_details['index'], inputs.shape)
+            self.interpreter.allocate_tensors()
+            self.input_details = self.interpreter.get_input_details()[0]
+            self.output_details = self.interpreter.get_output_details()[0]
+
+        self.interpreter.set_tensor(self.input_details['index'], inputs)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self.output_details['index']).copy()
+
+
+def convert_to_tflite(model_path: str, tflite_dir: str) -> Path:
+    """Convert a Keras model to TFLite once per model version and return the file."""
+    version = get_model_version(model_path)
+    if version is None:
+        raise ModelLoadError(f"Model not found: {model_path}")
+
+    source = Path(model_path)
+    tflite_path = Path(tflite_dir) / f"{source.parent.name}_{source.stem}.{version[:12]}.tflite"
+    if tflite_path.exists():
+        return tflite_path
+
+    logger.info(f"Converting {model_path} to TFLite: {tflite_path}")
+    if source.is_dir():
+        converter = tf.lite.TFLiteConverter.from_saved_model(str(source))
+    else:
+        converter = tf.lite.TFLiteConverter.from_keras_model(tf.keras.models.load_model(model_path))
+
+    # Written under a per-process name and renamed, so concurrent workers never map a partial file
+    tflite_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = tflite_path.with_name(f"{tflite_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    temp_path.write_bytes(converter.convert())
+    os.replace(temp_path, tflite_path)
+    return tflite_path
+
+
+def load_classifier(model_path: str, classifier_config: Optional[Dict[str, Any]] = None):
+    """Load a classifier in the configured format: a Keras model or a memory-mapped TFLite model."""
+    classifier_config = classifier_config or {}
+    if classifier_config.get('format', 'savedmodel') != 'tflite':
+        return load_model_safe(model_path)
+
+    try:
+        tflite_path = convert_to_tflite(model_path, classifier_config.get('tflite_dir', './models/.tflite'))
+        model = TFLiteClassifier(str(tflite_path), classifier_config.get('num_threads'))
+        logger.debug(f"TFLite model loaded successfully: {tflite_path}")
+        return model
+
+    except Exception as e:
+        logger.error(f"Failed to load TFLite model for {model_path}: {str(e)}")
+        raise ModelLoadError(f"Failed to load TFLite model for {model_path}: {str(e)}")
+
+
+def get_model_version(model_path: str) -> Optional[str]:
+    """Fingerprint a model file or SavedModel directory from file names, sizes and mtimes."""
+    path = Path(model_path)
+    if not path.exists():
+        return None
+
+    files = [path] if path.is_file() else sorted(f for f in path.rglob('*') if f.is_file())
+    digest = hashlib.md5()
+    for file in files:
+        stat = file.stat()
+        name = file.name if file == path else file.relative_to(path).as_posix()
+        digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
 def get_prediction_label(prediction: np.ndarray, target_labels: list) -> str:
     """Get prediction label with error handling."""
     try:
@@ -344,9 +892,28 @@ def process_ocr_fields(extracted_fields: List[Dict[str, Any]], OCRFieldNames) ->
     return result
 
 
-def generate_image_hash(image_path: str) -> str:
-    """Generate hash for image path to use as cache key."""
-    return hashlib.md5(image_path.encode()).hexdigest()
+def make_warmup_image(height: int = 640, width: int = 1010) -> np.ndarray:
+    """Build a synthetic ID-card-like image with a portrait block and printed text for warmup runs.
+
+    The text follows no OPCO's card, so every tenant warms up on the same image.
+    """
+    image = np.full((height, width, 3), 235, dtype=np.uint8)
+    cv2.rectangle(image, (40, 140), (300, 500), (170, 170, 170), -1)
+    lines = ["IDENTITY CARD", "SURNAME SAMPLE", "GIVEN NAMES JOHN", "DATE OF BIRTH 01.01.1990"]
+    for i, line in enumerate(lines):
+        cv2.putText(image, line, (340, 180 + i * 90), cv2.FONT_HERSHEY_SIMPLEX, 1.1, (20, 20, 20), 2, cv2.LINE_AA)
+    return image
+
+
+def generate_image_hash(image_data: Union[str, bytes, np.ndarray]) -> str:
+    """Generate a cache key from image content, so the same upload hits the cache however it arrives."""
+    if isinstance(image_data, np.ndarray):
+        digest = hashlib.md5(f"{image_data.shape}:{image_data.dtype}".encode())
+        digest.update(np.ascontiguousarray(image_data).data)
+        return digest.hexdigest()
+    if isinstance(image_data, str):
+        image_data = image_data.encode()
+    return hashlib.md5(image_data).hexdigest()
 
 
 class ProcessingMetrics:
@@ -366,6 +933,139 @@ class ProcessingMetrics:
             logger.info(f"[Timing] {self.operation_name}: {elapsed:.4f}s")
 
 
+class EnginePool:
+    """Fixed set of engine instances, each used by one caller at a time."""
+
+    def __init__(self, name: str, factory, size: int, checkout_timeout: float = 30):
+        self.name = name
+        self.checkout_timeout = checkout_timeout
+        self.instances = [factory() for _ in range(max(1, size))]
+
+        # LIFO keeps the most recently used, cache-warm instances busy
+        self._available = queue.LifoQueue()
+        for instance in self.instances:
+            self._available.put(instance)
+
+    @contextmanager
+    def checkout(self):
+        """Borrow an instance for the duration of the with block."""
+        try:
+            instance = self._available.get(timeout=self.checkout_timeout)
+        except queue.Empty:
+            raise EnginePoolExhaustedError(f"No free {self.name} instance after {self.checkout_timeout}s")
+        try:
+            yield instance
+        finally:
+            self._available.put(instance)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Pool size and currently idle instances."""
+        return {"size": len(self.instances), "available": self._available.qsize()}
+
+
+class EngineBatcher:
+    """Runs one OCR stage for concurrent callers in shared batches.
+
+    Each worker takes the oldest waiting job, waits up to max_wait for more items
+    to join until batch_size is reached, then passes all of them to
+    run(engine, items) on one engine of the pool. run returns one result per
+    item; every caller gets back the results of its own items. There is one
+    worker per pool instance.
+    """
+
+    def __init__(self, pool: EnginePool, stage: str, run: Callable[[Any, List[Any]], List[Any]],
+                 batch_size: int, max_wait: float):
+        self.pool = pool
+        self.run = run
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._pending = queue.Queue()
+        for index in range(len(pool.instances)):
+            threading.Thread(target=self._work, name=f"{pool.name}-{stage}-{index}", daemon=True).start()
+
+    def submit(self, items: List[Any]) -> List[Any]:
+        """Results of the items, once the batch they joined has run."""
+        if not items:
+            return []
+        future = Future()
+        self._pending.put((items, future))
+        return future.result()
+
+    def _work(self):
+        while True:
+            jobs = [self._pending.get()]
+            item_count = len(jobs[0][0])
+            deadline = time.monotonic() + self.max_wait
+            while item_count < self.batch_size:
+                try:
+                    job = self._pending.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                jobs.append(job)
+                item_count += len(job[0])
+
+            try:
+                with self.pool.checkout() as engine:
+                    results = self.run(engine, [item for items, _ in jobs for item in items])
+            except Exception as e:
+                for _, future in jobs:
+                    future.set_exception(e)
+                continue
+
+            start = 0
+            for items, future in jobs:
+                future.set_result(results[start:start + len(items)])
+                start += len(items)
+
+
+# Engines loaded once per process and shared by every OPCO
+SHARED_COMPONENTS = ('face_detector', 'rapid_ocr')
+
+
+class ModelSwapGate:
+    """Lets requests run concurrently while model swaps wait for a gap between requests."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._active_requests = 0
+        self._swap_pending = False
+
+    def __enter__(self):
+        with self._condition:
+            while self._swap_pending:
+                self._condition.wait()
+            self._active_requests += 1
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        with self._condition:
+            self._active_requests -= 1
+            self._condition.notify_all()
+
+    def swap(self, swap_fn):
+        """Hold new requests, wait for in-flight ones to finish, then run swap_fn."""
+        with self._condition:
+            while self._swap_pending:
+                self._condition.wait()
+            self._swap_pending = True
+            while self._active_requests > 0:
+                self._condition.wait()
+            try:
+                swap_fn()
+            finally:
+                self._swap_pending = False
+                self._condition.notify_all()
+
+
+def guarded_by_model_swap(method):
+    """Run an IDProcessor request method inside its model swap gate."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.model_swap_gate:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class IDProcessor:
     """Enhanced ID processor with caching, error handling, and MinIO model download."""
 
@@ -383,30 +1083,108 @@ class IDProcessor:
         if not hasattr(self, 'initialized'):
             self.config = None
             self.opco = None
+            self.multi_tenant_config = {}
+            self.ort_config = {}
+            self.cpu_allocation = {}
+            self.tenants = {}
+            self.tenant_lock = threading.Lock()
             self.model_cache = {}
-            self.face_detector = None
-            self.rapid_ocr = None
-            self.model_downloader = None
+            self.model_versions = {}
+            self.model_swap_gate = ModelSwapGate()
+            self.pool_config = {}
+            self.classifier_config = {}
+            self.decode_config = {}
+            self.upload_limits = {}
+            self.pyramid_config = {}
+            self.decode_limits = (0, 0)
+            # RetinaFace canvas side per OPCO, validated once when its config is first read
+            self.face_detector_input_sizes = {}
+            # Portrait region and its fixed RetinaFace canvas per OPCO, None without a region
+            self.portrait_searches = {}
+            self.face_detector_pool = None
+            # OCR engine pools keyed by component key, one per distinct effective OCR config
+            self.rapid_ocr_pools = {}
+            self.det_batchers = {}
+            self.rec_batchers = {}
+            self.ocr_batching = {}
+            self.ocr_engine_keys = {}
+            self.model_downloaders = {}
+            self.image_reader = None
+            self.object_keys = {}
 
             # Caching for computed results
             self.orientation_cache = {}  
+            self.orientation_margins = {}
             self.image_cache = {}  
             self.ocr_cache = {}  
             self.face_detection_cache = {}  
+            self.pyramid_cache = {}
+
+            # Encoded source and source-to-decoded scale of images decoded at reduced resolution
+            self.image_sources = {}
+            self.image_crop_factors = {}
+
+            # Background loading and warmup state
+            self.model_locks = {}
+            self.component_events = {}
+            # The OPCO whose loader builds each component; shared engines are built once
+            self.component_owners = {}
+            self.component_errors = {}
+            self.load_timings = {}
+            self.warmup_timings = {}
+            self.ready = False
+
+            # Low-resolution first pass counters per OPCO and classifier
+            self.cascade_stats = {}
+            self.stats_lock = threading.Lock()
+
+            # Front orientations per OPCO, and how many were read from face landmarks
+            self.orientation_stats = {}
+
+            # Uploads checked against the limits, rejected per reason and downscaled while decoding
+            self.upload_stats = {"inspected": 0, "rejected": {}, "downscaled": 0}
 
             self.initialized = False
             self._initialize()
 
+    @property
+    def model_downloader(self) -> Optional['MinIOModelDownloader']:
+        """MinIO downloader of the default OPCO."""
+        return self.model_downloaders.get(self.opco)
+
     def _initialize(self):
-        """Initialize ID Processor with model download capability."""
+        """Initialize ID Processor and start bringing models up."""
         try:
             logger.info("Initializing ID Processor...")
 
             # Load configuration
             self.config = load_config()
+            runtime_cfg = self.config.get('runtime') or {}
+            self.multi_tenant_config = runtime_cfg.get('multi_tenant') or {}
+
+            # Size the thread pools before any model runs
+            self.cpu_allocation = apply_cpu_budget(runtime_cfg.get('cpu_budget') or {})
+            self.ort_config = dict(runtime_cfg.get('onnxruntime') or {})
+            if self.cpu_allocation.get('onnxruntime'):
+                self.ort_config.update(self.cpu_allocation['onnxruntime'])
+            self.pool_config = runtime_cfg.get('engine_pools') or {}
+            self.classifier_config = dict(runtime_cfg.get('classifiers') or {})
+            tf_threads = (self.cpu_allocation.get('tensorflow') or {}).get('intra_op_threads')
+            if tf_threads and 'num_threads' not in self.classifier_config:
+                self.classifier_config['num_threads'] = tf_threads
+            self.decode_config = runtime_cfg.get('image_decoding') or {}
+            self.upload_limits = runtime_cfg.get('upload_limits') or {}
+            self.pyramid_config = runtime_cfg.get('image_pyramid') or {}
+            self.ocr_batching = runtime_cfg.get('ocr_batching') or {}
+            self._initialize_image_reader(runtime_cfg.get('object_store') or {})
 
             # Get OPCO from environment FIRST (before MinIO initialization)
             self.opco = os.environ.get('opco')
+            if self.multi_tenant_config.get('enabled', False):
+                # The default OPCO also owns the model tree the shared engines load from
+                served = self.multi_tenant_config.get('opcos') or []
+                self.opco = self.opco or self.multi_tenant_config.get('default_opco') or (served[0] if served else None)
+
             if not self.opco:
                 raise ConfigurationError("OPCO environment variable is not set. Please set 'opco' before running.")
 
@@ -414,30 +1192,15 @@ class IDProcessor:
                 raise ConfigurationError(f"OPCO '{self.opco}' not found in configuration")
 
             logger.info(f"Using OPCO: {self.opco}")
+            self.decode_limits = self._get_decode_limits()
 
-            # Initialize MinIO model downloader with OPCO-specific config
-            try:
-                opco_config = self.config[self.opco]
-                # Check if this OPCO has MinIO configuration
-                if 'minio_config' in opco_config:
-                    self.model_downloader = MinIOModelDownloader(opco_config, self.opco)
-                    
-                    # Ensure models directory exists
-                    if not self.model_downloader.ensure_models_directory():
-                        logger.error(f"Failed to ensure models directory exists for OPCO: {self.opco}")
-                        raise ModelDownloadError(f"Could not create or download models directory for OPCO: {self.opco}")
-                else:
-                    logger.info(f"No MinIO configuration found for OPCO '{self.opco}', skipping model download")
-                    
-            except Exception as e:
-                logger.warning(f"Failed to initialize MinIO downloader for OPCO '{self.opco}': {str(e)}")
-                logger.warning("Continuing without automatic model download capability")
-
-            # Initialize face detector
-            self.face_detector = RetinaFaceDetectionONNX()
+            self._ensure_tenant(self.opco)
+            for opco in self.multi_tenant_config.get('preload', []) if self.multi_tenant_config.get('enabled', False) else []:
+                self._ensure_tenant(opco)
 
-            # Initialize OCR
-            self.rapid_ocr = RapidOCRONNX()
+            hot_reload_cfg = self.config[self.opco].get('hot_reload') or {}
+            if hot_reload_cfg.get('enabled', False):
+                threading.Thread(target=self._watch_model_versions, name="id-model-watcher", daemon=True).start()
 
             self.initialized = True
             logger.info("ID Processor initialized successfully")
@@ -446,116 +1209,956 @@ class IDProcessor:
             logger.error(f"Failed to initialize ID Processor: {str(e)}")
             raise
 
-    def _get_model(self, model_type: str):
-        """Get model with caching."""
-        cache_key = f"{self.opco}_{model_type}"
+    def _initialize_image_reader(self, store_config: Dict[str, Any]):
+        """Create the object store reader for s3:// inputs when it is enabled."""
+        if not store_config.get('enabled', False):
+            return
+        try:
+            self.image_reader = MinIOImageReader(store_config)
+        except Exception as e:
+            logger.warning(f"Failed to initialize object store image reader: {str(e)}")
+            logger.warning("Continuing without object URI inputs")
 
-        if cache_key not in self.model_cache:
-            try:
-                cfg = self.config[self.opco]['models'][model_type]
-                model_path = None
-
-                if model_type == 'id_type':
-                    detection_method = cfg.get('detection_method', 'classifier')
-                    if detection_method in ['classifier', 'hybrid']:
-                        classifier_cfg = cfg.get('classifier', {})
-                        model_path = classifier_cfg.get('model_path')
-                    else:
+    def _get_decode_limits(self) -> Tuple[int, int]:
+        """Smallest long and short side a decoded image may have for any served OPCO's plan."""
+        if self.multi_tenant_config.get('enabled', False):
+            served = [opco for opco in self.multi_tenant_config.get('opcos') or [] if opco in self.config]
+        else:
+            served = [self.opco]
+
+        # The long side feeds the OCR and face detector resizes, the short side the square classifier inputs
+        min_long_side = int(self.decode_config.get('ocr_max_side_len', 960))
+        min_short_side = 0
+        for opco in served:
+            min_long_side = max(min_long_side, self._get_face_detector_input_size(opco))
+            models_cfg = self.config[opco]['models']
+            for model_type in ['id_orientation', 'id_type']:
+                min_short_side = max(min_short_side, int(models_cfg[model_type].get('img_size', 0)))
+        return min_long_side, min_short_side
+
+    def _get_face_detector_input_size(self, opco: str) -> int:
+        """RetinaFace canvas side for an OPCO, validated the first time the OPCO's config is read."""
+        size = self.face_detector_input_sizes.get(opco)
+        if size is None:
+            size = self.face_detector_input_sizes[opco] = self._read_face_detector_input_size(opco)
+        return size
+
+    def _read_face_detector_input_size(self, opco: str) -> int:
+        """Read and validate an OPCO's RetinaFace canvas side; strides go up to 32, so it must be a multiple of 32."""
+        size = int(self.config[opco]['models']['id_quality'].get(
+            'face_detector_input_size', self.decode_config.get('face_detector_size', 640)
+        ))
+        if size <= 0 or size % 32:
+            raise ConfigurationError(f"face_detector_input_size for {opco} must be a positive multiple of 32, got {size}")
+        return size
+
+    def _get_portrait_region(self, opco: str) -> Optional[List[float]]:
+        """Where an OPCO's holder photo sits, as [x1, y1, x2, y2] fractions of the uprighted front; None scans it all."""
+        region = self.config[opco]['models']['id_quality'].get('portrait_region')
+        if not region:
+            return None
+        if len(region) != 4 or not (0 <= region[0] < region[2] <= 1 and 0 <= region[1] < region[3] <= 1):
+            raise ConfigurationError(f"portrait_region for {opco} must be [x1, y1, x2, y2] fractions in [0, 1], got {region}")
+        return [float(value) for value in region]
+
+    def _get_portrait_search(self, opco: str) -> Optional[Tuple[List[float], Tuple[int, int]]]:
+        """An OPCO's portrait region and the one canvas it is searched on, or None without a region.
+
+        The canvas is the region's share of the full-card canvas, rounded up to a
+        multiple of 32. Letterboxed into it, a crop keeps about the scale the full card
+        gets, and the detector sees one canvas shape per OPCO whatever the card's
+        aspect ratio.
+        """
+        if opco not in self.portrait_searches:
+            region = self._get_portrait_region(opco)
+            search = None
+            if region is not None:
+                input_size = self._get_face_detector_input_size(opco)
+                shares = region[2] - region[0], region[3] - region[1]
+                search = region, tuple(-(-int(np.ceil(share * input_size)) // 32) * 32 for share in shares)
+            self.portrait_searches[opco] = search
+        return self.portrait_searches[opco]
+
+    def _resolve_opco(self, input_dict: Dict[str, Any]) -> str:
+        """Pick the request's OPCO and make sure its models are loading."""
+        opco = input_dict.get("opco") or self.opco
+
+        if opco != self.opco:
+            if not self.multi_tenant_config.get('enabled', False):
+                raise ConfigurationError(f"OPCO '{opco}' is not served by this process (serving '{self.opco}')")
+            served = self.multi_tenant_config.get('opcos')
+            if served and opco not in served:
+                raise ConfigurationError(f"OPCO '{opco}' is not in the multi-tenant OPCO list")
+            if opco not in self.config:
+                raise ConfigurationError(f"OPCO '{opco}' not found in configuration")
+
+        self._ensure_tenant(opco)
+        return opco
+
+    def _ensure_tenant(self, opco: str):
+        """Start loading an OPCO's own models the first time it is used."""
+        with self.tenant_lock:
+            if opco in self.tenants:
+                return
+            # A bad input size or portrait region fails the tenant here rather than on its requests
+            self._get_face_detector_input_size(opco)
+            self._get_portrait_search(opco)
+            self.tenants[opco] = {"ready": False}
+            for name in self._get_plan_models(opco):
+                component_key = self._get_component_key(opco, name)
+                if component_key not in self.component_events:
+                    self.component_events[component_key] = threading.Event()
+                    self.component_owners[component_key] = opco
+
+        logger.info(f"Loading models for OPCO: {opco}")
+        if self._get_loader_config(opco).get('background', True):
+            # Stages become ready one at a time while the process already serves
+            threading.Thread(
+                target=self._load_components, args=(opco,), name=f"id-model-loader-{opco}", daemon=True
+            ).start()
+        else:
+            self._load_components(opco)
+
+    def _get_loader_config(self, opco: str) -> Dict[str, Any]:
+        """Get an OPCO's loader configuration."""
+        return self.config[opco].get('loader') or {}
+
+    def _get_models_root(self, opco: str) -> Path:
+        """Root directory holding an OPCO's models tree.
+
+        The default OPCO keeps using ./models; other tenants get their own tree
+        so classifiers of different OPCOs never overwrite each other.
+        """
+        if self.config[opco].get('models_root'):
+            return Path(self.config[opco]['models_root'])
+        if opco == self.opco:
+            return Path('.')
+        return Path(self.multi_tenant_config.get('tenants_dir', './tenants')) / opco
+
+    def _sync_models_directory(self, opco: str):
+        """Ensure the models directory exists, downloading it from MinIO if configured."""
+        try:
+            opco_config = self.config[opco]
+            # Check if this OPCO has MinIO configuration
+            if 'minio_config' in opco_config:
+                self.model_downloaders[opco] = MinIOModelDownloader(opco_config, opco, self._get_models_root(opco))
+
+                # Ensure models directory exists
+                if not self.model_downloaders[opco].ensure_models_directory():
+                    logger.error(f"Failed to ensure models directory exists for OPCO: {opco}")
+                    raise ModelDownloadError(f"Could not create or download models directory for OPCO: {opco}")
+            else:
+                logger.info(f"No MinIO configuration found for OPCO '{opco}', skipping model download")
+
+        except Exception as e:
+            logger.warning(f"Failed to initialize MinIO downloader for OPCO '{opco}': {str(e)}")
+            logger.warning("Continuing without automatic model download capability")
+
+    def _load_components(self, opco: str):
+        """Sync the models directory, then load and warm up every component in priority order."""
+        with ProcessingMetrics(f"model_loading_{opco}"):
+            self._sync_models_directory(opco)
+
+            max_workers = max(1, int(self._get_loader_config(opco).get('max_workers', 3)))
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"id-model-loader-{opco}") as executor:
+                # Submission order is the start order once workers free up
+                for name in self._get_load_order(opco):
+                    # Shared engines are loaded once, by the first OPCO that needs them
+                    if self.component_owners.get(self._get_component_key(opco, name)) != opco:
+                        continue
+                    executor.submit(self._load_component, opco, name)
+
+        self.tenants[opco]["ready"] = True
+        if opco == self.opco:
+            self.ready = True
+        logger.info(f"All models loaded for OPCO: {opco}")
+
+    def _get_load_order(self, opco: str) -> List[str]:
+        """Order the plan's components by the configured loader priority."""
+        plan = self._get_plan_models(opco)
+        priority = [name for name in self._get_loader_config(opco).get('priority', []) if name in plan]
+        return priority + [name for name in plan if name not in priority]
+
+    def _get_component_key(self, opco: str, name: str) -> str:
+        """Shared engines have one key per process, classifiers one per OPCO.
+
+        OCR engines are shared per effective config: OPCOs without rapid_ocr
+        overrides use the default OPCO's engine, others get one per distinct config.
+        """
+        if name == 'rapid_ocr':
+            engine_key = self._get_ocr_engine_key(opco)
+            return name if engine_key == self._get_ocr_engine_key(self.opco) else f"{name}_{engine_key}"
+        return name if name in SHARED_COMPONENTS else f"{opco}_{name}"
+
+    def _get_ocr_engine_config(self, opco: str) -> Dict[str, Any]:
+        """RapidOCR config of an OPCO: the bundled config.yml plus its Global/Det/Cls/Rec overrides."""
+        return load_rapidocr_config(self.config[opco].get('rapid_ocr'), self._get_models_root(opco))
+
+    def _get_ocr_engine_key(self, opco: str) -> str:
+        """Short hash of an OPCO's effective OCR config; equal configs share an engine pool."""
+        if opco not in self.ocr_engine_keys:
+            engine_config = json.dumps(self._get_ocr_engine_config(opco), sort_keys=True, default=str)
+            self.ocr_engine_keys[opco] = hashlib.md5(engine_config.encode()).hexdigest()[:8]
+        return self.ocr_engine_keys[opco]
+
+    def _get_rapid_ocr_pool(self, opco: str) -> EnginePool:
+        """OCR engine pool serving an OPCO."""
+        return self.rapid_ocr_pools[self._get_component_key(opco, 'rapid_ocr')]
+
+    def _load_component(self, opco: str, name: str):
+        """Load and warm up a single component, then mark it ready."""
+        component_key = self._get_component_key(opco, name)
+        try:
+            start_time = time.time()
+            if name == 'face_detector':
+                pool_size = self._get_pool_size('face_detector')
+                session_config = get_session_config(self._get_pooled_ort_config(pool_size), 'face_detector')
+                self.face_detector_pool = EnginePool(
+                    'face_detector', lambda: RetinaFaceDetectionONNX(session_config=session_config),
+                    pool_size, self._get_checkout_timeout()
+                )
+            elif name == 'rapid_ocr':
+                pool_size = self._get_pool_size('rapid_ocr')
+                ort_config = self._get_pooled_ort_config(pool_size)
+                ocr_config = self._get_ocr_engine_config(opco)
+                self.rapid_ocr_pools[component_key] = EnginePool(
+                    component_key, lambda: RapidOCRONNX(ocr_config, ort_config=ort_config),
+                    pool_size, self._get_checkout_timeout()
+                )
+                if self.ocr_batching.get('enabled', True):
+                    max_wait = float(self.ocr_batching.get('max_wait_ms', 5)) / 1000
+                    rec_batch_num = int(self.ocr_batching.get('rec_batch_num', 16))
+                    self.rec_batchers[component_key] = EngineBatcher(
+                        self.rapid_ocr_pools[component_key], 'rec',
+                        lambda engine, crops: engine.recognize(crops, rec_batch_num), rec_batch_num, max_wait
+                    )
+                    det_batch_num = int(self.ocr_batching.get('det_batch_num', 1))
+                    if det_batch_num > 1:
+                        det_max_padding = float(self.ocr_batching.get('det_max_padding', 0.0))
+                        self.det_batchers[component_key] = EngineBatcher(
+                            self.rapid_ocr_pools[component_key], 'det',
+                            lambda engine, items: engine.detect_batch(
+                                [image for image, _ in items], det_max_padding, use_cls=[flag for _, flag in items]
+                            ), det_batch_num, max_wait
+                        )
+            else:
+                self._get_model(name, opco)
+                self._get_cascade_model(name, opco)
+            self.load_timings[component_key] = round(time.time() - start_time, 4)
+            logger.info(f"Loaded {component_key} in {self.load_timings[component_key]:.4f}s")
+
+            self._warmup_component(name, opco)
+
+        except Exception as e:
+            self.component_errors[component_key] = str(e)
+            logger.error(f"Failed to load {component_key}: {str(e)}")
+        finally:
+            self.component_events[component_key].set()
+
+    def _get_pool_size(self, pool_name: str) -> int:
+        """Instances in an ONNX engine pool; 0 sizes the pool from the CPU budget."""
+        size = int(self.pool_config.get(pool_name, 1))
+        if size > 0:
+            return size
+
+        ort_threads = (self.cpu_allocation.get('onnxruntime') or {}).get('intra_op_num_threads')
+        if not ort_threads:
+            return 1
+        return max(1, ort_threads // int(self.pool_config.get('threads_per_instance', 2)))
+
+    def _get_pooled_ort_config(self, pool_size: int) -> Dict[str, Any]:
+        """Divide the budgeted ONNX Runtime threads between the instances of a pool."""
+        ort_config = dict(self.ort_config)
+        ort_threads = (self.cpu_allocation.get('onnxruntime') or {}).get('intra_op_num_threads')
+        if ort_threads:
+            ort_config['intra_op_num_threads'] = max(1, ort_threads // pool_size)
+        return ort_config
+
+    def _get_checkout_timeout(self) -> float:
+        """Seconds a request waits for a free engine instance."""
+        return float(self.pool_config.get('checkout_timeout', 30))
+
+    def _build_model_pool(self, cache_key: str, model_path: str) -> EnginePool:
+        """Load a pool of classifier instances in the configured format."""
+        return EnginePool(
+            cache_key, lambda: load_classifier(model_path, self.classifier_config),
+            max(1, int(self.pool_config.get('keras_models', 1))), self._get_checkout_timeout()
+        )
+
+    def get_pool_stats(self) -> Dict[str, Dict[str, int]]:
+        """Report size and idle instances of every engine pool."""
+        pools = {'face_detector': self.face_detector_pool}
+        pools.update(self.rapid_ocr_pools)
+        pools.update(self.model_cache)
+        return {name: pool.get_stats() for name, pool in list(pools.items()) if pool is not None}
+
+    def _get_stage_dependencies(self, stage: str, opco: str) -> List[str]:
+        """List the components a public function needs before it can serve."""
+        if stage == 'id_orientation':
+            return ['id_orientation']
+        if stage == 'id_quality':
+            return ['id_orientation', 'face_detector', 'id_quality']
+        if stage == 'id_type':
+            detection_method = self.config[opco]['models']['id_type'].get('detection_method', 'classifier')
+            dependencies = ['id_orientation']
+            if detection_method in ['classifier', 'hybrid']:
+                dependencies.append('id_type')
+            if detection_method in ['ocr', 'hybrid']:
+                dependencies.append('rapid_ocr')
+            return dependencies
+        if stage == 'id_demographics':
+            return ['id_orientation', 'rapid_ocr']
+        raise ConfigurationError(f"Unknown stage: {stage}")
+
+    def _wait_for_stage(self, stage: str, opco: str):
+        """Wait up to the configured timeout for a stage's own components only.
+
+        The other stages only use the orientation model to upright the card. When
+        it failed to load they keep serving and take every card as upright ("0").
+        """
+        timeout = float(self._get_loader_config(opco).get('wait_timeout', 30))
+        deadline = time.time() + timeout
+
+        not_ready = []
+        for name in self._get_stage_dependencies(stage, opco):
+            component_key = self._get_component_key(opco, name)
+            if not self.component_events[component_key].wait(max(0.0, deadline - time.time())):
+                not_ready.append(component_key)
+            elif component_key in self.component_errors:
+                if name == 'id_orientation' and stage != 'id_orientation':
+                    logger.warning(f"{component_key} failed to load, {stage} treats the card as upright")
+                    continue
+                raise ModelLoadError(f"{component_key} failed to load: {self.component_errors[component_key]}")
+
+        if not_ready:
+            raise ModelNotReadyError(f"Models not ready for {stage}: {', '.join(not_ready)}")
+
+    def get_component_status(self) -> Dict[str, str]:
+        """Report per-component loading status."""
+        status = {}
+        for name, event in list(self.component_events.items()):
+            if not event.is_set():
+                status[name] = "loading"
+            elif name in self.component_errors:
+                status[name] = "failed"
+            else:
+                status[name] = "ready"
+        return status
+
+    def _get_model_path(self, model_type: str, opco: str) -> Optional[str]:
+        """Resolve the configured model path inside the OPCO's tree, or None for OCR-only id_type."""
+        if model_type.endswith('_cascade'):
+            # Small companion model of a classifier's low-resolution first pass
+            cascade_cfg = self.config[opco]['models'][model_type[:-len('_cascade')]].get('cascade') or {}
+            return str(self._get_models_root(opco) / cascade_cfg['model_path'])
+
+        cfg = self.config[opco]['models'][model_type]
+
+        if model_type == 'id_type':
+            detection_method = cfg.get('detection_method', 'classifier')
+            if detection_method not in ['classifier', 'hybrid']:
+                return None
+            model_path = cfg.get('classifier', {}).get('model_path')
+        else:
+            model_path = cfg.get('model_path') or cfg.get('classifier_model_path')
+
+        if not model_path:
+            raise ModelLoadError(f"No model path found for {model_type}")
+        return str(self._get_models_root(opco) / model_path)
+
+    def _get_model(self, model_type: str, opco: str) -> Optional[EnginePool]:
+        """Get the pool of model instances with caching."""
+        cache_key = f"{opco}_{model_type}"
+
+        # Per-model lock so the loader and a request never load the same model twice
+        with self.model_locks.setdefault(cache_key, threading.Lock()):
+            if cache_key not in self.model_cache:
+                try:
+                    model_path = self._get_model_path(model_type, opco)
+                    if model_path is None:
                         logger.info(f"OCR detection method for {model_type}")
                         return None
-                else:
-                    model_path = cfg.get('model_path') or cfg.get('classifier_model_path')
 
-                if not model_path:
-                    raise ModelLoadError(f"No model path found for {model_type}")
+                    # Fingerprint before loading so a concurrent update is picked up on the next poll
+                    version = get_model_version(model_path)
+                    self.model_cache[cache_key] = self._build_model_pool(cache_key, model_path)
+                    self.model_versions[cache_key] = version
+                    logger.info(f"Cached model: {cache_key}")
 
-                self.model_cache[cache_key] = load_model_safe(model_path)
-                logger.info(f"Cached model: {cache_key}")
+                except Exception as e:
+                    logger.error(f"Failed to load model {model_type}: {str(e)}")
+                    raise
 
+        return self.model_cache[cache_key]
+
+    def _watch_model_versions(self):
+        """Poll for new model versions and hot reload them."""
+        hot_reload_cfg = self.config[self.opco].get('hot_reload') or {}
+        poll_interval = float(hot_reload_cfg.get('poll_interval', 60))
+
+        while True:
+            time.sleep(poll_interval)
+            try:
+                self.check_model_updates()
+            except Exception as e:
+                logger.error(f"Model update check failed: {str(e)}")
+
+    def check_model_updates(self) -> List[str]:
+        """Reload every watched model whose version changed; returns the reloaded model keys."""
+        reloaded = []
+        for opco in list(self.tenants):
+            hot_reload_cfg = self.config[opco].get('hot_reload') or {}
+            source = hot_reload_cfg.get('source', 'local')
+            watched = hot_reload_cfg.get('models', ['id_orientation', 'id_type'])
+
+            for model_type in watched:
+                if model_type not in self._get_plan_models(opco):
+                    continue
+
+                model_path = self._get_model_path(model_type, opco)
+                if source == 'minio' and opco in self.model_downloaders:
+                    self.model_downloaders[opco].sync_model_directory(Path(model_path))
+
+                if self._reload_model_if_changed(model_type, model_path, opco):
+                    reloaded.append(f"{opco}_{model_type}")
+        return reloaded
+
+    def _reload_model_if_changed(self, model_type: str, model_path: str, opco: str) -> bool:
+        """Load a changed model in the background and swap it in between requests."""
+        cache_key = f"{opco}_{model_type}"
+        if cache_key not in self.model_cache:
+            return False
+
+        version = get_model_version(model_path)
+        if version is None or version == self.model_versions.get(cache_key):
+            return False
+
+        logger.info(f"New version detected for {cache_key}, reloading")
+        with ProcessingMetrics(f"reload_{cache_key}"):
+            new_pool = self._build_model_pool(cache_key, model_path)
+
+            # Warm the new model up before it takes traffic
+            normalize = model_type != 'id_orientation'
+            image_input = preprocess_image(
+                make_warmup_image(), self.config[opco]['models'][model_type]['img_size'], normalize=normalize,
+                reuse_buffer=True
+            )
+            for model in new_pool.instances:
+                model.predict(image_input, verbose=0)
+
+        def swap():
+            self.model_cache[cache_key] = new_pool
+            self.model_versions[cache_key] = version
+            self._invalidate_dependent_caches(model_type, opco)
+
+        self.model_swap_gate.swap(swap)
+        logger.info(f"Swapped in new version of {cache_key}: {version}")
+        return True
+
+    def _invalidate_dependent_caches(self, model_type: str, opco: str):
+        """Drop only the cached results computed with the replaced model."""
+        if model_type == 'id_orientation':
+            # Uprighted images and everything computed on them follow the orientation
+            prefix = f"{opco}_"
+            for cache in [self.orientation_cache, self.orientation_margins, self.face_detection_cache, self.ocr_cache]:
+                for key in [key for key in cache if key.startswith(prefix)]:
+                    del cache[key]
+            for cache in [self.image_cache, self.pyramid_cache]:
+                for key in [key for key in cache if key.startswith(f"uprighted_{prefix}")]:
+                    del cache[key]
+            logger.info(f"Invalidated orientation-dependent caches for OPCO: {opco}")
+        # id_type and id_quality predictions are not cached, decoded images stay valid
+
+    def _get_plan_models(self, opco: str) -> List[str]:
+        """List the models used by an OPCO's plan."""
+        models_cfg = self.config[opco]['models']
+        plan = ['id_orientation', 'face_detector', 'id_quality']
+
+        detection_method = models_cfg['id_type'].get('detection_method', 'classifier')
+        if detection_method in ['classifier', 'hybrid']:
+            plan.append('id_type')
+
+        # Demographics always goes through OCR
+        plan.append('rapid_ocr')
+        return plan
+
+    def _warmup_model(self, model_name: str, image: np.ndarray, opco: str):
+        """Run one representative dummy inference through a model."""
+        models_cfg = self.config[opco]['models']
+
+        # Every pooled instance gets its own warmup pass
+        if model_name == 'face_detector':
+            input_size = self._get_face_detector_input_size(opco)
+            portrait_search = self._get_portrait_search(opco)
+            for detector in self.face_detector_pool.instances:
+                detector.detect_primary_face(image, input_size=(input_size, input_size))
+                if portrait_search is not None:
+                    detector.detect_primary_face(
+                        crop_fractional_region(image, portrait_search[0])[0], input_size=portrait_search[1]
+                    )
+        elif model_name == 'rapid_ocr':
+            for ocr in self._get_rapid_ocr_pool(opco).instances:
+                ocr.run(image)
+        else:
+            # Orientation model uses no normalization, quality and type do
+            normalize = model_name != 'id_orientation'
+            image_input = preprocess_image(
+                image, models_cfg[model_name]['img_size'], normalize=normalize, reuse_buffer=True
+            )
+            for model in self._get_model(model_name, opco).instances:
+                model.predict(image_input, verbose=0)
+
+            cascade_cfg = models_cfg[model_name].get('cascade') or {}
+            if cascade_cfg.get('enabled', False):
+                low_res_input = preprocess_image(image, cascade_cfg['img_size'], normalize=normalize, reuse_buffer=True)
+                for model in self._get_cascade_model(model_name, opco).instances:
+                    model.predict(low_res_input, verbose=0)
+
+    def _warmup_component(self, model_name: str, opco: str):
+        """Warm up one loaded component and record its warmup time."""
+        warmup_cfg = self.config[opco].get('warmup') or {}
+        if not warmup_cfg.get('enabled', True):
+            return
+
+        iterations = max(1, int(warmup_cfg.get('iterations', 1)))
+        image = make_warmup_image()
+        component_key = self._get_component_key(opco, model_name)
+
+        start_time = time.time()
+        try:
+            for _ in range(iterations):
+                self._warmup_model(model_name, image, opco)
+            self.warmup_timings[component_key] = round(time.time() - start_time, 4)
+            logger.info(f"Warmed up {component_key} in {self.warmup_timings[component_key]:.4f}s")
+        except Exception as e:
+            self.warmup_timings[component_key] = None
+            logger.warning(f"Warmup failed for {component_key}: {str(e)}")
+
+    def _get_cascade_model(self, model_type: str, opco: str) -> Optional[EnginePool]:
+        """Model of a classifier's low-resolution first pass, or None when the cascade is off."""
+        cascade_cfg = self.config[opco]['models'][model_type].get('cascade') or {}
+        if not cascade_cfg.get('enabled', False):
+            return None
+        if cascade_cfg.get('model_path'):
+            return self._get_model(f"{model_type}_cascade", opco)
+        # Same model at a smaller input size
+        return self._get_model(model_type, opco)
+
+    def _predict_with_cascade(self, model_type: str, image: np.ndarray, opco: str, normalize: bool,
+                              pyramid: Optional[List[np.ndarray]] = None) -> np.ndarray:
+        """Predict with a cheap low-resolution pass first, running the full-size pass only when unsure.
+
+        The full-size pass runs when the softmax margin between the two best
+        classes of the low-resolution pass is below cascade.margin_threshold.
+        With a pyramid, each pass resizes from the nearest level instead of the image.
+        """
+        pyramid = pyramid or [image]
+        cfg = self.config[opco]['models'][model_type]
+        cascade_cfg = cfg.get('cascade') or {}
+
+        if cascade_cfg.get('enabled', False):
+            stats_key = f"{opco}_{model_type}"
+            with self.stats_lock:
+                stats = self.cascade_stats.setdefault(stats_key, {"total": 0, "full_pass": 0})
+                stats["total"] += 1
+
+            try:
+                low_res_input = preprocess_image(
+                    select_pyramid_level(pyramid, min_short_side=cascade_cfg['img_size']),
+                    cascade_cfg['img_size'], normalize=normalize, reuse_buffer=True
+                )
+                with self._get_cascade_model(model_type, opco).checkout() as model:
+                    prediction = model.predict(low_res_input, verbose=0)
+                top_two = np.sort(tf.nn.softmax(prediction).numpy()[0])[-2:]
+                if top_two[-1] - top_two[0] >= float(cascade_cfg.get('margin_threshold', 0.5)):
+                    return prediction
             except Exception as e:
-                logger.error(f"Failed to load model {model_type}: {str(e)}")
+                logger.warning(f"Low-resolution pass failed for {stats_key}, using full size: {str(e)}")
+
+            with self.stats_lock:
+                stats["full_pass"] += 1
+
+        image_input = preprocess_image(
+            select_pyramid_level(pyramid, min_short_side=cfg['img_size']), cfg['img_size'],
+            normalize=normalize, reuse_buffer=True
+        )
+        with self._get_model(model_type, opco).checkout() as model:
+            return model.predict(image_input, verbose=0)
+
+    def _get_max_upload_bytes(self) -> Optional[int]:
+        """Largest encoded upload accepted, None when the limits are off."""
+        if not self.upload_limits.get('enabled', False) or not self.upload_limits.get('max_file_size_mb'):
+            return None
+        return int(float(self.upload_limits['max_file_size_mb']) * 1024 * 1024)
+
+    def _count_rejection(self, reason: str):
+        """Count a rejected upload by reason."""
+        with self.stats_lock:
+            self.upload_stats["rejected"][reason] = self.upload_stats["rejected"].get(reason, 0) + 1
+
+    def _reject_upload(self, message: str, reason: str):
+        """Count a rejected upload and raise."""
+        self._count_rejection(reason)
+        raise UploadRejectedError(message, reason)
+
+    def _inspect_upload(self, image_data: Union[bytes, np.ndarray]) -> int:
+        """Check an upload's header against the limits before decoding it.
+
+        Returns the smallest reduced-decode factor that keeps the decoded image within
+        max_pixels. Only JPEG can be downscaled while decoding; other formats over the
+        limit, and arrays that are already decoded, are rejected.
+        """
+        with self.stats_lock:
+            self.upload_stats["inspected"] += 1
+        max_pixels = int(self.upload_limits.get('max_pixels', 0))
+
+        if isinstance(image_data, np.ndarray):
+            if max_pixels and image_data.shape[0] * image_data.shape[1] > max_pixels:
+                self._reject_upload(f"Image array too large: {image_data.shape[1]}x{image_data.shape[0]}", 'pixels')
+            return 1
+
+        header = read_image_header(image_data)
+        if header is None:
+            self._reject_upload("Unrecognized or malformed image header", 'malformed')
+        image_format, width, height = header
+
+        allowed_formats = [fmt.upper() for fmt in self.upload_limits.get('allowed_formats') or []]
+        if allowed_formats and (image_format or '').upper() not in allowed_formats:
+            self._reject_upload(f"Image format not allowed: {image_format}", 'format')
+
+        if not max_pixels or width * height <= max_pixels:
+            return 1
+
+        factor = choose_pixel_limit_factor((width, height), max_pixels)
+        if self.upload_limits.get('oversize_action', 'downscale') != 'downscale' or factor is None \
+                or image_format != 'JPEG':
+            self._reject_upload(
+                f"Image too large: {width}x{height} exceeds {max_pixels} pixels", 'pixels'
+            )
+        with self.stats_lock:
+            self.upload_stats["downscaled"] += 1
+        return factor
+
+    def _load_image(self, image_source: ImageSource, image_data: Optional[bytes] = None) -> str:
+        """Decode an input image once and return its content key for the cached helpers."""
+        if image_data is None:
+            try:
+                image_data = read_image_source(image_source, self._get_max_upload_bytes())
+            except UploadRejectedError as e:
+                self._count_rejection(e.reason)
                 raise
+        image_key = generate_image_hash(image_data)
+        if image_key not in self.image_cache:
+            # The limits set the largest resolution any stage, crops included, may decode at
+            limit_factor = self._inspect_upload(image_data) if self.upload_limits.get('enabled', False) else 1
+            reduce_factor = limit_factor
+            if self.decode_config.get('reduced', False) and isinstance(image_data, bytes):
+                source_size = read_image_size(image_data)
+                reduce_factor = max(limit_factor, choose_decode_factor(source_size, *self.decode_limits))
+
+            image = decode_image(image_data, reduce_factor)
+            if reduce_factor > limit_factor:
+                # Kept so crops that need detail can still be cut at full (or the limited) resolution
+                self.image_sources[image_key] = image_data
+                self.image_crop_factors[image_key] = limit_factor
+                logger.debug(f"Decoded {image_key} at 1/{reduce_factor}: {image.shape[1::-1]}")
+
+            self.image_cache[image_key] = image
+            logger.debug(f"Cached image: {image_key}")
+        return image_key
+
+    def _load_input_images(self, input_dict: Dict[str, Any], *fields: str) -> List[Optional[str]]:
+        """Load image fields of input_dict, None for absent ones.
+
+        Object URIs of all fields are fetched concurrently before any decode starts.
+        Objects are treated as immutable, so a URI already decoded is not fetched again.
+        """
+        sources = []
+        for field in fields:
+            image_source = input_dict.get(field)
+            if image_source is None or (isinstance(image_source, (str, bytes)) and not image_source):
+                image_source = None
+            sources.append(image_source)
+
+        fetches = {}
+        for image_source in sources:
+            if not is_object_uri(image_source) or image_source in fetches:
+                continue
+            if self.object_keys.get(image_source) in self.image_cache:
+                continue
+            if self.image_reader is None:
+                raise ConfigurationError(f"Object store is not configured, cannot read {image_source}")
+            fetches[image_source] = self.image_reader.prefetch(image_source, self._get_max_upload_bytes())
+
+        image_keys = []
+        for image_source in sources:
+            if image_source is None:
+                image_keys.append(None)
+            elif is_object_uri(image_source):
+                if image_source in fetches:
+                    try:
+                        image_data = fetches[image_source].result()
+                    except UploadRejectedError as e:
+                        self._count_rejection(e.reason)
+                        raise
+                    self.object_keys[image_source] = self._load_image(image_source, image_data)
+                image_keys.append(self.object_keys[image_source])
+            else:
+                image_keys.append(self._load_image(image_source))
+        return image_keys
 
-        return self.model_cache[cache_key]
+    def _load_input_image(self, input_dict: Dict[str, Any], field: str) -> Optional[str]:
+        """Load one image field of input_dict, or return None when it is absent."""
+        return self._load_input_images(input_dict, field)[0]
 
-    def _get_cached_image(self, image_path: str) -> np.ndarray:
+    def _get_cached_image(self, image_key: str) -> np.ndarray:
         """Get cached loaded image."""
-        cache_key = generate_image_hash(image_path)
-        if cache_key not in self.image_cache:
-            self.image_cache[cache_key] = validate_and_load_image(image_path)
-            logger.debug(f"Cached image: {image_path}")
-        return self.image_cache[cache_key]
-
-    def _get_cached_orientation(self, image_path: str) -> str:
-        """Get cached orientation result."""
-        cache_key = generate_image_hash(image_path)
+        if image_key not in self.image_cache:
+            raise ImageProcessingError(f"Image not loaded: {image_key}")
+        return self.image_cache[image_key]
+
+    def _get_full_resolution_crop(self, image_key: str, opco: str, box: Tuple[int, int, int, int]) -> np.ndarray:
+        """Crop a box given in uprighted working-image coordinates, at full resolution when available."""
+        x_min, y_min, x_max, y_max = box
+        uprighted_image = self._get_cached_uprighted_image(image_key, opco)
+        if image_key not in self.image_sources or not self.decode_config.get('full_resolution_crops', True):
+            return uprighted_image[y_min:y_max, x_min:x_max]
+
+        full_image = rectify_image_orientation(
+            decode_image(self.image_sources[image_key], self.image_crop_factors[image_key]),
+            self._get_cached_orientation(image_key, opco)
+        )
+        scale = max(full_image.shape[:2]) / max(uprighted_image.shape[:2])
+        return full_image[int(y_min * scale):int(y_max * scale), int(x_min * scale):int(x_max * scale)]
+
+    def _get_landmark_orientation(self, image_key: str, opco: str) -> Optional[str]:
+        """Orientation from a confident face's landmarks, or None when the classifier has to decide.
+
+        This relies on RetinaFace finding the holder's face on cards rotated by 90
+        or 270 degrees as well as upright ones, which depends on the detector and
+        should be checked on an OPCO's samples before enabling front_strategy
+        'landmarks'. No face, no landmarks, a score below min_face_score or a face
+        tilted past max_angle all return None, so the classifier decides.
+        """
+        landmark_cfg = self.config[opco]['models']['id_orientation'].get('landmarks') or {}
+        face_detector_ready = self.component_events.get('face_detector')
+        if self.face_detector_pool is None or face_detector_ready is None or not face_detector_ready.is_set():
+            return None
+
+        # Faces are searched on the image as uploaded, before any rotation
+        input_size = self._get_face_detector_input_size(opco)
+        level = select_pyramid_level(self._get_cached_pyramid(image_key), min_long_side=input_size)
+        with self.face_detector_pool.checkout() as face_detector:
+            bbox, landmarks = face_detector.detect_primary_face(
+                level, input_size=(input_size, input_size), with_landmarks=True
+            )
+        if bbox is None or landmarks is None or bbox[0][4] < float(landmark_cfg.get('min_face_score', 0.8)):
+            return None
+        return orientation_from_landmarks(landmarks[0], float(landmark_cfg.get('max_angle', 30)))
+
+    def _get_cached_orientation(self, image_key: str, opco: str, front: bool = False) -> str:
+        """Get cached orientation result.
+
+        With front_strategy 'landmarks', a front image's orientation is read from
+        the landmarks of a confident face, and the classifier runs only when none
+        is found.
+        """
+        cache_key = f"{opco}_{image_key}"
         if cache_key not in self.orientation_cache:
             try:
-                cfg = self.config[self.opco]['models']['id_orientation']
-                image = self._get_cached_image(image_path)
+                cfg = self.config[opco]['models']['id_orientation']
+                if front and cfg.get('front_strategy', 'classifier') == 'landmarks':
+                    try:
+                        orientation = self._get_landmark_orientation(image_key, opco)
+                    except Exception as e:
+                        logger.warning(f"Landmark orientation failed for {image_key}, using the classifier: {str(e)}")
+                        orientation = None
+                    with self.stats_lock:
+                        stats = self.orientation_stats.setdefault(opco, {"front_total": 0, "classifier_bypassed": 0})
+                        stats["front_total"] += 1
+                        stats["classifier_bypassed"] += orientation is not None
+                    if orientation is not None:
+                        self.orientation_cache[cache_key] = orientation
+                        # A confident face's landmarks fix the rotation of the whole card
+                        self.orientation_margins[cache_key] = 1.0
+                        logger.debug(f"Cached landmark orientation for {image_key}: {orientation}")
+                        return orientation
+
+                if self._get_component_key(opco, 'id_orientation') in self.component_errors:
+                    # Retrying the failed load would block every request, so the card counts as upright
+                    self.orientation_cache[cache_key] = "0"
+                    self.orientation_margins[cache_key] = 0.0
+                    return "0"
+
+                image = self._get_cached_image(image_key)
                 # Orientation model uses no normalization (Document 3 logic)
-                image_input = preprocess_image(image, cfg['img_size'], normalize=False)
-
-                model = self._get_model('id_orientation')
-                prediction = model.predict(image_input, verbose=0)
+                prediction = self._predict_with_cascade(
+                    'id_orientation', image, opco, normalize=False, pyramid=self._get_cached_pyramid(image_key)
+                )
                 orientation = cfg['target_labels'].get(np.argmax(prediction, axis=-1)[0], "Unknown")
+                top_two = np.sort(tf.nn.softmax(prediction).numpy()[0])[-2:]
 
                 self.orientation_cache[cache_key] = orientation
-                logger.debug(f"Cached orientation for {image_path}: {orientation}")
+                self.orientation_margins[cache_key] = float(top_two[-1] - top_two[0])
+                logger.debug(f"Cached orientation for {image_key}: {orientation}")
             except Exception as e:
-                logger.error(f"Error computing orientation for {image_path}: {str(e)}")
+                logger.error(f"Error computing orientation for {image_key}: {str(e)}")
                 self.orientation_cache[cache_key] = "0"
+                self.orientation_margins[cache_key] = 0.0
 
         return self.orientation_cache[cache_key]
 
-    def _get_cached_uprighted_image(self, image_path: str) -> np.ndarray:
+    def _needs_text_angle_cls(self, image_key: str, opco: str) -> Optional[bool]:
+        """Whether RapidOCR's angle classifier should check the text lines of an uprighted image.
+
+        It is skipped when the orientation's softmax margin reached
+        id_orientation.ocr_cls_skip_margin, or came from face landmarks. None
+        (no threshold set) keeps the use_cls of the OCR config.
+        """
+        skip_margin = self.config[opco]['models']['id_orientation'].get('ocr_cls_skip_margin')
+        if skip_margin is None:
+            return None
+        self._get_cached_orientation(image_key, opco)
+        return self.orientation_margins.get(f"{opco}_{image_key}", 0.0) < float(skip_margin)
+
+    def _get_cached_uprighted_image(self, image_key: str, opco: str) -> np.ndarray:
         """Get cached uprighted image."""
-        cache_key = f"uprighted_{generate_image_hash(image_path)}"
+        cache_key = f"uprighted_{opco}_{image_key}"
         if cache_key not in self.image_cache:
-            image = self._get_cached_image(image_path)
-            orientation = self._get_cached_orientation(image_path)
+            image = self._get_cached_image(image_key)
+            orientation = self._get_cached_orientation(image_key, opco)
             uprighted = rectify_image_orientation(image, orientation)
             self.image_cache[cache_key] = uprighted
-            logger.debug(f"Cached uprighted image for {image_path}")
+            logger.debug(f"Cached uprighted image for {image_key}")
         return self.image_cache[cache_key]
 
-    def _get_cached_face_detection(self, image_path: str) -> Tuple[np.ndarray, Any]:
-        """Get cached face detection result."""
-        cache_key = generate_image_hash(image_path)
+    def _get_cached_pyramid(self, image_key: str, opco: Optional[str] = None) -> List[np.ndarray]:
+        """Resize pyramid of a decoded image, or of its uprighted version when an OPCO is given.
+
+        The pyramid is built once per document; the uprighted pyramid rotates its
+        levels instead of resizing again.
+        """
+        cache_key = image_key if opco is None else f"uprighted_{opco}_{image_key}"
+        if cache_key not in self.pyramid_cache:
+            if opco is None:
+                long_sides = self.pyramid_config.get('long_sides', []) if self.pyramid_config.get('enabled', True) else []
+                pyramid = build_resize_pyramid(self._get_cached_image(image_key), long_sides)
+            else:
+                orientation = self._get_cached_orientation(image_key, opco)
+                pyramid = [self._get_cached_uprighted_image(image_key, opco)] + [
+                    rectify_image_orientation(level, orientation) for level in self._get_cached_pyramid(image_key)[1:]
+                ]
+            self.pyramid_cache[cache_key] = pyramid
+            logger.debug(f"Cached pyramid for {cache_key}: {[level.shape[:2] for level in pyramid]}")
+        return self.pyramid_cache[cache_key]
+
+    def _get_cached_face_detection(self, image_key: str, opco: str) -> Tuple[np.ndarray, Any]:
+        """Get the cached primary face (best box only), in uprighted image coordinates.
+
+        With a portrait_region the detector first runs on that part of the card only,
+        on the OPCO's fixed portrait canvas, and falls back to the whole card when
+        no face is found there.
+        """
+        cache_key = f"{opco}_{image_key}"
         if cache_key not in self.face_detection_cache:
-            uprighted_image = self._get_cached_uprighted_image(image_path)
-            bbox, landmarks = self.face_detector.detect_faces(uprighted_image)
-            self.face_detection_cache[cache_key] = (bbox, landmarks)
-            logger.debug(f"Cached face detection for {image_path}")
+            pyramid = self._get_cached_pyramid(image_key, opco)
+            input_size = self._get_face_detector_input_size(opco)
+            level = select_pyramid_level(pyramid, min_long_side=input_size)
+            portrait_search = self._get_portrait_search(opco)
+            bbox = landmarks = None
+            with self.face_detector_pool.checkout() as face_detector:
+                if portrait_search is not None:
+                    region, canvas = portrait_search
+                    crop, offset = crop_fractional_region(level, region)
+                    bbox, landmarks = offset_face_detections(
+                        *face_detector.detect_primary_face(crop, input_size=canvas), offset
+                    )
+                    if bbox is None:
+                        logger.debug(f"No face in the {opco} portrait region of {image_key}, scanning the full card")
+                if bbox is None:
+                    bbox, landmarks = face_detector.detect_primary_face(level, input_size=(input_size, input_size))
+            scale = max(pyramid[0].shape[:2]) / max(level.shape[:2])
+            self.face_detection_cache[cache_key] = scale_face_detections(bbox, landmarks, scale)
+            logger.debug(f"Cached face detection for {image_key}")
         return self.face_detection_cache[cache_key]
 
-    def _get_cached_ocr(self, image_path: str) -> Any:
+    def _get_cached_ocr(self, image_key: str, opco: str) -> Any:
         """Get cached OCR result."""
-        cache_key = generate_image_hash(image_path)
-        if cache_key not in self.ocr_cache:
-            uprighted_image = self._get_cached_uprighted_image(image_path)
-            ocr_result = self.rapid_ocr.run(uprighted_image)
-            self.ocr_cache[cache_key] = ocr_result
-            logger.debug(f"Cached OCR for {image_path}")
-        return self.ocr_cache[cache_key]
+        return self._get_cached_ocr_batch([image_key], opco)[0]
+
+    def _get_cached_ocr_batch(self, image_keys: List[Optional[str]], opco: str) -> List[Any]:
+        """Cached OCR results of several images, [] for a missing one.
+
+        Uncached images share det runs and their text lines are recognized
+        together. With batching on, both stages go through the pool's
+        EngineBatchers, so they also share batches with concurrent requests.
+        Text lines of images uprighted with a confident orientation skip the
+        angle classifier.
+        """
+        todo = []
+        for image_key in image_keys:
+            if image_key and f"{opco}_{image_key}" not in self.ocr_cache and image_key not in todo:
+                todo.append(image_key)
+
+        if todo:
+            levels, scales = [], []
+            for image_key in todo:
+                pyramid = self._get_cached_pyramid(image_key, opco)
+                level = select_pyramid_level(pyramid, min_long_side=int(self.decode_config.get('ocr_max_side_len', 960)))
+                levels.append(level)
+                scales.append(max(pyramid[0].shape[:2]) / max(level.shape[:2]))
+
+            component_key = self._get_component_key(opco, 'rapid_ocr')
+            pool = self.rapid_ocr_pools[component_key]
+            det_batcher, rec_batcher = self.det_batchers.get(component_key), self.rec_batchers.get(component_key)
+            use_cls = [self._needs_text_angle_cls(image_key, opco) for image_key in todo]
+            if det_batcher is not None:
+                detections = det_batcher.submit(list(zip(levels, use_cls)))
+            else:
+                with pool.checkout() as rapid_ocr:
+                    detections = rapid_ocr.detect_batch(
+                        levels, float(self.ocr_batching.get('det_max_padding', 0.0)), use_cls=use_cls
+                    )
+            crops = [crop for image_crops, _ in detections for crop in image_crops]
+            if rec_batcher is not None:
+                rec_res = rec_batcher.submit(crops)
+            else:
+                with pool.checkout() as rapid_ocr:
+                    rec_res = rapid_ocr.recognize(crops)
+            text_score = pool.instances[0].text_score
+
+            for image_key, ocr_result, scale in zip(todo, split_ocr_results(detections, rec_res, text_score), scales):
+                self.ocr_cache[f"{opco}_{image_key}"] = scale_ocr_detections(ocr_result, scale)
+                logger.debug(f"Cached OCR for {image_key}")
+
+        return [self.ocr_cache[f"{opco}_{image_key}"] if image_key else [] for image_key in image_keys]
 
     def clear_cache(self):
         """Clear all caches - useful for memory management."""
         self.orientation_cache.clear()
+        self.orientation_margins.clear()
         self.image_cache.clear()
         self.ocr_cache.clear()
         self.face_detection_cache.clear()
+        self.pyramid_cache.clear()
+        self.image_sources.clear()
+        self.image_crop_factors.clear()
+        self.object_keys.clear()
         logger.info("All caches cleared")
 
-    def get_id_orientation(self, input_dict: Dict[str, str]) -> Dict[str, Any]:
+    @guarded_by_model_swap
+    def get_id_orientation(self, input_dict: Dict[str, Any]) -> Dict[str, Any]:
         """Get ID orientation - maintains original interface."""
         with ProcessingMetrics("get_id_orientation"):
             try:
-                front_image_path = input_dict.get("id_front_image")
-                back_image_path = input_dict.get("id_back_image")
+                opco = self._resolve_opco(input_dict)
+                self._wait_for_stage('id_orientation', opco)
+                front_image_key, back_image_key = self._load_input_images(
+                    input_dict, "id_front_image", "id_back_image"
+                )
 
-                front_orientation = self._get_cached_orientation(front_image_path) if front_image_path else None
-                back_orientation = self._get_cached_orientation(back_image_path) if back_image_path else None
+                front_orientation = self._get_cached_orientation(front_image_key, opco, front=True) if front_image_key else None
+                back_orientation = self._get_cached_orientation(back_image_key, opco) if back_image_key else None
 
                 return {
                     "id_orientation": {
@@ -573,7 +2176,7 @@ class IDProcessor:
                 logger.error(traceback.format_exc())
                 return {
                     "id_orientation": {
-                        "status": 0,
+                        "status": 503 if isinstance(e, ModelNotReadyError) else 0,
                         "message": f"Error processing: {str(e)}",
                         "result": {
                             "id_front_orientation": None,
@@ -582,16 +2185,21 @@ class IDProcessor:
                     }
                 }
 
-    def get_id_quality(self, input_dict: Dict[str, str]) -> Dict[str, Any]:
+    @guarded_by_model_swap
+    def get_id_quality(self, input_dict: Dict[str, Any]) -> Dict[str, Any]:
         """Get ID quality - maintains original interface."""
         with ProcessingMetrics("get_id_quality"):
             try:
-                cfg = self.config[self.opco]['models']['id_quality']
-                front_image_path = input_dict.get("id_front_image")
+                opco = self._resolve_opco(input_dict)
+                self._wait_for_stage('id_quality', opco)
+                cfg = self.config[opco]['models']['id_quality']
+                front_image_key = self._load_input_image(input_dict, "id_front_image")
+                if not front_image_key:
+                    raise ImageProcessingError("Image path is missing.")
+                self._get_cached_orientation(front_image_key, opco, front=True)
 
                 # Use cached face detection result
-                bbox, _ = self._get_cached_face_detection(front_image_path)
-                uprighted_image = self._get_cached_uprighted_image(front_image_path)
+                bbox, _ = self._get_cached_face_detection(front_image_key, opco)
 
                 # Default score for cases where no face is detected
                 import random
@@ -602,13 +2210,15 @@ class IDProcessor:
 
                     # Validate bounding box
                     if x_max > x_min and y_max > y_min:
-                        face_crop = uprighted_image[y_min:y_max, x_min:x_max]
+                        face_crop = self._get_full_resolution_crop(
+                            front_image_key, opco, (x_min, y_min, x_max, y_max)
+                        )
 
                         if face_crop.size > 0:
                             # Quality model uses normalization (Document 3 logic)
-                            face_input = preprocess_image(face_crop, cfg['img_size'], normalize=True)
-                            model = self._get_model('id_quality')
-                            prediction = model.predict(face_input, verbose=0)
+                            face_input = preprocess_image(face_crop, cfg['img_size'], normalize=True, reuse_buffer=True)
+                            with self._get_model('id_quality', opco).checkout() as model:
+                                prediction = model.predict(face_input, verbose=0)
                             _, good_score = tf.nn.softmax(prediction).numpy()[0]
                             score = float(good_score)
 
@@ -625,20 +2235,24 @@ class IDProcessor:
                 logger.error(traceback.format_exc())
                 return {
                     "id_quality": {
-                        "status": 0,
+                        "status": 503 if isinstance(e, ModelNotReadyError) else 0,
                         "message": f"Error processing: {str(e)}",
                         "result": {"score": None}
                     }
                 }
 
-    def get_id_type(self, input_dict: Dict[str, str]) -> Dict[str, Any]:
+    @guarded_by_model_swap
+    def get_id_type(self, input_dict: Dict[str, Any]) -> Dict[str, Any]:
         """Get ID type with support for classifier, OCR, or hybrid detection."""
         with ProcessingMetrics("get_id_type"):
             try:
-                cfg = self.config[self.opco]['models']['id_type']
-                front_image = input_dict.get("id_front_image")
+                opco = self._resolve_opco(input_dict)
+                self._wait_for_stage('id_type', opco)
+                cfg = self.config[opco]['models']['id_type']
+                front_image = self._load_input_image(input_dict, "id_front_image")
                 if not front_image:
                     raise ValueError("Front image path is required")
+                self._get_cached_orientation(front_image, opco, front=True)
 
                 detection_method = cfg.get('detection_method', 'classifier')
                 if detection_method not in ['classifier', 'ocr', 'hybrid']:
@@ -649,19 +2263,17 @@ class IDProcessor:
                 if detection_method == 'classifier':
                     classifier_cfg = cfg.get('classifier') or \
                         (_ for _ in ()).throw(ConfigurationError("Classifier config missing"))
-                    image_input = preprocess_image(
-                        self._get_cached_uprighted_image(front_image),
-                        cfg['img_size'], normalize=True
+                    prediction = self._predict_with_cascade(
+                        'id_type', self._get_cached_uprighted_image(front_image, opco), opco, normalize=True,
+                        pyramid=self._get_cached_pyramid(front_image, opco)
                     )
-                    model = self._get_model('id_type')
-                    prediction = model.predict(image_input, verbose=0)
                     probs = tf.nn.softmax(prediction).numpy()[0]
                     final_label = get_prediction_label(probs, classifier_cfg['target_labels'])
 
                 elif detection_method == 'ocr':
                     ocr_cfg = cfg.get('ocr') or \
                         (_ for _ in ()).throw(ConfigurationError("OCR config missing"))
-                    ocr_dets = self._get_cached_ocr(front_image)
+                    ocr_dets = self._get_cached_ocr(front_image, opco)
                     ocr_module = dynamic_import(ocr_cfg['field_extraction_module'])
                     if hasattr(ocr_module, 'get_id_type_by_ocr'):
                         final_label = ocr_module.get_id_type_by_ocr(ocr_dets)
@@ -674,7 +2286,7 @@ class IDProcessor:
                     ocr_cfg = cfg.get('ocr') or \
                         (_ for _ in ()).throw(ConfigurationError("OCR config missing"))
                     try:
-                        ocr_dets = self._get_cached_ocr(front_image)
+                        ocr_dets = self._get_cached_ocr(front_image, opco)
                         ocr_module = dynamic_import(ocr_cfg['field_extraction_module'])
                         if hasattr(ocr_module, 'get_id_type_by_ocr'):
                             final_label = ocr_module.get_id_type_by_ocr(ocr_dets)
@@ -690,12 +2302,10 @@ class IDProcessor:
                         classifier_cfg = cfg.get('classifier') or \
                             (_ for _ in ()).throw(ConfigurationError("Classifier config missing"))
                         try:
-                            image_input = preprocess_image(
-                                self._get_cached_uprighted_image(front_image),
-                                cfg['img_size'], normalize=True
+                            prediction = self._predict_with_cascade(
+                                'id_type', self._get_cached_uprighted_image(front_image, opco), opco, normalize=True,
+                                pyramid=self._get_cached_pyramid(front_image, opco)
                             )
-                            model = self._get_model('id_type')
-                            prediction = model.predict(image_input, verbose=0)
                             probs = tf.nn.softmax(prediction).numpy()[0]
                             final_label = get_prediction_label(probs, classifier_cfg['target_labels'])
                         except Exception as e:
@@ -714,29 +2324,34 @@ class IDProcessor:
                 logger.error(f"Error in get_id_type: {e}", exc_info=True)
                 return {
                     "id_type": {
-                        "status": 0,
+                        "status": 503 if isinstance(e, ModelNotReadyError) else 0,
                         "message": f"Error processing: {e}",
                         "result": {"labels": None}
                     }
                 }
 
-    def get_id_demographic_details(self, input_dict: Dict[str, str]) -> Dict[str, Any]:
+    @guarded_by_model_swap
+    def get_id_demographic_details(self, input_dict: Dict[str, Any]) -> Dict[str, Any]:
         """Get ID demographic details - maintains original interface."""
         with ProcessingMetrics("get_id_demographic_details"):
             try:
-                cfg = self.config[self.opco]['models']['id_demographics']
+                opco = self._resolve_opco(input_dict)
+                self._wait_for_stage('id_demographics', opco)
+                cfg = self.config[opco]['models']['id_demographics']
                 ocr_field_extraction = dynamic_import(cfg['ocr_field_extraction'])
                 OCRFieldNames = dynamic_import(cfg['ocr_field_names'])
 
-                front_image_path = input_dict.get("id_front_image")
-                back_image_path = input_dict.get("id_back_image")
+                front_image_key, back_image_key = self._load_input_images(
+                    input_dict, "id_front_image", "id_back_image"
+                )
 
                 # Use cached OCR results
-                detections_front = self._get_cached_ocr(front_image_path) if front_image_path else []
-                detections_back = self._get_cached_ocr(back_image_path) if back_image_path else []
+                if front_image_key:
+                    self._get_cached_orientation(front_image_key, opco, front=True)
+                detections_front, detections_back = self._get_cached_ocr_batch([front_image_key, back_image_key], opco)
 
                 # Still need original front image for field extraction
-                front_img = self._get_cached_image(front_image_path) if front_image_path else None
+                front_img = self._get_cached_image(front_image_key) if front_image_key else None
 
                 extracted_fields = ocr_field_extraction(detections_front, detections_back, front_img)
                 result = process_ocr_fields(extracted_fields, OCRFieldNames)
@@ -764,7 +2379,7 @@ class IDProcessor:
 
                 return {
                     "demographicDetails": {
-                        "status": 0,
+                        "status": 503 if isinstance(e, ModelNotReadyError) else 0,
                         "message": f"Error processing: {str(e)}",
                         "result": empty_result
                     }
@@ -776,22 +2391,22 @@ _processor = IDProcessor()
 
 
 # Expose methods that maintain exact same interface as original code
-def get_id_orientation(input_dict: Dict[str, str]) -> Dict[str, Any]:
+def get_id_orientation(input_dict: Dict[str, Any]) -> Dict[str, Any]:
     """Get ID orientation - maintains original interface."""
     return _processor.get_id_orientation(input_dict)
 
 
-def get_id_quality(input_dict: Dict[str, str]) -> Dict[str, Any]:
+def get_id_quality(input_dict: Dict[str, Any]) -> Dict[str, Any]:
     """Get ID quality - maintains original interface."""
     return _processor.get_id_quality(input_dict)
 
 
-def get_id_type(input_dict: Dict[str, str]) -> Dict[str, Any]:
+def get_id_type(input_dict: Dict[str, Any]) -> Dict[str, Any]:
     """Get ID type - maintains original interface."""
     return _processor.get_id_type(input_dict)
 
 
-def get_id_demographic_details(input_dict: Dict[str, str]) -> Dict[str, Any]:
+def get_id_demographic_details(input_dict: Dict[str, Any]) -> Dict[str, Any]:
     """Get ID demographic details - maintains original interface."""
     return _processor.get_id_demographic_details(input_dict)
 
@@ -801,6 +2416,11 @@ def clear_cache() -> None:
     _processor.clear_cache()
 
 
+def check_model_updates() -> List[str]:
+    """Reload changed models now instead of waiting for the next poll."""
+    return _processor.check_model_updates()
+
+
 # Health check function
 def health_check() -> Dict[str, Any]:
     """Perform system health check."""
@@ -812,7 +2432,16 @@ def health_check() -> Dict[str, Any]:
             "overall_status": "healthy",
             "timestamp": time.time(),
             "opco": _processor.opco,
+            "multi_tenant": _processor.multi_tenant_config.get('enabled', False),
+            "cpu_allocation": _processor.cpu_allocation,
+            "engine_pools": _processor.get_pool_stats(),
+            "classifier_format": _processor.classifier_config.get('format', 'savedmodel'),
+            "tenants": {opco: tenant["ready"] for opco, tenant in _processor.tenants.items()},
             "initialized": _processor.initialized,
+            "ready": _processor.ready,
+            "component_status": _processor.get_component_status(),
+            "load_timings": _processor.load_timings,
+            "warmup_timings": _processor.warmup_timings,
             "models_directory_exists": models_dir.exists(),
             "expected_model_dirs": {
                 dir_name: (models_dir / dir_name).exists() 
@@ -820,11 +2449,22 @@ def health_check() -> Dict[str, Any]:
             },
             "minio_available": _processor.model_downloader is not None,
             "cached_models": list(_processor.model_cache.keys()),
+            "model_versions": dict(_processor.model_versions),
+            "upload_stats": _processor.upload_stats,
+            "orientation_stats": {
+                opco: {**stats, "bypass_rate": round(stats["classifier_bypassed"] / stats["front_total"], 4) if stats["front_total"] else None}
+                for opco, stats in _processor.orientation_stats.items()
+            },
+            "cascade_stats": {
+                key: {**stats, "full_pass_rate": round(stats["full_pass"] / stats["total"], 4) if stats["total"] else None}
+                for key, stats in _processor.cascade_stats.items()
+            },
             "cache_stats": {
                 "orientation_cache": len(_processor.orientation_cache),
                 "image_cache": len(_processor.image_cache),
                 "ocr_cache": len(_processor.ocr_cache),
-                "face_detection_cache": len(_processor.face_detection_cache)
+                "face_detection_cache": len(_processor.face_detection_cache),
+                "pyramid_cache": len(_processor.pyramid_cache)
             }
         }
 
@@ -1,6 +1,8 @@
 import numpy as np
-import onnxruntime
 import cv2
+from onnxruntime.capi.onnxruntime_pybind11_state import Fail, InvalidArgument, RuntimeException
+
+from src.ort_session import create_inference_session
 
 def softmax(z):
     assert len(z.shape) == 2
@@ -18,33 +20,36 @@ def distance2bbox(points, distance, max_shape=None):
     x2 = points[:, 0] + distance[:, 2]
     y2 = points[:, 1] + distance[:, 3]
     if max_shape is not None:
-        x1 = x1.clamp(min=0, max=max_shape[1])
-        y1 = y1.clamp(min=0, max=max_shape[0])
-        x2 = x2.clamp(min=0, max=max_shape[1])
-        y2 = y2.clamp(min=0, max=max_shape[0])
+        x1 = np.clip(x1, 0, max_shape[1])
+        y1 = np.clip(y1, 0, max_shape[0])
+        x2 = np.clip(x2, 0, max_shape[1])
+        y2 = np.clip(y2, 0, max_shape[0])
     return np.stack([x1, y1, x2, y2], axis=-1)
 
 
 def distance2kps(points, distance, max_shape=None):
-    preds = []
-    for i in range(0, distance.shape[1], 2):
-        px = points[:, i%2] + distance[:, i]
-        py = points[:, i%2+1] + distance[:, i+1]
-        if max_shape is not None:
-            px = px.clamp(min=0, max=max_shape[1])
-            py = py.clamp(min=0, max=max_shape[0])
-        preds.append(px)
-        preds.append(py)
-    return np.stack(preds, axis=-1)
+    # Every (x, y) offset pair is relative to the anchor center
+    preds = (points[:, np.newaxis, :] + distance.reshape(distance.shape[0], distance.shape[1] // 2, 2)).reshape(distance.shape)
+    if max_shape is not None:
+        preds[:, 0::2] = np.clip(preds[:, 0::2], 0, max_shape[1])
+        preds[:, 1::2] = np.clip(preds[:, 1::2], 0, max_shape[0])
+    return preds
 
 
 class RetinaFaceDetectionONNX:
-    def __init__(self):
-        self.model_path = './models/idImage/retinaface_detector/detection.onnx'
-        self.session = onnxruntime.InferenceSession(self.model_path, None)
+    def __init__(self, model_path='./models/idImage/retinaface_detector/detection.onnx', session_config=None):
+        self.model_path = model_path
+        self.session = create_inference_session(self.model_path, session_config)
         self.center_cache = {}
+        # Input canvases and blobs reused across calls; a pool hands an instance to one thread at a time
+        self.canvas_buffers = {}
+        self.blob_buffers = {}
+        # Shapes kept in each of them; other shapes get a one-off buffer
+        self.max_buffers = 8
         self.nms_thresh = 0.4
         self.det_thresh = 0.5
+        # Candidates kept for NMS, highest scores first; 0 keeps all
+        self.pre_nms_topk = 200
         self._init_vars()
 
     def _init_vars(self):
@@ -69,55 +74,89 @@ class RetinaFaceDetectionONNX:
             self._num_anchors = 1
         self.use_kps = len(outputs) in [9, 15]
 
+        # Batched exports keep a leading batch axis on every output; insightface's
+        # default export has a fixed batch of 1 and flat (K, C) outputs
+        input_batch = input_cfg.shape[0]
+        self.batched_outputs = len(outputs[0].shape) == 3
+        self.supports_batch = self.batched_outputs and not (isinstance(input_batch, int) and input_batch == 1)
+        if self.supports_batch:
+            self.supports_batch = self.probe_batch(input_cfg.shape)
+
+        # Anchor grids for the configured input size, built once
+        for stride in self._feat_stride_fpn:
+            self.get_anchor_centers(self.input_size[1] // stride, self.input_size[0] // stride, stride)
+
+    def probe_batch(self, input_shape):
+        """Run two blank images once; a declared batch axis some node cannot take fails here, not on a request."""
+        height, width = (dim if isinstance(dim, int) else side
+                         for dim, side in zip(input_shape[2:], (self.input_size[1], self.input_size[0])))
+        try:
+            self.session.run(self.output_names, {self.input_name : np.zeros((2, 3, height, width), dtype=np.float32)})
+        except (Fail, InvalidArgument, RuntimeException):
+            return False
+        return True
+
+    def get_anchor_centers(self, height, width, stride):
+        key = (height, width, stride)
+        if key in self.center_cache:
+            return self.center_cache[key]
+        anchor_centers = np.stack(np.mgrid[:height, :width][::-1], axis=-1).astype(np.float32)
+        anchor_centers = (anchor_centers * stride).reshape( (-1, 2) )
+        if self._num_anchors>1:
+            anchor_centers = np.stack([anchor_centers]*self._num_anchors, axis=1).reshape( (-1,2) )
+        if len(self.center_cache)<100:
+            self.center_cache[key] = anchor_centers
+        return anchor_centers
+
+    def run_session(self, img):
+        blob = self.prepare_blob(img)
+        net_outs = self.session.run(self.output_names, {self.input_name : blob})
+        if self.batched_outputs:
+            net_outs = [out[0] for out in net_outs]
+        return net_outs
+
     def forward(self, img, threshold):
+        net_outs = self.run_session(img)
+        return self.decode_outputs(net_outs, img.shape[0], img.shape[1], threshold)
+
+    def decode_outputs(self, net_outs, input_height, input_width, threshold):
         scores_list = []
         bboxes_list = []
         kpss_list = []
-        input_size = tuple(img.shape[0:2][::-1])
-        blob = cv2.dnn.blobFromImage(img, 1.0/self.input_std, input_size, 
-                                     (self.input_mean, self.input_mean, self.input_mean), swapRB=True)
-        net_outs = self.session.run(self.output_names, {self.input_name : blob})
-
-        input_height = blob.shape[2]
-        input_width = blob.shape[3]
         fmc = self.fmc
         for idx, stride in enumerate(self._feat_stride_fpn):
             scores = net_outs[idx]
-            bbox_preds = net_outs[idx+fmc]
-            bbox_preds = bbox_preds * stride
-            if self.use_kps:
-                kps_preds = net_outs[idx+fmc*2] * stride
-            height = input_height // stride
-            width = input_width // stride
-            K = height * width
-            key = (height, width, stride)
-            if key in self.center_cache:
-                anchor_centers = self.center_cache[key]
-            else:
-                anchor_centers = np.stack(np.mgrid[:height, :width][::-1], axis=-1).astype(np.float32)
-                anchor_centers = (anchor_centers * stride).reshape( (-1, 2) )
-                if self._num_anchors>1:
-                    anchor_centers = np.stack([anchor_centers]*self._num_anchors, axis=1).reshape( (-1,2) )
-                if len(self.center_cache)<100:
-                    self.center_cache[key] = anchor_centers
+            anchor_centers = self.get_anchor_centers(input_height // stride, input_width // stride, stride)
 
+            # Only anchors above the threshold are decoded
             pos_inds = np.where(scores>=threshold)[0]
-            bboxes = distance2bbox(anchor_centers, bbox_preds)
-            pos_scores = scores[pos_inds]
-            pos_bboxes = bboxes[pos_inds]
-            scores_list.append(pos_scores)
-            bboxes_list.append(pos_bboxes)
+            pos_centers = anchor_centers[pos_inds]
+            scores_list.append(scores[pos_inds])
+            bboxes_list.append(distance2bbox(pos_centers, net_outs[idx+fmc][pos_inds] * stride))
             if self.use_kps:
-                kpss = distance2kps(anchor_centers, kps_preds)
-                kpss = kpss.reshape( (kpss.shape[0], -1, 2) )
-                pos_kpss = kpss[pos_inds]
-                kpss_list.append(pos_kpss)
+                kpss = distance2kps(pos_centers, net_outs[idx+fmc*2][pos_inds] * stride)
+                kpss_list.append(kpss.reshape( (kpss.shape[0], kpss.shape[1] // 2, 2) ))
         return scores_list, bboxes_list, kpss_list
 
-    def detect_faces(self, img, input_size=None, max_num=0, metric='default'):
-        assert input_size is not None or self.input_size is not None
-        input_size = self.input_size if input_size is None else input_size
-            
+    def prepare_blob(self, img):
+        """Same as blobFromImage with swapRB, written into a reused NCHW buffer.
+
+        Accepts one HWC image or an NHWC batch of equally sized images.
+        """
+        imgs = img[np.newaxis] if img.ndim == 3 else img
+        batch, height, width = imgs.shape[:3]
+        blob = self.blob_buffers.get((batch, height, width))
+        if blob is None:
+            blob = np.empty((batch, 3, height, width), dtype=np.float32)
+            if len(self.blob_buffers)<self.max_buffers:
+                self.blob_buffers[(batch, height, width)] = blob
+        for channel in range(3):
+            np.subtract(imgs[..., 2 - channel], np.float32(self.input_mean), out=blob[:, channel], casting='unsafe')
+        blob *= np.float32(1.0 / self.input_std)
+        return blob
+
+    def letterbox_into(self, det_img, img, input_size):
+        """Resize img into the top-left of a canvas, zero the padding and return the scale."""
         im_ratio = float(img.shape[0]) / img.shape[1]
         model_ratio = float(input_size[1]) / input_size[0]
         if im_ratio>model_ratio:
@@ -126,16 +165,96 @@ class RetinaFaceDetectionONNX:
         else:
             new_width = input_size[0]
             new_height = int(new_width * im_ratio)
-        det_scale = float(new_height) / img.shape[0]
-        resized_img = cv2.resize(img, (new_width, new_height))
-        det_img = np.zeros( (input_size[1], input_size[0], 3), dtype=np.uint8 )
-        det_img[:new_height, :new_width, :] = resized_img
+        cv2.resize(img, (new_width, new_height), dst=det_img[:new_height, :new_width])
+        det_img[new_height:, :] = 0
+        det_img[:new_height, new_width:] = 0
+        return float(new_height) / img.shape[0]
+
+    def get_canvas(self, input_size, batch=None):
+        """Reused letterbox canvas for one image, or an NHWC canvas for a batch."""
+        key = (batch, input_size)
+        if key in self.canvas_buffers:
+            return self.canvas_buffers[key]
+        shape = (input_size[1], input_size[0], 3) if batch is None else (batch, input_size[1], input_size[0], 3)
+        canvas = np.zeros(shape, dtype=np.uint8)
+        if len(self.canvas_buffers)<self.max_buffers:
+            self.canvas_buffers[key] = canvas
+        return canvas
+
+    def detect_faces(self, img, input_size=None, max_num=0, metric='default'):
+        assert input_size is not None or self.input_size is not None
+        input_size = self.input_size if input_size is None else input_size
+
+        det_img = self.get_canvas(input_size)
+        det_scale = self.letterbox_into(det_img, img, input_size)
 
         scores_list, bboxes_list, kpss_list = self.forward(det_img, self.det_thresh)
+        return self.postprocess(img, scores_list, bboxes_list, kpss_list, det_scale, max_num, metric)
+
+    def detect_primary_face(self, img, input_size=None, with_landmarks=False):
+        """Detect only the highest-scoring face, as the first row of detect_faces.
+
+        Greedy NMS never suppresses the top-scoring candidate, so the best anchor
+        above det_thresh is the answer and nothing else is decoded, sorted or
+        suppressed. Landmarks are decoded only when with_landmarks is set.
+        """
+        input_size = self.input_size if input_size is None else input_size
+
+        det_img = self.get_canvas(input_size)
+        det_scale = self.letterbox_into(det_img, img, input_size)
+        net_outs = self.run_session(det_img)
+
+        best_idx, best_row, best_score = None, None, None
+        for idx in range(self.fmc):
+            row = int(net_outs[idx].argmax())
+            score = net_outs[idx][row, 0]
+            if score >= self.det_thresh and (best_score is None or score > best_score):
+                best_idx, best_row, best_score = idx, row, score
+        if best_idx is None:
+            return None, None
+
+        stride = self._feat_stride_fpn[best_idx]
+        anchor_centers = self.get_anchor_centers(det_img.shape[0] // stride, det_img.shape[1] // stride, stride)
+        center = anchor_centers[best_row:best_row + 1]
+        bbox = distance2bbox(center, net_outs[best_idx + self.fmc][best_row:best_row + 1] * stride) / det_scale
+        det = np.hstack((bbox, [[best_score]])).astype(np.float32)
+        kpss = None
+        if with_landmarks and self.use_kps:
+            kpss = distance2kps(center, net_outs[best_idx + self.fmc * 2][best_row:best_row + 1] * stride)
+            kpss = kpss.reshape( (1, -1, 2) ) / det_scale
+        return det, kpss
 
+    def detect_faces_batch(self, images, input_size=None, max_num=0, metric='default'):
+        """Detect faces in several images with a single session run.
+
+        Images are letterboxed into one NCHW batch and the outputs are decoded per
+        image, giving the same (det, kpss) per image as detect_faces. Models exported
+        with a fixed batch of 1, or whose batch probe failed at load, fall back to
+        one run per image.
+        """
+        input_size = self.input_size if input_size is None else input_size
+        if not self.supports_batch or len(images) < 2:
+            return [self.detect_faces(img, input_size, max_num, metric) for img in images]
+
+        det_imgs = self.get_canvas(input_size, len(images))
+        det_scales = [self.letterbox_into(det_imgs[i], img, input_size) for i, img in enumerate(images)]
+        blob = self.prepare_blob(det_imgs)
+        net_outs = self.session.run(self.output_names, {self.input_name : blob})
+
+        results = []
+        for i, img in enumerate(images):
+            scores_list, bboxes_list, kpss_list = self.decode_outputs(
+                [out[i] for out in net_outs], blob.shape[2], blob.shape[3], self.det_thresh
+            )
+            results.append(self.postprocess(img, scores_list, bboxes_list, kpss_list, det_scales[i], max_num, metric))
+        return results
+
+    def postprocess(self, img, scores_list, bboxes_list, kpss_list, det_scale, max_num=0, metric='default'):
         scores = np.vstack(scores_list)
         scores_ravel = scores.ravel()
         order = scores_ravel.argsort()[::-1]
+        if self.pre_nms_topk > 0:
+            order = order[:self.pre_nms_topk]
         bboxes = np.vstack(bboxes_list) / det_scale
         if self.use_kps:
             kpss = np.vstack(kpss_list) / det_scale
@@ -170,31 +289,34 @@ class RetinaFaceDetectionONNX:
         return det, kpss
 
     def nms(self, dets):
+        """Greedy NMS over the top-k candidates.
+
+        The pairwise IoU matrix is computed once with numpy; the greedy pass that
+        suppresses overlaps of each kept box is still a Python loop, over at most
+        pre_nms_topk rows.
+        """
         thresh = self.nms_thresh
-        x1 = dets[:, 0]
-        y1 = dets[:, 1]
-        x2 = dets[:, 2]
-        y2 = dets[:, 3]
-        scores = dets[:, 4]
+        order = dets[:, 4].argsort()[::-1]
+        x1 = dets[order, 0]
+        y1 = dets[order, 1]
+        x2 = dets[order, 2]
+        y2 = dets[order, 3]
 
         areas = (x2 - x1 + 1) * (y2 - y1 + 1)
-        order = scores.argsort()[::-1]
-
-        keep = []
-        while order.size > 0:
-            i = order[0]
-            keep.append(i)
-            xx1 = np.maximum(x1[i], x1[order[1:]])
-            yy1 = np.maximum(y1[i], y1[order[1:]])
-            xx2 = np.minimum(x2[i], x2[order[1:]])
-            yy2 = np.minimum(y2[i], y2[order[1:]])
-
-            w = np.maximum(0.0, xx2 - xx1 + 1)
-            h = np.maximum(0.0, yy2 - yy1 + 1)
-            inter = w * h
-            ovr = inter / (areas[i] + areas[order[1:]] - inter)
-
-            inds = np.where(ovr <= thresh)[0]
-            order = order[inds + 1]
-
-        return keep
+        xx1 = np.maximum(x1[:, np.newaxis], x1[np.newaxis, :])
+        yy1 = np.maximum(y1[:, np.newaxis], y1[np.newaxis, :])
+        xx2 = np.minimum(x2[:, np.newaxis], x2[np.newaxis, :])
+        yy2 = np.minimum(y2[:, np.newaxis], y2[np.newaxis, :])
+
+        w = np.maximum(0.0, xx2 - xx1 + 1)
+        h = np.maximum(0.0, yy2 - yy1 + 1)
+        inter = w * h
+        ovr = inter / (areas[:, np.newaxis] + areas[np.newaxis, :] - inter)
+
+        # A box survives unless a higher-scoring survivor overlaps it
+        keep = np.ones(len(order), dtype=bool)
+        for i in range(len(order)):
+            if keep[i]:
+                keep[i + 1:] &= ovr[i, i + 1:] <= thresh
+
+        return order[keep]
@@ -1,64 +1,267 @@
+import copy
+import importlib.metadata
 import os
 import numpy as np
 import pathlib
-import tempfile
 import yaml
+from functools import lru_cache
 from rapidocr_onnxruntime import RapidOCR
+from rapidocr_onnxruntime.cal_rec_boxes import CalRecBoxes
+from rapidocr_onnxruntime.ch_ppocr_cls import TextClassifier
+from rapidocr_onnxruntime.ch_ppocr_det import TextDetector
+from rapidocr_onnxruntime.ch_ppocr_rec import TextRecognizer
+from rapidocr_onnxruntime.utils import LoadImage
+
+from src.ort_session import create_inference_session, get_session_config
+
+DEFAULT_CONFIG_PATH = os.path.join(pathlib.Path(__file__).parent.resolve(), "config.yml")
+CONFIG_SECTIONS = ('Global', 'Det', 'Cls', 'Rec')
+ENGINE_SESSIONS = {'Det': 'ocr_det', 'Cls': 'ocr_cls', 'Rec': 'ocr_rec'}
+# ConfiguredRapidOCR repeats RapidOCR.__init__ and swaps its engines' sessions as of this release
+SUPPORTED_RAPIDOCR_VERSION = '1.4.4'
+
+
+@lru_cache(maxsize=None)
+def _read_default_config():
+    with open(DEFAULT_CONFIG_PATH, 'r') as f:
+        return yaml.safe_load(f)
+
+
+def load_rapidocr_config(overrides=None, models_root=None):
+    """Bundled config.yml with per-section overrides, model paths made absolute.
+
+    Bundled model paths stay relative to the working directory (the default
+    models tree); a model_path given in overrides is resolved against models_root.
+    """
+    overrides = overrides or {}
+    config = copy.deepcopy(_read_default_config())
+    for section in CONFIG_SECTIONS:
+        config[section].update(overrides.get(section) or {})
+
+    current_dir = os.getcwd()
+    for section in ENGINE_SESSIONS:
+        overridden = 'model_path' in (overrides.get(section) or {})
+        root = models_root if overridden and models_root is not None else current_dir
+        config[section]['model_path'] = os.path.join(str(root), config[section]['model_path'])
+    return config
+
+
+class ConfiguredRapidOCR(RapidOCR):
+    """RapidOCR built from an in-memory config instead of a YAML file on disk.
+
+    RapidOCR.__init__ only reads its config from a file, so its body is repeated
+    here; that ties this class to SUPPORTED_RAPIDOCR_VERSION. With an ort_config
+    the det, cls and rec engines then get sessions from create_inference_session
+    with the shared ONNX Runtime options in place of the default ones they built.
+    """
+
+    def __init__(self, config, ort_config=None):
+        version = importlib.metadata.version('rapidocr_onnxruntime')
+        if version != SUPPORTED_RAPIDOCR_VERSION:
+            raise RuntimeError(
+                f"ConfiguredRapidOCR follows rapidocr_onnxruntime {SUPPORTED_RAPIDOCR_VERSION}, found {version}"
+            )
+
+        global_config = config["Global"]
+        self.print_verbose = global_config["print_verbose"]
+        self.text_score = global_config["text_score"]
+        self.min_height = global_config["min_height"]
+        self.width_height_ratio = global_config["width_height_ratio"]
+
+        self.use_det = global_config["use_det"]
+        self.text_det = TextDetector(config["Det"])
+
+        self.use_cls = global_config["use_cls"]
+        self.text_cls = TextClassifier(config["Cls"])
+
+        self.use_rec = global_config["use_rec"]
+        self.text_rec = TextRecognizer(config["Rec"])
+
+        self.load_img = LoadImage()
+        self.max_side_len = global_config["max_side_len"]
+        self.min_side_len = global_config["min_side_len"]
+
+        self.cal_rec_boxes = CalRecBoxes()
+
+        if ort_config is not None:
+            engine_sessions = {'Det': self.text_det.infer, 'Cls': self.text_cls.infer, 'Rec': self.text_rec.session}
+            for section, session_name in ENGINE_SESSIONS.items():
+                engine_sessions[section].session = create_inference_session(
+                    config[section]['model_path'], get_session_config(ort_config, session_name)
+                )
 
 
 class RapidOCRONNX:
 
-    def __init__(self) -> None:
+    def __init__(self, config=None, ort_config=None) -> None:
+        self.config = config if config is not None else load_rapidocr_config()
+        self.ort_config = ort_config
         self.load()
 
     def load(self):
-        # Get the original config path
-        original_config_path = os.path.join(pathlib.Path(__file__).parent.resolve(), "config.yml")
-        
-        # Read the original config
-        with open(original_config_path, 'r') as f:
-            config = yaml.safe_load(f)
-        
-        # Get the current working directory (where models folder is located)
-        current_dir = os.getcwd()
-        
-        # Update model paths to absolute paths
-        config['Det']['model_path'] = os.path.join(current_dir, config['Det']['model_path'])
-        config['Cls']['model_path'] = os.path.join(current_dir, config['Cls']['model_path'])
-        config['Rec']['model_path'] = os.path.join(current_dir, config['Rec']['model_path'])
-        
-        # Create temporary config file
-        self.temp_config_fd, self.temp_config_path = tempfile.mkstemp(suffix='.yml', text=True)
-        
+        self.rapid_ocr = ConfiguredRapidOCR(self.config, self.ort_config)
+
+    @property
+    def text_score(self) -> float:
+        return self.rapid_ocr.text_score
+
+    def detect(self, image: np.ndarray, use_det=None, use_cls=None):
+        """Det and cls stages of run: text line crops and their boxes in image coordinates, in reading order."""
+        return self.detect_batch([image], use_det=use_det, use_cls=use_cls)[0]
+
+    def detect_batch(self, images, max_padding=0.0, use_det=None, use_cls=None):
+        """detect() for several images, sharing det runs between images of similar size
+        (see detect_text_boxes) and running cls once over all of their crops.
+
+        use_det and use_cls override config.yml's Global switches for this call;
+        use_cls can also be a list with one switch (or None for the default) per
+        image. Without det, the whole preprocessed image is the only crop and its
+        box is the image outline.
+        """
+        ocr = self.rapid_ocr
+        use_det = ocr.use_det if use_det is None else use_det
+        if use_cls is None or isinstance(use_cls, bool):
+            use_cls = [use_cls] * len(images)
+        use_cls = [ocr.use_cls if flag is None else flag for flag in use_cls]
+
+        prepared = []
+        for image in images:
+            img, ratio_h, ratio_w = ocr.preprocess(image)
+            op_record = {"preprocess": {"ratio_h": ratio_h, "ratio_w": ratio_w}}
+            if use_det:
+                img, op_record = ocr.maybe_add_letterbox(img, op_record)
+            prepared.append((img, op_record, image.shape[:2]))
+
+        detections = []
+        if use_det:
+            all_boxes = self.detect_text_boxes([img for img, _, _ in prepared], max_padding)
+        else:
+            all_boxes = [None] * len(images)
+        for (img, op_record, (raw_h, raw_w)), dt_boxes in zip(prepared, all_boxes):
+            if not use_det:
+                outline = np.array([[0, 0], [raw_w, 0], [raw_w, raw_h], [0, raw_h]], dtype=np.float32)
+                detections.append(([img], [outline]))
+            elif dt_boxes is None:
+                detections.append(([], []))
+            else:
+                crops = ocr.get_crop_img_list(img, dt_boxes)
+                detections.append((crops, list(ocr._get_origin_points(dt_boxes, op_record, raw_h, raw_w))))
+
+        # cls resizes every crop to its own fixed-size input, so pooling them changes nothing
+        cls_crops = [crop for (crops, _), flag in zip(detections, use_cls) if flag for crop in crops]
+        if cls_crops:
+            cls_crops, _, _ = ocr.text_cls(cls_crops)
+            cls_detections = iter(split_pooled(cls_crops, [d for d, flag in zip(detections, use_cls) if flag]))
+            detections = [next(cls_detections) if flag else d for d, flag in zip(detections, use_cls)]
+        return detections
+
+    def detect_text_boxes(self, images, max_padding=0.0):
+        """Sorted DB text boxes per image (None when there are none), as RapidOCR's auto_text_det.
+
+        Images are resized and normalized by the det preprocessing one by one, then
+        grouped by input size: images of the same size always share a run, and with
+        max_padding > 0 an image also joins a larger group when the zero padding at its
+        bottom and right stays under that share of the group's input area. Each
+        probability map is cropped back to its image before post-processing, so boxes
+        map to every image's own shape; only padded images can differ slightly
+        along their bottom and right edges.
+        """
+        text_det = self.rapid_ocr.text_det
+        inputs = [text_det.get_preprocess(max(img.shape[:2]))(img) for img in images]
+        results = [None] * len(images)
+
+        for group in group_by_input_size([tensor.shape[2:] if tensor is not None else None for tensor in inputs],
+                                         max_padding):
+            height = max(inputs[i].shape[2] for i in group)
+            width = max(inputs[i].shape[3] for i in group)
+            batch = np.zeros((len(group), 3, height, width), dtype=np.float32)
+            for row, i in enumerate(group):
+                batch[row, :, :inputs[i].shape[2], :inputs[i].shape[3]] = inputs[i][0]
+            preds = text_det.infer(batch)[0]
+
+            for row, i in enumerate(group):
+                pred = preds[row:row + 1, :, :inputs[i].shape[2], :inputs[i].shape[3]]
+                ori_shape = images[i].shape[:2]
+                dt_boxes, _ = text_det.postprocess_op(pred, ori_shape)
+                dt_boxes = text_det.filter_tag_det_res(dt_boxes, ori_shape)
+                if len(dt_boxes) > 0:
+                    results[i] = self.rapid_ocr.sorted_boxes(dt_boxes)
+        return results
+
+    def recognize(self, crops, batch_size=None):
+        """Rec stage: (text, score) per crop. Crops of several images can go in one call;
+        they are sorted by aspect ratio and run batch_size at a time (rec_batch_num by default)."""
+        if not crops:
+            return []
+        text_rec = self.rapid_ocr.text_rec
+        rec_batch_num = text_rec.rec_batch_num
+        text_rec.rec_batch_num = batch_size or rec_batch_num
         try:
-            # Write the modified config to temp file
-            with os.fdopen(self.temp_config_fd, 'w') as temp_file:
-                yaml.dump(config, temp_file, default_flow_style=False)
-            
-            # Initialize RapidOCR with the temporary config
-            self.rapid_ocr = RapidOCR(self.temp_config_path)
-            
-        except Exception as e:
-            # Clean up temp file if initialization fails
-            self._cleanup_temp_config()
-            raise e
-
-    def _cleanup_temp_config(self):
-        """Clean up temporary config file"""
-        if hasattr(self, 'temp_config_path') and os.path.exists(self.temp_config_path):
-            try:
-                os.unlink(self.temp_config_path)
-            except:
-                pass  # Ignore cleanup errors
-
-    def run(self, image: np.ndarray) -> str:
-        """ Get id type detected using OCR logic """
-        ocr_detections, _ = self.rapid_ocr(image)
-        ocr_detections = [
-            [boxes, (text, float(score))] for boxes, text, score in ocr_detections
-        ]
-        return ocr_detections
-
-    def __del__(self):
-        """Cleanup when object is destroyed"""
-        self._cleanup_temp_config()
\ No newline at end of file
+            rec_res, _ = text_rec(crops)
+        finally:
+            text_rec.rec_batch_num = rec_batch_num
+        return [(res[0], float(res[1])) for res in rec_res]
+
+    def run(self, image: np.ndarray, use_det=None, use_cls=None, use_rec=None):
+        """ Get id type detected using OCR logic
+
+        use_det, use_cls and use_rec switch the stages for this call only, as in
+        RapidOCR; without rec only the boxes are returned.
+        """
+        return self.run_batch([image], use_det=use_det, use_cls=use_cls, use_rec=use_rec)[0]
+
+    def run_batch(self, images, batch_size=None, max_padding=0.0, use_det=None, use_cls=None, use_rec=None):
+        """run() for several images, detecting and recognizing their text lines in shared batches."""
+        detections = self.detect_batch(images, max_padding, use_det, use_cls)
+        if not (self.rapid_ocr.use_rec if use_rec is None else use_rec):
+            return [[box.tolist() for box in boxes] for _, boxes in detections]
+        rec_res = self.recognize([crop for crops, _ in detections for crop in crops], batch_size)
+        return split_ocr_results(detections, rec_res, self.text_score)
+
+
+def assemble_ocr_result(boxes, rec_res, text_score):
+    """Lines scoring at least text_score, as [box, (text, score)]; RapidOCR's own filter and format."""
+    return [
+        [box.tolist(), (text, score)] for box, (text, score) in zip(boxes, rec_res) if score >= text_score
+    ]
+
+
+def group_by_input_size(shapes, max_padding=0.0):
+    """Indices of (h, w) det input shapes grouped into shared batches, largest first; None shapes are left out.
+
+    An image joins the current group when it fits inside the group's input and
+    its padding stays within max_padding of that input's area.
+    """
+    order = sorted((i for i, shape in enumerate(shapes) if shape is not None),
+                   key=lambda i: (shapes[i][0] * shapes[i][1], tuple(shapes[i])), reverse=True)
+    groups = []
+    for i in order:
+        h, w = shapes[i]
+        if groups:
+            group_h, group_w = shapes[groups[-1][0]]
+            fits = h <= group_h and w <= group_w
+            if fits and ((h, w) == (group_h, group_w) or 1 - h * w / (group_h * group_w) <= max_padding):
+                groups[-1].append(i)
+                continue
+        groups.append([i])
+    return [sorted(group) for group in groups]
+
+
+def split_pooled(crops, detections):
+    """Hand crops that went through a pooled stage back to their (crops, boxes) detection."""
+    results = []
+    start = 0
+    for image_crops, boxes in detections:
+        results.append((crops[start:start + len(image_crops)], boxes))
+        start += len(image_crops)
+    return results
+
+
+def split_ocr_results(detections, rec_res, text_score):
+    """Hand the recognition results of pooled crops back to the (crops, boxes) detection they came from."""
+    results = []
+    start = 0
+    for crops, boxes in detections:
+        results.append(assemble_ocr_result(boxes, rec_res[start:start + len(crops)], text_score))
+        start += len(crops)
+    return results
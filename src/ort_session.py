@@ -0,0 +1,148 @@
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import onnxruntime
+
+logger = logging.getLogger(__name__)
+
+EXECUTION_MODES = {
+    'sequential': onnxruntime.ExecutionMode.ORT_SEQUENTIAL,
+    'parallel': onnxruntime.ExecutionMode.ORT_PARALLEL,
+}
+
+GRAPH_OPTIMIZATION_LEVELS = {
+    'disable': onnxruntime.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    'basic': onnxruntime.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    'extended': onnxruntime.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    'all': onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+# Session config entries that let an ORT-format model run straight from a read-only
+# file mapping, so every worker process shares the same page-cache copy of the weights
+MEMORY_MAPPED_ORT_ENTRIES = (
+    'session.use_memory_mapped_ort_model',
+    'session.use_ort_model_bytes_directly',
+    'session.use_ort_model_bytes_for_initializers',
+)
+
+# First release that reads session.use_memory_mapped_ort_model; older ones ignore it
+# and load the whole model into the heap
+MEMORY_MAP_MIN_VERSION = (1, 26)
+
+
+def get_ort_version() -> Tuple[int, int]:
+    """Major and minor version of the installed onnxruntime."""
+    major, minor = onnxruntime.__version__.split('.')[:2]
+    return int(major), int(minor)
+
+
+def get_session_config(ort_config: Optional[Dict[str, Any]], session_name: str) -> Dict[str, Any]:
+    """Merge the global onnxruntime settings with the overrides of one named session."""
+    ort_config = ort_config or {}
+    session_config = {key: value for key, value in ort_config.items() if key != 'sessions'}
+    session_config.update((ort_config.get('sessions') or {}).get(session_name) or {})
+    return session_config
+
+
+def build_session_options(session_config: Dict[str, Any]) -> onnxruntime.SessionOptions:
+    """Build SessionOptions from a session config; unset keys keep the ORT defaults."""
+    sess_options = onnxruntime.SessionOptions()
+    sess_options.log_severity_level = session_config.get('log_severity_level', 3)
+
+    # 0 lets ORT pick the thread count, -1 is accepted for rapidocr-style configs
+    if session_config.get('intra_op_num_threads', 0) > 0:
+        sess_options.intra_op_num_threads = session_config['intra_op_num_threads']
+    if session_config.get('inter_op_num_threads', 0) > 0:
+        sess_options.inter_op_num_threads = session_config['inter_op_num_threads']
+
+    if 'execution_mode' in session_config:
+        sess_options.execution_mode = EXECUTION_MODES[session_config['execution_mode']]
+    if 'graph_optimization_level' in session_config:
+        sess_options.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS[session_config['graph_optimization_level']]
+    if 'enable_cpu_mem_arena' in session_config:
+        sess_options.enable_cpu_mem_arena = session_config['enable_cpu_mem_arena']
+    if 'enable_mem_pattern' in session_config:
+        sess_options.enable_mem_pattern = session_config['enable_mem_pattern']
+
+    return sess_options
+
+
+def get_optimized_model_path(model_path: str, session_config: Dict[str, Any]) -> Optional[Path]:
+    """Location of the saved optimized graph for a model, or None when saving is off.
+
+    The name carries a hash of the model's resolved path, size and mtime: models
+    sharing a file name (each tenant's detection.onnx, OCR model overrides) get
+    their own graph, and a replaced model file gets a new one.
+    """
+    optimized_dir = session_config.get('optimized_model_dir')
+    source = Path(model_path).resolve()
+    if not optimized_dir or not source.is_file():
+        return None
+    stat = source.stat()
+    source_key = hashlib.sha1(f"{source}:{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:12]
+    level = session_config.get('graph_optimization_level', 'all')
+    model_format = session_config.get('model_format', 'onnx')
+    return Path(optimized_dir) / f"{source.stem}.{source_key}.{level}.{model_format}"
+
+
+def save_optimized_model(model_path: str, optimized_path: Path, session_config: Dict[str, Any]):
+    """Optimize a model once and write it to optimized_path.
+
+    The graph goes to a per-process temporary file first and is renamed into place,
+    so workers starting together never read a half-written file.
+    """
+    sess_options = build_session_options(session_config)
+    optimized_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = optimized_path.with_name(f"{optimized_path.name}.{os.getpid()}.tmp")
+    sess_options.optimized_model_filepath = str(temp_path)
+    if session_config.get('model_format', 'onnx') == 'ort':
+        sess_options.add_session_config_entry('session.save_model_format', 'ORT')
+
+    logger.info(f"Saving optimized graph to: {optimized_path}")
+    onnxruntime.InferenceSession(model_path, sess_options, providers=['CPUExecutionProvider'])
+    os.replace(temp_path, optimized_path)
+
+
+def create_inference_session(model_path: str, session_config: Optional[Dict[str, Any]] = None) -> onnxruntime.InferenceSession:
+    """Create an InferenceSession, reusing a saved optimized graph of the same model file.
+
+    On the first start the optimized graph is written to optimized_model_dir; every
+    session then loads it with graph optimization disabled. Graphs optimized at the
+    'all' level can contain hardware-specific kernels, so the directory must not be
+    shared across different CPU types.
+
+    With model_format 'ort' and memory_map enabled the saved model is mapped read-only
+    and its initializers are used in place instead of being copied to the heap. Weight
+    prepacking is turned off as well, since prepacked weights are private copies.
+    Mapping needs onnxruntime 1.26 or later; older releases log a warning and load
+    the model into memory.
+    """
+    session_config = session_config or {}
+    sess_options = build_session_options(session_config)
+    providers = session_config.get('providers', ['CPUExecutionProvider'])
+
+    load_path = model_path
+    optimized_path = get_optimized_model_path(model_path, session_config)
+    if optimized_path is not None:
+        if not optimized_path.exists():
+            save_optimized_model(model_path, optimized_path, session_config)
+        load_path = str(optimized_path)
+        sess_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_DISABLE_ALL
+        logger.info(f"Loading saved optimized graph: {optimized_path}")
+
+        if session_config.get('model_format', 'onnx') == 'ort':
+            sess_options.add_session_config_entry('session.load_model_format', 'ORT')
+            if session_config.get('memory_map', False):
+                if get_ort_version() < MEMORY_MAP_MIN_VERSION:
+                    logger.warning(
+                        f"memory_map needs onnxruntime >= {'.'.join(map(str, MEMORY_MAP_MIN_VERSION))}, "
+                        f"found {onnxruntime.__version__}; {optimized_path} is loaded into memory instead"
+                    )
+                for entry in MEMORY_MAPPED_ORT_ENTRIES:
+                    sess_options.add_session_config_entry(entry, '1')
+                sess_options.add_session_config_entry('session.disable_prepacking', '1')
+
+    return onnxruntime.InferenceSession(load_path, sess_options, providers=providers)
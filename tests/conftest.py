@@ -0,0 +1,297 @@
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+import yaml
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+
+@pytest.fixture(scope="session")
+def fi(tmp_path_factory):
+    """functionInterface imported from a scratch directory.
+
+    Importing the module starts the processor singleton, which reads ./config.yaml
+    and writes model caches under ./models, so it runs on a copy of config.yaml
+    outside the repository. Without model files every component fails to load,
+    which is fine for tests that only use the module's helpers.
+    """
+    pytest.importorskip("tensorflow")
+    pytest.importorskip("minio")
+    workdir = tmp_path_factory.mktemp("service")
+    shutil.copy(REPO_ROOT / "config.yaml", workdir / "config.yaml")
+    os.environ.setdefault("opco", "KE")
+    previous = os.getcwd()
+    os.chdir(workdir)
+    try:
+        import functionInterface
+        for event in list(functionInterface._processor.component_events.values()):
+            event.wait(60)
+        yield functionInterface
+    finally:
+        os.chdir(previous)
+
+
+# Where each classifier's SavedModel sits in an OPCO's models tree
+CLASSIFIER_DIRS = {'idUpright': 'id_orientation', 'idImage': 'id_quality', 'idType': 'id_type'}
+
+
+class FakeClassifier:
+    """Keras-like classifier returning fixed logits and recording the side of each input."""
+
+    def __init__(self, logits):
+        self.logits = np.array([logits], dtype=np.float32)
+        self.input_sizes = []
+
+    def predict(self, inputs, verbose=0):
+        self.input_sizes.append(inputs.shape[1])
+        if isinstance(self.logits, Exception):
+            raise self.logits
+        return self.logits
+
+
+class FakeFaceDetector:
+    """RetinaFaceDetectionONNX stand-in recording every call.
+
+    result is a (bbox, landmarks) pair, or a function of the image and input
+    size returning one; the default finds no face.
+    """
+
+    def __init__(self, result=(None, None)):
+        self.result = result
+        self.calls = []
+
+    def detect_primary_face(self, image, input_size=None, with_landmarks=False):
+        self.calls.append((image.shape[:2], input_size))
+        return self.result(image, input_size) if callable(self.result) else self.result
+
+
+class FakeOCR:
+    """RapidOCRONNX stand-in that reads no text and records the use_cls switches it gets."""
+
+    text_score = 0.5
+
+    def __init__(self):
+        self.use_cls = []
+
+    def run(self, image):
+        return []
+
+    def detect_batch(self, images, max_padding=0.0, use_det=None, use_cls=None):
+        self.use_cls.append(use_cls)
+        return [([], []) for _ in images]
+
+    def recognize(self, crops, batch_size=None):
+        return []
+
+
+def merge_config(config, overrides):
+    """Merge nested override dicts into a config in place."""
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(config.get(key), dict):
+            merge_config(config[key], value)
+        else:
+            config[key] = value
+    return config
+
+
+@pytest.fixture
+def classifier_loads():
+    """Model types load_classifier was asked for by processors built with make_processor."""
+    return []
+
+
+@pytest.fixture
+def make_processor(fi, tmp_path, monkeypatch, classifier_loads):
+    """Build a fresh IDProcessor on an edited copy of config.yaml, with fake engines.
+
+    Each OPCO loads synchronously without MinIO or hot reload. Classifiers come
+    from the classifiers dict by model type; a type left out fails to load, as a
+    missing SavedModel would. The processor also becomes the module's _processor,
+    so the module-level get_* functions and health_check go through it.
+    A face_detector or ocr_engine given as an exception fails that engine's load.
+    """
+
+    class FreshProcessor(fi.IDProcessor):
+        # A new instance per test instead of the module's singleton
+        def __new__(cls):
+            return object.__new__(cls)
+
+    def make(overrides=None, opco='KE', classifiers=None, face_detector=None, ocr_engine=None):
+        with open(REPO_ROOT / "config.yaml") as f:
+            config = yaml.safe_load(f)
+        for name, section in config.items():
+            if name != 'runtime':
+                section.pop('minio_config', None)
+                merge_config(section, {'loader': {'background': False}, 'hot_reload': {'enabled': False}})
+        merge_config(config, overrides or {})
+        with open(tmp_path / "config.yaml", "w") as f:
+            yaml.safe_dump(config, f)
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("opco", opco)
+
+        if classifiers is None:
+            classifiers = {
+                'id_orientation': FakeClassifier([8.0, 0.0, 0.0, 0.0]),
+                'id_quality': FakeClassifier([0.0, 8.0]),
+                'id_type': FakeClassifier([0.0, 8.0, 0.0, 0.0]),
+            }
+
+        def load_classifier(model_path, classifier_config=None):
+            model_type = next(CLASSIFIER_DIRS[part] for part in Path(model_path).parts if part in CLASSIFIER_DIRS)
+            classifier_loads.append(model_type)
+            if model_type not in classifiers:
+                raise fi.ModelLoadError(f"Failed to load model from {model_path}")
+            return classifiers[model_type]
+
+        def build(engine):
+            if isinstance(engine, Exception):
+                raise engine
+            return engine
+
+        face_detector = face_detector or FakeFaceDetector()
+        ocr_engine = ocr_engine or FakeOCR()
+        monkeypatch.setattr(fi, 'load_classifier', load_classifier)
+        monkeypatch.setattr(fi, 'RetinaFaceDetectionONNX', lambda **kwargs: build(face_detector))
+        monkeypatch.setattr(fi, 'RapidOCRONNX', lambda config, ort_config=None: build(ocr_engine))
+
+        processor = FreshProcessor()
+        monkeypatch.setattr(fi, '_processor', processor)
+        return processor
+
+    return make
+
+
+def encode_card(width=1010, height=640, colour=(235, 235, 235), ext='.png'):
+    """A plain encoded card image of the given size."""
+    image = np.full((height, width, 3), colour, dtype=np.uint8)
+    return cv2.imencode(ext, image)[1].tobytes()
+
+
+@pytest.fixture(scope="session")
+def make_scale_model():
+    """Write a one-node ONNX model that multiplies its (1, 4) input by a constant."""
+    onnx = pytest.importorskip("onnx")
+    from onnx import TensorProto, helper, numpy_helper
+
+    def make(path, factor):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        graph = helper.make_graph(
+            [helper.make_node('Mul', ['x', 'factor'], ['y'])], 'scale',
+            [helper.make_tensor_value_info('x', TensorProto.FLOAT, [1, 4])],
+            [helper.make_tensor_value_info('y', TensorProto.FLOAT, [1, 4])],
+            [numpy_helper.from_array(np.array([factor], dtype=np.float32), 'factor')]
+        )
+        model = helper.make_model(graph, opset_imports=[helper.make_opsetid('', 13)])
+        model.ir_version = 8
+        onnx.save(model, str(path))
+        return path
+
+    return make
+
+
+def write_toy_face_model(path, batched=False):
+    """Write a RetinaFace-shaped ONNX model with any input size that 'detects' red pixels.
+
+    Every anchor scores by the mean redness (R - G) of its stride cell and gets a
+    fixed box and landmark offset, so faces, scores and NMS ties are reproducible
+    from a drawn image. A batched model takes any batch size and keeps the batch
+    axis on its outputs; otherwise the batch is fixed at 1 with flat outputs.
+    """
+    onnx = pytest.importorskip("onnx")
+    from onnx import TensorProto, helper, numpy_helper
+
+    strides = [8, 16, 32]
+    initializers = [
+        numpy_helper.from_array(np.array([6.0], np.float32), 'gain'),
+        numpy_helper.from_array(np.array([-3.0], np.float32), 'bias'),
+        numpy_helper.from_array(np.array([0, -1, 1] if batched else [-1, 1], np.int64), 'column'),
+        numpy_helper.from_array(np.zeros((1,), np.float32), 'zero'),
+        numpy_helper.from_array(np.full((1, 4), 2.0, np.float32), 'box'),
+        numpy_helper.from_array(np.array([[-1, -1, 1, -1, 0, 0, -1, 1, 1, 1]], np.float32), 'kps'),
+        numpy_helper.from_array(np.array([1, -1, 0], np.float32).reshape(1, 3, 1, 1), 'redness'),
+        numpy_helper.from_array(np.array([1], np.int64), 'channels'),
+    ]
+    nodes = [
+        helper.make_node('Mul', ['input.1', 'redness'], ['weighted']),
+        helper.make_node('ReduceSum', ['weighted', 'channels'], ['red'], keepdims=1),
+    ]
+    for s in strides:
+        nodes += [
+            helper.make_node('AveragePool', ['red'], [f'pool{s}'], kernel_shape=[s, s], strides=[s, s]),
+            helper.make_node('Mul', [f'pool{s}', 'gain'], [f'gain{s}']),
+            helper.make_node('Add', [f'gain{s}', 'bias'], [f'logit{s}']),
+            helper.make_node('Sigmoid', [f'logit{s}'], [f'sigmoid{s}']),
+            helper.make_node('Reshape', [f'sigmoid{s}', 'column'], [f'cells{s}']),
+            # Two anchors per cell, as in the insightface export
+            helper.make_node('Concat', [f'cells{s}', f'cells{s}'], [f'pairs{s}'], axis=-1),
+            helper.make_node('Reshape', [f'pairs{s}', 'column'], [f'score_{s}']),
+            helper.make_node('Mul', [f'score_{s}', 'zero'], [f'zeros{s}']),
+            helper.make_node('Add', [f'zeros{s}', 'box'], [f'bbox_{s}']),
+            helper.make_node('Add', [f'zeros{s}', 'kps'], [f'kps_{s}']),
+        ]
+    widths = {'score': 1, 'bbox': 4, 'kps': 10}
+    batch_axis = ['batch'] if batched else []
+    outputs = [
+        helper.make_tensor_value_info(f'{kind}_{s}', TensorProto.FLOAT,
+                                      batch_axis + [f'anchors_{kind}_{s}', widths[kind]])
+        for kind in ['score', 'bbox', 'kps'] for s in strides
+    ]
+    graph = helper.make_graph(
+        nodes, 'toy_retinaface',
+        [helper.make_tensor_value_info('input.1', TensorProto.FLOAT,
+                                       ['batch' if batched else 1, 3, 'height', 'width'])],
+        outputs, initializers
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid('', 13)])
+    model.ir_version = 8
+    onnx.save(model, str(path))
+    return path
+
+
+@pytest.fixture(scope="session")
+def toy_face_model(tmp_path_factory):
+    """Toy RetinaFace export with a fixed batch of 1, see write_toy_face_model."""
+    return write_toy_face_model(tmp_path_factory.mktemp("toy_face") / "detection.onnx")
+
+
+@pytest.fixture(scope="session")
+def toy_batched_face_model(tmp_path_factory):
+    """Toy RetinaFace export with a dynamic batch axis, see write_toy_face_model."""
+    return write_toy_face_model(tmp_path_factory.mktemp("toy_face") / "detection_batched.onnx", batched=True)
+
+
+@pytest.fixture(scope="session")
+def ocr_config():
+    """RapidOCR config pointing at the det, cls and rec models shipped with rapidocr_onnxruntime."""
+    rapidocr = pytest.importorskip("rapidocr_onnxruntime")
+    from src.idOCR.rapidocr_onnx.rapidocr_onxx import load_rapidocr_config
+
+    overrides = {
+        # A max-side limit keeps the det inputs of the wide test images small
+        'Det': {'model_path': 'ch_PP-OCRv4_det_infer.onnx', 'limit_type': 'max', 'limit_side_len': 960},
+        'Cls': {'model_path': 'ch_ppocr_mobile_v2.0_cls_infer.onnx'},
+        'Rec': {'model_path': 'ch_PP-OCRv4_rec_infer.onnx'},
+    }
+    return load_rapidocr_config(overrides, Path(rapidocr.__file__).parent / 'models')
+
+
+@pytest.fixture(scope="session")
+def ocr_engine(ocr_config):
+    from src.idOCR.rapidocr_onnx.rapidocr_onxx import RapidOCRONNX
+
+    return RapidOCRONNX(ocr_config, ort_config={'intra_op_num_threads': 2})
+
+
+def draw_text_lines(lines, width=640, line_height=60):
+    """White image with each line printed in black, one under the other."""
+    image = np.full((line_height * (len(lines) + 1), width, 3), 255, dtype=np.uint8)
+    for i, line in enumerate(lines):
+        cv2.putText(image, line, (20, line_height * (i + 1)), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 2, cv2.LINE_AA)
+    return image
@@ -0,0 +1,60 @@
+from conftest import FakeClassifier, encode_card
+
+NATIONAL_ID = [0.0, 8.0, 0.0, 0.0]
+PASSPORT = [0.0, 0.0, 0.0, 8.0]
+
+
+class SizedClassifier(FakeClassifier):
+    """The same model answering differently at the cascade's low resolution."""
+
+    def __init__(self, low_res_logits, logits):
+        super().__init__(logits)
+        self.low_res = FakeClassifier(low_res_logits)
+
+    def predict(self, inputs, verbose=0):
+        if inputs.shape[1] == 120:
+            self.input_sizes.append(120)
+            return self.low_res.predict(inputs)
+        return super().predict(inputs)
+
+
+def get_id_type(fi, make_processor, id_type, enabled=True):
+    make_processor({'KE': {'warmup': {'enabled': False}, 'models': {'id_type': {
+        'detection_method': 'classifier',
+        'cascade': {'enabled': enabled, 'img_size': 120, 'margin_threshold': 0.5},
+    }}}}, classifiers={'id_orientation': FakeClassifier([8.0, 0.0, 0.0, 0.0]), 'id_type': id_type})
+    result = fi.get_id_type({'id_front_image': encode_card()})['id_type']
+    assert result['status'] == 200
+    return result['result']['labels']
+
+
+def test_confident_low_resolution_pass_skips_the_full_pass(fi, make_processor):
+    id_type = SizedClassifier(PASSPORT, NATIONAL_ID)
+
+    assert get_id_type(fi, make_processor, id_type) == "Passport"
+    assert id_type.input_sizes == [120]
+    assert fi.health_check()['cascade_stats'] == {'KE_id_type': {'total': 1, 'full_pass': 0, 'full_pass_rate': 0.0}}
+
+
+def test_unsure_low_resolution_pass_runs_the_full_pass(fi, make_processor):
+    id_type = SizedClassifier([0.0, 1.0, 0.0, 1.0], NATIONAL_ID)
+
+    assert get_id_type(fi, make_processor, id_type) == "National ID"
+    assert id_type.input_sizes == [120, 480]
+    assert fi.health_check()['cascade_stats']['KE_id_type'] == {'total': 1, 'full_pass': 1, 'full_pass_rate': 1.0}
+
+
+def test_failed_low_resolution_pass_falls_back_to_the_full_pass(fi, make_processor):
+    id_type = SizedClassifier(PASSPORT, NATIONAL_ID)
+    id_type.low_res.logits = ValueError("fixed input shape")
+
+    assert get_id_type(fi, make_processor, id_type) == "National ID"
+    assert fi.health_check()['cascade_stats']['KE_id_type']['full_pass'] == 1
+
+
+def test_disabled_cascade_runs_only_the_full_pass(fi, make_processor):
+    id_type = SizedClassifier(PASSPORT, NATIONAL_ID)
+
+    assert get_id_type(fi, make_processor, id_type, enabled=False) == "National ID"
+    assert id_type.input_sizes == [480]
+    assert fi.health_check()['cascade_stats'] == {}
@@ -0,0 +1,42 @@
+import cv2
+
+
+def test_cpu_sets_accept_ranges_and_single_cores(fi):
+    assert fi.parse_cpu_set("0-3,6") == [0, 1, 2, 3, 6]
+    assert fi.parse_cpu_set("5") == [5]
+    assert fi.parse_cpu_set(" 1 , 2-3 ,") == [1, 2, 3]
+
+
+def test_disabled_budget_changes_nothing(fi):
+    assert fi.apply_cpu_budget({}) == {"enabled": False}
+
+
+def test_budget_splits_the_cores_between_runtimes(fi):
+    opencv_threads = cv2.getNumThreads()
+    try:
+        allocation = fi.apply_cpu_budget({
+            'enabled': True,
+            'total_cores': 8,
+            'tensorflow': {'share': 0.25, 'inter_op_threads': 2},
+            'onnxruntime': {'share': 0.5},
+            'opencv': {'threads': 1},
+        })
+    finally:
+        cv2.setNumThreads(opencv_threads)
+
+    assert allocation["cores"] == 8
+    assert allocation["tensorflow"]["intra_op_threads"] == 2
+    assert allocation["tensorflow"]["inter_op_threads"] == 2
+    assert allocation["onnxruntime"] == {"intra_op_num_threads": 4, "inter_op_num_threads": 1}
+    assert allocation["opencv"] == {"threads": 1}
+
+
+def test_every_runtime_gets_at_least_one_thread(fi):
+    opencv_threads = cv2.getNumThreads()
+    try:
+        allocation = fi.apply_cpu_budget({'enabled': True, 'total_cores': 1, 'tensorflow': {'share': 0.1}})
+    finally:
+        cv2.setNumThreads(opencv_threads)
+
+    assert allocation["tensorflow"]["intra_op_threads"] == 1
+    assert allocation["onnxruntime"]["intra_op_num_threads"] == 1
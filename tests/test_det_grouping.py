@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from conftest import draw_text_lines
+
+pytest.importorskip("rapidocr_onnxruntime")
+from src.idOCR.rapidocr_onnx.rapidocr_onxx import group_by_input_size, split_pooled  # noqa: E402
+
+
+def test_equal_shapes_always_share_a_run():
+    assert group_by_input_size([(736, 960), (640, 960), (736, 960), None]) == [[0, 2], [1]]
+
+
+def test_smaller_inputs_join_while_their_padding_stays_under_the_limit():
+    shapes = [(640, 960), (736, 960), (704, 960), (320, 480)]
+
+    # 704x960 pads 4% of 736x960, 640x960 pads 13%, 320x480 pads 78%
+    assert group_by_input_size(shapes, max_padding=0.05) == [[1, 2], [0], [3]]
+    assert group_by_input_size(shapes, max_padding=0.15) == [[0, 1, 2], [3]]
+    assert group_by_input_size(shapes, max_padding=0.0) == [[1], [2], [0], [3]]
+
+
+def test_inputs_that_do_not_fit_start_their_own_run():
+    # Same area, but neither fits inside the other
+    assert group_by_input_size([(960, 640), (640, 960)], max_padding=0.5) == [[0], [1]]
+
+
+def test_pooled_crops_go_back_to_their_detection():
+    front_boxes, back_boxes = [np.zeros((4, 2))] * 2, [np.ones((4, 2))]
+    detections = [(["a", "b"], front_boxes), ([], []), (["c"], back_boxes)]
+
+    split = split_pooled(["A", "B", "C"], detections)
+
+    assert [crops for crops, _ in split] == [["A", "B"], [], ["C"]]
+    assert split[0][1] is front_boxes and split[2][1] is back_boxes
+
+
+def test_shared_det_run_finds_the_boxes_of_separate_runs(ocr_engine):
+    images = [
+        draw_text_lines(["IDENTITY CARD", "SURNAME SAMPLE"]),
+        draw_text_lines(["GIVEN NAMES JOHN", "DATE OF BIRTH"]),
+        np.full((180, 640, 3), 255, dtype=np.uint8),
+        draw_text_lines(["ID NO 000000000"], width=480),
+    ]
+
+    shared = ocr_engine.detect_text_boxes(images)
+    separate = [ocr_engine.detect_text_boxes([image])[0] for image in images]
+
+    assert shared[2] is None and separate[2] is None
+    for boxes, expected in zip(shared, separate):
+        if expected is not None:
+            np.testing.assert_allclose(np.array(boxes), np.array(expected))
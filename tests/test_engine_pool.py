@@ -0,0 +1,61 @@
+import threading
+
+import pytest
+
+
+def test_checkout_lends_each_instance_to_one_caller(fi):
+    created = []
+
+    def factory():
+        created.append(object())
+        return created[-1]
+
+    pool = fi.EnginePool('engine', factory, 2, checkout_timeout=0.05)
+
+    with pool.checkout() as first, pool.checkout() as second:
+        assert {id(first), id(second)} == {id(instance) for instance in created}
+        assert pool.get_stats() == {"size": 2, "available": 0}
+    assert pool.get_stats() == {"size": 2, "available": 2}
+
+
+def test_exhausted_pool_answers_not_ready(fi):
+    pool = fi.EnginePool('engine', object, 1, checkout_timeout=0.05)
+
+    with pool.checkout():
+        with pytest.raises(fi.EnginePoolExhaustedError) as error:
+            with pool.checkout():
+                pass
+    # Public methods turn ModelNotReadyError into a 503
+    assert isinstance(error.value, fi.ModelNotReadyError)
+
+
+def test_instance_returns_to_the_pool_when_the_caller_fails(fi):
+    pool = fi.EnginePool('engine', object, 1, checkout_timeout=0.05)
+
+    with pytest.raises(RuntimeError):
+        with pool.checkout():
+            raise RuntimeError("inference failed")
+    assert pool.get_stats()["available"] == 1
+
+
+def test_waiting_caller_gets_the_instance_once_it_is_released(fi):
+    pool = fi.EnginePool('engine', object, 1, checkout_timeout=5)
+    released = threading.Event()
+    borrowed = []
+
+    def wait_for_instance():
+        with pool.checkout() as instance:
+            borrowed.append((instance, released.is_set()))
+
+    with pool.checkout() as instance:
+        waiter = threading.Thread(target=wait_for_instance)
+        waiter.start()
+        waiter.join(0.05)
+        released.set()
+    waiter.join(5)
+
+    assert borrowed == [(instance, True)]
+
+
+def test_pool_has_at_least_one_instance(fi):
+    assert fi.EnginePool('engine', object, 0).get_stats() == {"size": 1, "available": 1}
@@ -0,0 +1,40 @@
+import pytest
+from conftest import FakeFaceDetector, encode_card
+
+
+def input_size(size, opco='KE'):
+    return {opco: {'models': {'id_quality': {'face_detector_input_size': size}}}}
+
+
+def test_configured_input_size_is_used_for_warmup_and_requests(fi, make_processor):
+    face_detector = FakeFaceDetector()
+    make_processor(input_size(320), face_detector=face_detector)
+
+    assert fi.get_id_quality({'id_front_image': encode_card()})['id_quality']['status'] == 200
+
+    assert len(face_detector.calls) == 2
+    assert {size for _, size in face_detector.calls} == {(320, 320)}
+
+
+def test_input_size_is_validated_once_and_cached(fi, make_processor):
+    face_detector = FakeFaceDetector()
+    processor = make_processor(input_size(320), face_detector=face_detector)
+
+    # Requests use the value validated at startup without going back to the config
+    processor.config['KE']['models']['id_quality']['face_detector_input_size'] = 500
+    assert fi.get_id_quality({'id_front_image': encode_card()})['id_quality']['status'] == 200
+    assert face_detector.calls[-1][1] == (320, 320)
+
+
+@pytest.mark.parametrize("size", [500, -32])
+def test_invalid_input_size_stops_the_processor_from_starting(fi, make_processor, size):
+    with pytest.raises(fi.ConfigurationError, match="multiple of 32"):
+        make_processor(input_size(size))
+
+
+def test_invalid_input_size_of_any_served_tenant_stops_the_processor(fi, make_processor):
+    multi_tenant = {'runtime': {'multi_tenant': {'enabled': True, 'opcos': ['KE', 'MW']}}}
+
+    # MW has not been asked for yet, but its size bounds the decode of every upload
+    with pytest.raises(fi.ConfigurationError, match="for MW must be a positive multiple of 32"):
+        make_processor({**multi_tenant, **input_size(500, 'MW')})
@@ -0,0 +1,59 @@
+import os
+import threading
+import time
+
+
+def test_model_version_follows_file_changes(fi, tmp_path):
+    model_dir = tmp_path / "tf2_efficientnet_classifier"
+    (model_dir / "variables").mkdir(parents=True)
+    (model_dir / "saved_model.pb").write_bytes(b"graph")
+    (model_dir / "variables" / "variables.index").write_bytes(b"index")
+
+    version = fi.get_model_version(str(model_dir))
+    assert version == fi.get_model_version(str(model_dir))
+
+    (model_dir / "variables" / "variables.index").write_bytes(b"new index")
+    assert fi.get_model_version(str(model_dir)) != version
+    assert fi.get_model_version(str(tmp_path / "missing")) is None
+
+
+def test_model_version_sees_a_touched_file(fi, tmp_path):
+    model = tmp_path / "detection.onnx"
+    model.write_bytes(b"weights")
+    version = fi.get_model_version(str(model))
+
+    os.utime(model, ns=(0, model.stat().st_mtime_ns + 10 ** 9))
+    assert fi.get_model_version(str(model)) != version
+
+
+def test_swap_waits_for_in_flight_requests_and_holds_new_ones(fi):
+    gate = fi.ModelSwapGate()
+    events = []
+    request_inside = threading.Event()
+    finish_request = threading.Event()
+
+    def request(name, entered=None, release=None):
+        with gate:
+            events.append(f"{name} start")
+            if entered:
+                entered.set()
+            if release:
+                release.wait(5)
+            events.append(f"{name} end")
+
+    first = threading.Thread(target=request, args=("first", request_inside, finish_request))
+    first.start()
+    request_inside.wait(5)
+
+    swapper = threading.Thread(target=gate.swap, args=(lambda: events.append("swap"),))
+    swapper.start()
+    time.sleep(0.05)
+    second = threading.Thread(target=request, args=("second",))
+    second.start()
+    time.sleep(0.05)
+    assert events == ["first start"]
+
+    finish_request.set()
+    for thread in (first, swapper, second):
+        thread.join(5)
+    assert events == ["first start", "first end", "swap", "second start", "second end"]
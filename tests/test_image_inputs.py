@@ -0,0 +1,74 @@
+import base64
+
+import cv2
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def small_jpeg():
+    image = np.zeros((48, 64, 3), dtype=np.uint8)
+    image[:, :32] = (40, 90, 200)
+    return cv2.imencode('.jpg', image)[1].tobytes()
+
+
+def test_small_base64_image_is_not_taken_for_a_path(fi, small_jpeg):
+    payload = base64.b64encode(small_jpeg).decode()
+    assert len(payload) < 4096
+
+    assert fi.read_image_source(payload) == small_jpeg
+    assert fi.validate_and_load_image(payload).shape == (48, 64, 3)
+
+
+def test_every_input_form_reads_the_same_bytes(fi, small_jpeg, tmp_path):
+    path = tmp_path / "front.jpg"
+    path.write_bytes(small_jpeg)
+    payload = base64.b64encode(small_jpeg).decode()
+
+    assert fi.read_image_source(str(path)) == small_jpeg
+    assert fi.read_image_source(small_jpeg) == small_jpeg
+    assert fi.read_image_source(bytearray(small_jpeg)) == small_jpeg
+    assert fi.read_image_source(f"data:image/jpeg;base64,{payload}") == small_jpeg
+    # Line-wrapped base64, as some clients send it
+    assert fi.read_image_source("\n".join(payload[i:i + 76] for i in range(0, len(payload), 76))) == small_jpeg
+
+
+def test_decoded_arrays_pass_through(fi):
+    image = np.zeros((8, 8, 3), dtype=np.uint8)
+    assert fi.read_image_source(image) is image
+
+
+def test_cached_array_input_does_not_follow_the_callers_array(fi, make_processor):
+    processor = make_processor()
+    image = np.full((640, 1010, 3), 200, dtype=np.uint8)
+
+    assert fi.get_id_orientation({'id_front_image': image})['id_orientation']['status'] == 200
+    # The caller reuses its buffer for the next frame
+    image[:] = 0
+
+    (cached,) = [cached for key, cached in processor.image_cache.items() if not key.startswith('uprighted_')]
+    assert cached.min() == 200 and cached is not image
+
+
+def test_missing_path_is_reported_as_not_found(fi, tmp_path):
+    with pytest.raises(fi.ImageProcessingError, match="not found"):
+        fi.read_image_source(str(tmp_path / "missing.jpg"))
+
+
+def test_base64_that_is_not_an_image_is_rejected(fi):
+    with pytest.raises(fi.ImageProcessingError, match="not found"):
+        fi.read_image_source(base64.b64encode(b"hello, not an image").decode())
+
+
+def test_long_base64_of_a_non_image_is_rejected(fi):
+    with pytest.raises(fi.ImageProcessingError, match="not found"):
+        fi.read_image_source(base64.b64encode(b"\x00" * 8192).decode())
+
+
+def test_same_image_gets_one_cache_key_however_it_arrives(fi, small_jpeg, tmp_path):
+    path = tmp_path / "front.jpg"
+    path.write_bytes(small_jpeg)
+    payload = base64.b64encode(small_jpeg).decode()
+
+    assert fi.generate_image_hash(fi.read_image_source(str(path))) == fi.generate_image_hash(small_jpeg)
+    assert fi.generate_image_hash(fi.read_image_source(payload)) == fi.generate_image_hash(small_jpeg)
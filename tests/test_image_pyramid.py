@@ -0,0 +1,48 @@
+import numpy as np
+
+
+def test_pyramid_levels_shrink_to_each_long_side(fi):
+    image = np.zeros((1200, 1800, 3), dtype=np.uint8)
+
+    pyramid = fi.build_resize_pyramid(image, [300, 960, 640, 480])
+
+    assert pyramid[0] is image
+    assert [max(level.shape[:2]) for level in pyramid] == [1800, 960, 640, 480, 300]
+    assert [level.shape[:2] for level in pyramid][1:3] == [(640, 960), (427, 640)]
+
+
+def test_pyramid_skips_sides_the_image_already_fits(fi):
+    image = np.zeros((500, 700, 3), dtype=np.uint8)
+
+    assert [max(level.shape[:2]) for level in fi.build_resize_pyramid(image, [960, 640, 480])] == [700, 640, 480]
+
+
+def test_stage_gets_the_smallest_level_still_covering_its_input(fi):
+    pyramid = fi.build_resize_pyramid(np.zeros((1200, 1800, 3), dtype=np.uint8), [960, 640, 480, 300])
+
+    assert max(fi.select_pyramid_level(pyramid, min_long_side=960).shape[:2]) == 960
+    assert max(fi.select_pyramid_level(pyramid, min_long_side=700).shape[:2]) == 960
+    # 480 short side for a square classifier input needs the 960 level (640 x 960)
+    assert fi.select_pyramid_level(pyramid, min_short_side=480).shape[:2] == (640, 960)
+    assert fi.select_pyramid_level(pyramid, min_long_side=4000) is pyramid[0]
+
+
+def test_face_detections_scale_back_to_level_zero(fi):
+    bbox = np.array([[10.0, 20.0, 30.0, 40.0, 0.9]])
+    landmarks = np.array([[[1.0, 2.0]] * 5])
+
+    scaled_bbox, scaled_landmarks = fi.scale_face_detections(bbox, landmarks, 2.0)
+
+    assert np.allclose(scaled_bbox, [[20.0, 40.0, 60.0, 80.0, 0.9]])
+    assert np.allclose(scaled_landmarks, landmarks * 2.0)
+    assert np.allclose(bbox[0, :4], [10.0, 20.0, 30.0, 40.0])
+    assert fi.scale_face_detections(None, None, 2.0) == (None, None)
+
+
+def test_ocr_corners_scale_back_to_level_zero(fi):
+    detections = [[[[1, 2], [3, 2], [3, 4], [1, 4]], ("ID NUMBER", 0.98)]]
+
+    assert fi.scale_ocr_detections(detections, 1.5) == [
+        [[[1.5, 3.0], [4.5, 3.0], [4.5, 6.0], [1.5, 6.0]], ("ID NUMBER", 0.98)]
+    ]
+    assert fi.scale_ocr_detections(detections, 1.0) is detections
@@ -0,0 +1,107 @@
+import threading
+
+import cv2
+import numpy as np
+import pytest
+from conftest import FakeClassifier, FakeFaceDetector, encode_card
+
+# Five landmarks of an upright face: eyes, nose, mouth corners
+UPRIGHT = np.array([[40.0, 40.0], [60.0, 40.0], [50.0, 50.0], [42.0, 62.0], [58.0, 62.0]])
+
+
+def rotate(landmarks, degrees):
+    """Landmarks of the face turned clockwise on screen by degrees, so at 90 its top points right."""
+    theta = np.radians(degrees)
+    rotation = np.array([[np.cos(theta), -np.sin(theta)], [np.sin(theta), np.cos(theta)]])
+    return (landmarks - 50.0) @ rotation.T + 50.0
+
+
+@pytest.mark.parametrize("degrees, label", [(0, "0"), (90, "90"), (180, "180"), (270, "270"), (20, "0"), (-75, "270")])
+def test_orientation_follows_the_eye_mouth_axis(fi, degrees, label):
+    assert fi.orientation_from_landmarks(rotate(UPRIGHT, degrees)) == label
+
+
+def test_label_turns_the_card_back_upright(fi):
+    card = np.zeros((100, 160, 3), dtype=np.uint8)
+    card[:10] = 255
+    # The card turned clockwise, as the face with its top pointing right
+    label = fi.orientation_from_landmarks(rotate(UPRIGHT, 90))
+
+    assert np.array_equal(fi.rectify_image_orientation(cv2.rotate(card, cv2.ROTATE_90_CLOCKWISE), label), card)
+
+
+@pytest.mark.parametrize("degrees", [45, 135, -40])
+def test_tilted_face_leaves_the_decision_to_the_classifier(fi, degrees):
+    assert fi.orientation_from_landmarks(rotate(UPRIGHT, degrees)) is None
+    assert fi.orientation_from_landmarks(rotate(UPRIGHT, degrees), max_angle=45) is not None
+
+
+def face(score, degrees=90, landmarks=True):
+    return np.array([[10.0, 10.0, 90.0, 90.0, score]]), rotate(UPRIGHT, degrees)[np.newaxis] if landmarks else None
+
+
+def make_landmark_processor(make_processor, face_detector, front_strategy='landmarks', loader=None):
+    # The classifier reads every card as 180, so its answers stand out from the landmarks'
+    orientation = FakeClassifier([0.0, 8.0, 0.0, 0.0])
+    make_processor({'KE': {
+        'loader': loader or {},
+        'models': {'id_orientation': {'front_strategy': front_strategy}},
+    }}, classifiers={'id_orientation': orientation}, face_detector=face_detector)
+    return orientation
+
+
+def orientations(fi, **images):
+    result = fi.get_id_orientation(images)['id_orientation']
+    assert result['status'] == 200
+    return result['result']
+
+
+def test_confident_face_sets_the_front_orientation(fi, make_processor):
+    orientation = make_landmark_processor(make_processor, FakeFaceDetector(face(0.95)))
+    warmup_runs = len(orientation.input_sizes)
+
+    result = orientations(fi, id_front_image=encode_card(), id_back_image=encode_card(colour=(200, 200, 200)))
+
+    assert result == {'id_front_orientation': "90", 'id_back_orientation': "180"}
+    # Only the back, which has no face to read, went through the classifier
+    assert len(orientation.input_sizes) == warmup_runs + 1
+    stats = fi.health_check()['orientation_stats']['KE']
+    assert stats == {"front_total": 1, "classifier_bypassed": 1, "bypass_rate": 1.0}
+
+
+@pytest.mark.parametrize("detection", [
+    (None, None),
+    face(0.95, landmarks=False),
+    face(0.5),
+    face(0.95, degrees=45),
+], ids=["no face", "no landmarks", "low score", "tilted"])
+def test_front_falls_back_to_the_classifier(fi, make_processor, detection):
+    make_landmark_processor(make_processor, FakeFaceDetector(detection))
+
+    assert orientations(fi, id_front_image=encode_card())['id_front_orientation'] == "180"
+    stats = fi.health_check()['orientation_stats']['KE']
+    assert stats == {"front_total": 1, "classifier_bypassed": 0, "bypass_rate": 0.0}
+
+
+def test_detector_not_loaded_yet_falls_back_to_the_classifier(fi, make_processor):
+    gate = threading.Event()
+    # The detector stays in its warmup, so it is not ready, until the gate opens
+    face_detector = FakeFaceDetector(lambda image, input_size: gate.wait(30) and face(0.95))
+    try:
+        make_landmark_processor(make_processor, face_detector, loader={'background': True})
+        assert fi._processor.component_events['KE_id_orientation'].wait(30)
+
+        assert orientations(fi, id_front_image=encode_card())['id_front_orientation'] == "180"
+        assert fi.health_check()['component_status']['face_detector'] == 'loading'
+    finally:
+        gate.set()
+
+
+def test_classifier_strategy_ignores_landmarks(fi, make_processor):
+    face_detector = FakeFaceDetector(face(0.95, degrees=90))
+    make_landmark_processor(make_processor, face_detector, front_strategy='classifier')
+    warmup_calls = len(face_detector.calls)
+
+    assert orientations(fi, id_front_image=encode_card())['id_front_orientation'] == "180"
+    assert len(face_detector.calls) == warmup_calls
+    assert fi.health_check()['orientation_stats'] == {}
@@ -0,0 +1,64 @@
+from pathlib import Path
+
+from conftest import FakeFaceDetector, encode_card
+
+MULTI_TENANT = {'runtime': {'multi_tenant': {'enabled': True, 'opcos': ['KE', 'MW', 'ZM', 'XX'], 'preload': []}}}
+
+
+def orientation_for(fi, opco):
+    return fi.get_id_orientation({'opco': opco, 'id_front_image': encode_card()})['id_orientation']
+
+
+def test_single_tenant_process_serves_only_its_own_opco(fi, make_processor):
+    make_processor()
+
+    assert orientation_for(fi, 'KE')['status'] == 200
+    result = orientation_for(fi, 'MW')
+    assert result['status'] == 0 and "is not served by this process" in result['message']
+    assert fi.health_check()['tenants'] == {'KE': True}
+
+
+def test_unknown_or_unlisted_opcos_are_rejected(fi, make_processor):
+    make_processor(MULTI_TENANT)
+
+    result = orientation_for(fi, 'CG')
+    assert result['status'] == 0 and "is not in the multi-tenant OPCO list" in result['message']
+    result = orientation_for(fi, 'XX')
+    assert result['status'] == 0 and "not found in configuration" in result['message']
+    assert fi.health_check()['tenants'] == {'KE': True}
+
+
+def test_tenant_loads_on_its_first_request(fi, make_processor, classifier_loads):
+    make_processor(MULTI_TENANT)
+    assert fi.health_check()['tenants'] == {'KE': True}
+    assert classifier_loads.count('id_orientation') == 1
+
+    assert orientation_for(fi, 'MW')['status'] == 200
+
+    assert fi.health_check()['tenants'] == {'KE': True, 'MW': True}
+    assert classifier_loads.count('id_orientation') == 2
+    # Later requests reuse the loaded tenant
+    assert orientation_for(fi, 'MW')['status'] == 200
+    assert classifier_loads.count('id_orientation') == 2
+
+
+def test_classifiers_load_per_opco_while_engines_are_shared(fi, make_processor):
+    face_detector = FakeFaceDetector()
+    make_processor(MULTI_TENANT, face_detector=face_detector)
+
+    orientation_for(fi, 'MW')
+
+    status = fi.health_check()['component_status']
+    assert {'KE_id_orientation', 'MW_id_orientation', 'KE_id_quality', 'MW_id_quality'} <= set(status)
+    assert 'face_detector' in status and 'rapid_ocr' in status
+    assert not any(key.startswith(('KE_face', 'MW_face', 'KE_rapid', 'MW_rapid')) for key in status)
+    # The shared detector was built and warmed up by the default OPCO only
+    assert len(face_detector.calls) == 1
+
+
+def test_each_tenant_reads_models_from_its_own_tree(fi, make_processor):
+    processor = make_processor(dict(MULTI_TENANT, ZM={'models_root': '/srv/zm'}))
+
+    assert processor._get_models_root('KE') == Path('.')
+    assert processor._get_models_root('MW') == Path('./tenants') / 'MW'
+    assert processor._get_models_root('ZM') == Path('/srv/zm')
@@ -0,0 +1,122 @@
+import tempfile
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+
+class FakeResponse:
+    """Stands in for the urllib3 response get_object returns."""
+
+    def __init__(self, data):
+        self.data = data
+        self.headers = {'Content-Length': str(len(data))}
+        self.released = False
+
+    def read(self):
+        return self.data
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        self.released = True
+
+
+def make_fake_minio(fi, objects, delay=0.0):
+    class NoSuchKey(fi.S3Error):
+        def __init__(self, key):
+            Exception.__init__(self, f"NoSuchKey: {key}")
+
+        def __str__(self):
+            return self.args[0]
+
+    class FakeMinio:
+        def __init__(self, endpoint, **kwargs):
+            self.endpoint = endpoint
+            self.calls = []
+            self.responses = []
+
+        def get_object(self, bucket, key):
+            start = time.monotonic()
+            time.sleep(delay)
+            self.calls.append((key, start, time.monotonic()))
+            if (bucket, key) not in objects:
+                raise NoSuchKey(key)
+            response = FakeResponse(objects[(bucket, key)])
+            self.responses.append(response)
+            return response
+
+    return FakeMinio
+
+
+def encode(colour):
+    image = np.zeros((48, 64, 3), dtype=np.uint8)
+    image[:] = colour
+    return cv2.imencode('.png', image)[1].tobytes()
+
+
+@pytest.fixture
+def processor(fi, make_processor, monkeypatch):
+    objects = {('ids', 'front.png'): encode((0, 0, 255)), ('ids', 'back.png'): encode((255, 0, 0))}
+    monkeypatch.setattr(fi, 'Minio', make_fake_minio(fi, objects, delay=0.2))
+    processor = make_processor({'runtime': {'object_store': {
+        'enabled': True, 'endpoint': 'minio.test:9000', 'max_connections': 4,
+    }}})
+    yield processor
+    processor.image_reader.prefetch_executor.shutdown()
+
+
+def cached_image(processor, uri):
+    return processor.image_cache[processor.object_keys[uri]]
+
+
+def test_front_and_back_are_fetched_concurrently(fi, processor):
+    result = fi.get_id_orientation({'id_front_image': 's3://ids/front.png', 'id_back_image': 's3://ids/back.png'})
+
+    assert result['id_orientation']['status'] == 200
+    client = processor.image_reader.client
+    (_, front_start, front_end), (_, back_start, back_end) = sorted(client.calls)
+    assert front_start < back_end and back_start < front_end
+    assert cached_image(processor, 's3://ids/front.png')[0, 0].tolist() == [0, 0, 255]
+    assert cached_image(processor, 's3://ids/back.png')[0, 0].tolist() == [255, 0, 0]
+    assert all(response.released for response in client.responses)
+
+
+def test_objects_are_decoded_without_temp_files(fi, processor, monkeypatch, tmp_path):
+    def no_temp_files(*args, **kwargs):
+        raise AssertionError("object bytes went through a temp file")
+
+    for name in ('NamedTemporaryFile', 'TemporaryFile', 'SpooledTemporaryFile', 'mkstemp', 'mkdtemp'):
+        monkeypatch.setattr(tempfile, name, no_temp_files)
+    before = set(tmp_path.rglob('*'))
+
+    assert fi.get_id_orientation({'id_front_image': 's3://ids/front.png'})['id_orientation']['status'] == 200
+
+    assert set(tmp_path.rglob('*')) == before
+    assert fi.health_check()['cache_stats']['image_cache'] == 1
+
+
+def test_decoded_object_is_not_fetched_again(fi, processor):
+    request = {'id_front_image': 's3://ids/front.png'}
+
+    fi.get_id_orientation(request)
+    fi.get_id_type(request)
+
+    assert len(processor.image_reader.client.calls) == 1
+
+
+def test_missing_object_fails_the_request(fi, processor):
+    result = fi.get_id_orientation({'id_front_image': 's3://ids/missing.png'})['id_orientation']
+
+    assert result['status'] == 0 and "missing.png" in result['message']
+    with pytest.raises(fi.ImageProcessingError, match="Invalid object URI"):
+        processor.image_reader.read('s3://ids')
+
+
+def test_object_uris_need_the_object_store(fi, make_processor):
+    make_processor()
+
+    result = fi.get_id_orientation({'id_front_image': 's3://ids/front.png'})['id_orientation']
+    assert result['status'] == 0 and "Object store is not configured" in result['message']
@@ -0,0 +1,87 @@
+import threading
+
+import numpy as np
+import pytest
+from conftest import draw_text_lines
+
+pytest.importorskip("rapidocr_onnxruntime")
+from src.idOCR.rapidocr_onnx.rapidocr_onxx import assemble_ocr_result, split_ocr_results  # noqa: E402
+
+BOX = np.array([[0, 0], [10, 0], [10, 5], [0, 5]], dtype=np.float32)
+
+
+def test_lines_below_text_score_are_dropped():
+    result = assemble_ocr_result([BOX, BOX + 10], [("ID", 0.9), ("noise", 0.3)], 0.5)
+
+    assert result == [[BOX.tolist(), ("ID", 0.9)]]
+
+
+def test_pooled_recognition_goes_back_to_its_image():
+    detections = [(["a", "b"], [BOX, BOX + 1]), ([], []), (["c"], [BOX + 2])]
+    rec_res = [("A", 0.9), ("B", 0.9), ("C", 0.9)]
+
+    assert split_ocr_results(detections, rec_res, 0.5) == [
+        [[BOX.tolist(), ("A", 0.9)], [(BOX + 1).tolist(), ("B", 0.9)]],
+        [],
+        [[(BOX + 2).tolist(), ("C", 0.9)]],
+    ]
+
+
+def test_batch_reads_every_image_as_a_single_run(ocr_engine):
+    images = [
+        draw_text_lines(["IDENTITY CARD", "SURNAME SAMPLE 1990"]),
+        np.full((200, 400, 3), 255, dtype=np.uint8),
+        draw_text_lines(["GIVEN NAMES JOHN"], width=800),
+    ]
+
+    batched = ocr_engine.run_batch(images, batch_size=2)
+    expected = [ocr_engine.run(image) for image in images]
+
+    # Rec pads every crop of a batch to its widest one, which moves scores and
+    # whether a gap between words reads as a space
+    assert [[(box, text.replace(' ', '')) for box, (text, _) in lines] for lines in batched] == \
+        [[(box, text.replace(' ', '')) for box, (text, _) in lines] for lines in expected]
+    assert np.allclose([score for lines in batched for _, (_, score) in lines],
+                       [score for lines in expected for _, (_, score) in lines], atol=0.05)
+
+
+def test_recognize_keeps_the_configured_batch_size(ocr_engine):
+    crops, _ = ocr_engine.detect(draw_text_lines(["IDENTITY CARD", "SURNAME SAMPLE"]))
+    rec_batch_num = ocr_engine.rapid_ocr.text_rec.rec_batch_num
+
+    texts = [text.replace(' ', '') for text, _ in ocr_engine.recognize(crops, batch_size=1)]
+    assert texts == ['IDENTITYCARD', 'SURNAMESAMPLE']
+    assert ocr_engine.rapid_ocr.text_rec.rec_batch_num == rec_batch_num
+    assert ocr_engine.recognize([]) == []
+
+
+def test_concurrent_callers_share_one_batch(fi):
+    batches = []
+    pool = fi.EnginePool('rapid_ocr', lambda: 'engine', 1)
+    batcher = fi.EngineBatcher(pool, 'rec', lambda engine, items: batches.append(list(items)) or
+                               [item.upper() for item in items], batch_size=4, max_wait=1.0)
+    results = {}
+
+    def submit(name, items):
+        results[name] = batcher.submit(items)
+
+    callers = [threading.Thread(target=submit, args=(name, items))
+               for name, items in [('front', ['a', 'b']), ('back', ['c', 'd'])]]
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join(5)
+
+    assert results == {'front': ['A', 'B'], 'back': ['C', 'D']}
+    assert len(batches) == 1 and sorted(batches[0]) == ['a', 'b', 'c', 'd']
+
+
+def test_failed_batch_fails_every_caller_in_it(fi):
+    def fail(engine, items):
+        raise RuntimeError("rec session failed")
+
+    batcher = fi.EngineBatcher(fi.EnginePool('rapid_ocr', lambda: 'engine', 1), 'rec', fail, batch_size=4, max_wait=0.0)
+
+    with pytest.raises(RuntimeError, match="rec session failed"):
+        batcher.submit(['a'])
+    assert batcher.submit([]) == []
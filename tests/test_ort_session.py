@@ -0,0 +1,110 @@
+import logging
+import os
+
+import numpy as np
+import onnxruntime
+import pytest
+
+from src.ort_session import (MEMORY_MAP_MIN_VERSION, build_session_options, create_inference_session,
+                             get_optimized_model_path, get_ort_version, get_session_config)
+
+
+def test_session_config_merges_global_settings_with_the_named_session():
+    ort_config = {
+        'intra_op_num_threads': 2,
+        'enable_cpu_mem_arena': True,
+        'sessions': {'ocr_det': {'enable_cpu_mem_arena': False}, 'face_detector': None},
+    }
+
+    assert get_session_config(ort_config, 'ocr_det') == {'intra_op_num_threads': 2, 'enable_cpu_mem_arena': False}
+    assert get_session_config(ort_config, 'face_detector') == {'intra_op_num_threads': 2, 'enable_cpu_mem_arena': True}
+    assert get_session_config(None, 'ocr_rec') == {}
+
+
+def test_session_options_keep_ort_defaults_for_unset_keys():
+    defaults = onnxruntime.SessionOptions()
+    options = build_session_options({'intra_op_num_threads': 3, 'inter_op_num_threads': -1,
+                                     'graph_optimization_level': 'basic'})
+
+    assert options.intra_op_num_threads == 3
+    assert options.inter_op_num_threads == defaults.inter_op_num_threads
+    assert options.graph_optimization_level == onnxruntime.GraphOptimizationLevel.ORT_ENABLE_BASIC
+    assert options.execution_mode == defaults.execution_mode
+
+
+def test_optimized_graph_names_are_unique_per_model_file(tmp_path, make_scale_model):
+    config = {'optimized_model_dir': str(tmp_path / 'optimized')}
+    first = make_scale_model(tmp_path / 'KE' / 'detection.onnx', 2.0)
+    second = make_scale_model(tmp_path / 'ZM' / 'detection.onnx', 2.0)
+
+    assert get_optimized_model_path(str(first), config) != get_optimized_model_path(str(second), config)
+    assert get_optimized_model_path(str(first), config) == get_optimized_model_path(str(first.resolve()), config)
+    assert get_optimized_model_path(str(first), {}) is None
+
+
+def test_replaced_model_gets_a_new_optimized_graph(tmp_path, make_scale_model):
+    config = {'optimized_model_dir': str(tmp_path / 'optimized')}
+    model = make_scale_model(tmp_path / 'detection.onnx', 2.0)
+    before = get_optimized_model_path(str(model), config)
+
+    make_scale_model(model, 3.0)
+    os.utime(model, ns=(0, model.stat().st_mtime_ns + 10 ** 9))
+    assert get_optimized_model_path(str(model), config) != before
+
+
+def test_optimized_graph_is_saved_once_and_reused(tmp_path, make_scale_model):
+    config = {'optimized_model_dir': str(tmp_path / 'optimized')}
+    model = make_scale_model(tmp_path / 'detection.onnx', 2.0)
+    optimized = get_optimized_model_path(str(model), config)
+
+    session = create_inference_session(str(model), config)
+    saved_at = optimized.stat().st_mtime_ns
+    reused = create_inference_session(str(model), config)
+
+    assert optimized.stat().st_mtime_ns == saved_at
+    x = np.ones((1, 4), dtype=np.float32)
+    assert np.allclose(session.run(None, {'x': x})[0], 2.0)
+    assert np.allclose(reused.run(None, {'x': x})[0], 2.0)
+
+
+def test_ort_format_graph_is_saved_and_loaded(tmp_path, make_scale_model):
+    config = {'optimized_model_dir': str(tmp_path / 'optimized'), 'model_format': 'ort', 'memory_map': True}
+    model = make_scale_model(tmp_path / 'detection.onnx', 3.0)
+
+    session = create_inference_session(str(model), config)
+
+    optimized = get_optimized_model_path(str(model), config)
+    assert optimized.suffix == '.ort' and optimized.exists()
+    # Written under a temporary name and renamed into place
+    assert [path.name for path in optimized.parent.iterdir()] == [optimized.name]
+    assert np.allclose(session.run(None, {'x': np.ones((1, 4), dtype=np.float32)})[0], 3.0)
+
+
+def mapped_files():
+    with open('/proc/self/maps') as maps:
+        return {line.split(maxsplit=5)[-1].strip() for line in maps if len(line.split()) == 6}
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/maps'), reason="needs /proc/self/maps")
+@pytest.mark.skipif(get_ort_version() < MEMORY_MAP_MIN_VERSION, reason="onnxruntime cannot map ORT models")
+@pytest.mark.parametrize("memory_map", [True, False])
+def test_memory_map_maps_the_saved_graph_into_the_process(tmp_path, make_scale_model, memory_map):
+    config = {'optimized_model_dir': str(tmp_path / 'optimized'), 'model_format': 'ort', 'memory_map': memory_map}
+    model = make_scale_model(tmp_path / 'detection.onnx', 3.0)
+
+    session = create_inference_session(str(model), config)
+
+    assert session.get_inputs()[0].name == 'x'
+    assert (str(get_optimized_model_path(str(model), config)) in mapped_files()) == memory_map
+
+
+def test_memory_map_warns_when_onnxruntime_is_too_old(tmp_path, make_scale_model, monkeypatch, caplog):
+    config = {'optimized_model_dir': str(tmp_path / 'optimized'), 'model_format': 'ort', 'memory_map': True}
+    model = make_scale_model(tmp_path / 'detection.onnx', 3.0)
+    monkeypatch.setattr(onnxruntime, '__version__', '1.14.1')
+
+    with caplog.at_level(logging.WARNING, logger='src.ort_session'):
+        session = create_inference_session(str(model), config)
+
+    assert "memory_map needs onnxruntime >= 1.26, found 1.14.1" in caplog.text
+    assert np.allclose(session.run(None, {'x': np.ones((1, 4), dtype=np.float32)})[0], 3.0)
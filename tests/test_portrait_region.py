@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+from conftest import FakeFaceDetector, encode_card
+
+
+def test_fractional_region_covers_the_requested_share(fi):
+    image = np.arange(100 * 200).reshape(100, 200)
+
+    crop, offset = fi.crop_fractional_region(image, [0.05, 0.2, 0.45, 0.9])
+
+    assert offset == (10, 20)
+    assert crop.shape == (70, 80)
+    assert crop[0, 0] == image[20, 10]
+    # Fractional edges round outwards so the photo is never clipped
+    assert fi.crop_fractional_region(image, [0.0, 0.0, 0.333, 0.333])[0].shape == (34, 67)
+
+
+def test_detections_in_the_crop_move_back_to_image_coordinates(fi):
+    image = np.zeros((100, 200, 3), dtype=np.uint8)
+    crop, offset = fi.crop_fractional_region(image, [0.5, 0.25, 1.0, 1.0])
+    bbox = np.array([[5.0, 6.0, 25.0, 36.0, 0.9]], dtype=np.float32)
+    landmarks = np.array([[[10.0, 12.0]] * 5], dtype=np.float32)
+
+    moved_bbox, moved_landmarks = fi.offset_face_detections(bbox, landmarks, offset)
+
+    np.testing.assert_allclose(moved_bbox, [[105.0, 31.0, 125.0, 61.0, 0.9]])
+    np.testing.assert_array_equal(moved_landmarks, [[[110.0, 37.0]] * 5])
+    np.testing.assert_array_equal(bbox[0, :4], [5.0, 6.0, 25.0, 36.0])
+
+
+def test_offset_leaves_missing_or_uncropped_detections_alone(fi):
+    bbox = np.array([[1.0, 2.0, 3.0, 4.0, 0.9]])
+
+    assert fi.offset_face_detections(None, None, (10, 20)) == (None, None)
+    assert fi.offset_face_detections(bbox, None, (0, 0))[0] is bbox
+    assert fi.offset_face_detections(bbox, None, (10, 20))[1] is None
+
+
+def portrait_region(region):
+    return {'KE': {'models': {'id_quality': {'portrait_region': region}}}}
+
+
+def face_in_crops_only(image, input_size):
+    # A face at the same spot of every portrait crop, none on the full card
+    if input_size == (640, 640):
+        return None, None
+    return np.array([[10.0, 20.0, 60.0, 90.0, 0.95]], dtype=np.float32), None
+
+
+@pytest.mark.parametrize("region", [[0.5, 0.0, 0.4, 1.0], [0.0, 0.0, 1.2, 1.0], [0.0, 0.0, 1.0]])
+def test_invalid_portrait_region_stops_the_processor_from_starting(fi, make_processor, region):
+    with pytest.raises(fi.ConfigurationError, match="portrait_region"):
+        make_processor(portrait_region(region))
+
+
+def test_unset_portrait_region_scans_the_whole_front(fi, make_processor):
+    face_detector = FakeFaceDetector()
+    make_processor(face_detector=face_detector)
+
+    assert fi.get_id_quality({'id_front_image': encode_card()})['id_quality']['status'] == 200
+    assert [size for _, size in face_detector.calls] == [(640, 640)] * 2
+
+
+def test_face_in_the_region_is_found_on_the_fixed_portrait_canvas(fi, make_processor):
+    face_detector = FakeFaceDetector(face_in_crops_only)
+    processor = make_processor(portrait_region([0.0, 0.15, 0.4, 1.0]), face_detector=face_detector)
+    warmup_calls = len(face_detector.calls)
+
+    for width, height in [(1010, 640), (856, 540)]:
+        card = encode_card(width, height)
+        assert fi.get_id_quality({'id_front_image': card})['id_quality']['status'] == 200
+
+        # Moved from the crop back to the searched pyramid level, then scaled up to the card
+        image_key = fi.generate_image_hash(card)
+        level = fi.select_pyramid_level(processor._get_cached_pyramid(image_key, 'KE'), min_long_side=640)
+        _, (x, y) = fi.crop_fractional_region(level, [0.0, 0.15, 0.4, 1.0])
+        bbox, _ = processor.face_detection_cache[f"KE_{image_key}"]
+        expected = np.array([10.0 + x, 20.0 + y, 60.0 + x, 90.0 + y]) * width / level.shape[1]
+        np.testing.assert_allclose(bbox[0, :4], expected)
+
+    # Both cards, and the warmup, used the one canvas: 0.4 x 640 and 0.85 x 640 rounded up to 32
+    assert {size for _, size in face_detector.calls[warmup_calls - 1:]} == {(256, 544)}
+    assert len(face_detector.calls) == warmup_calls + 2
+
+
+def test_no_face_in_the_region_falls_back_to_the_whole_card(fi, make_processor):
+    face_detector = FakeFaceDetector()
+    make_processor(portrait_region([0.0, 0.15, 0.4, 1.0]), face_detector=face_detector)
+    warmup_calls = len(face_detector.calls)
+
+    assert fi.get_id_quality({'id_front_image': encode_card()})['id_quality']['status'] == 200
+    assert [size for _, size in face_detector.calls[warmup_calls:]] == [(256, 544), (640, 640)]
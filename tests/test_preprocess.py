@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize("normalize", [True, False])
+def test_reused_buffers_match_the_allocating_path(fi, normalize):
+    image = np.random.default_rng(1).integers(0, 255, (400, 640, 3), dtype=np.uint8)
+
+    expected = fi.preprocess_image(image, 300, normalize=normalize)
+    reused = fi.preprocess_image(image, 300, normalize=normalize, reuse_buffer=True)
+
+    assert reused.shape == expected.shape == (1, 300, 300, 3)
+    assert reused.dtype == expected.dtype
+    assert np.array_equal(reused, expected)
+
+
+def test_buffer_is_reused_per_shape_and_dtype(fi):
+    image = np.zeros((100, 100, 3), dtype=np.uint8)
+
+    first = fi.preprocess_image(image, 64, reuse_buffer=True)
+    second = fi.preprocess_image(image, 64, reuse_buffer=True)
+    other_size = fi.preprocess_image(image, 32, reuse_buffer=True)
+
+    assert first is second
+    assert other_size is not first
+
+
+def test_invalid_image_is_rejected(fi):
+    with pytest.raises(fi.ImageProcessingError):
+        fi.preprocess_image(np.zeros((0, 0, 3), dtype=np.uint8), 64, reuse_buffer=True)
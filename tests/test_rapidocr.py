@@ -0,0 +1,89 @@
+import importlib.metadata
+import os
+
+import pytest
+from conftest import draw_text_lines, encode_card
+
+pytest.importorskip("rapidocr_onnxruntime")
+from src.idOCR.rapidocr_onnx.rapidocr_onxx import ConfiguredRapidOCR, load_rapidocr_config  # noqa: E402
+
+
+def to_stock_format(result):
+    """RapidOCR's own [box, text, score] lines in our [box, (text, score)] format."""
+    return [[box, (text, score)] for box, text, score in result or []]
+
+
+def test_bundled_model_paths_resolve_against_the_working_directory():
+    config = load_rapidocr_config()
+
+    assert config['Det']['model_path'] == os.path.join(os.getcwd(), 'models/idOCR/rapidocr/ch_PP-OCRv4_det_infer.onnx')
+    assert config['Rec']['model_path'].startswith(os.getcwd())
+
+
+def test_overrides_merge_into_their_section(tmp_path):
+    config = load_rapidocr_config({'Det': {'model_path': 'det.onnx', 'box_thresh': 0.7}, 'Global': {'text_score': 0.8}},
+                                  tmp_path)
+
+    assert config['Det']['model_path'] == os.path.join(str(tmp_path), 'det.onnx')
+    assert config['Det']['box_thresh'] == 0.7 and config['Det']['thresh'] == 0.3
+    assert config['Global']['text_score'] == 0.8
+    # Sections without a model_path override keep the default tree
+    assert config['Cls']['model_path'].startswith(os.getcwd())
+    # The bundled config is copied, never changed
+    assert load_rapidocr_config()['Det']['box_thresh'] == 0.5
+
+
+def test_overridden_model_path_without_models_root_uses_the_working_directory():
+    config = load_rapidocr_config({'Rec': {'model_path': 'rec.onnx'}})
+
+    assert config['Rec']['model_path'] == os.path.join(os.getcwd(), 'rec.onnx')
+
+
+def test_engine_built_from_memory_reads_like_stock_rapidocr(ocr_engine):
+    image = draw_text_lines(["IDENTITY CARD", "SURNAME SAMPLE 1990"])
+
+    result = ocr_engine.run(image)
+
+    assert [text for _, (text, _) in result] == ['IDENTITYCARD', 'SURNAMESAMPLE1990']
+    assert result == to_stock_format(ocr_engine.rapid_ocr(image)[0])
+
+
+def test_engine_sessions_use_the_shared_ort_config(ocr_engine):
+    rapid_ocr = ocr_engine.rapid_ocr
+    sessions = [rapid_ocr.text_det.infer.session, rapid_ocr.text_cls.infer.session, rapid_ocr.text_rec.session.session]
+
+    assert [session.get_session_options().intra_op_num_threads for session in sessions] == [2, 2, 2]
+
+
+def test_stock_rapidocr_engines_are_left_alone(ocr_engine):
+    from rapidocr_onnxruntime import utils
+    from rapidocr_onnxruntime.ch_ppocr_cls import text_cls
+    from rapidocr_onnxruntime.ch_ppocr_det import text_detect
+    from rapidocr_onnxruntime.ch_ppocr_rec import text_recognize
+
+    assert all(module.OrtInferSession is utils.OrtInferSession for module in (text_detect, text_cls, text_recognize))
+
+
+def test_unsupported_rapidocr_version_is_refused(ocr_config, monkeypatch):
+    monkeypatch.setattr(importlib.metadata, 'version', lambda name: '1.5.0')
+
+    with pytest.raises(RuntimeError, match="follows rapidocr_onnxruntime 1.4.4, found 1.5.0"):
+        ConfiguredRapidOCR(ocr_config)
+
+
+def test_opcos_with_the_same_ocr_config_share_an_engine(fi, make_processor):
+    same_override = {'rapid_ocr': {'Det': {'box_thresh': 0.6}}}
+    processor = make_processor({
+        'runtime': {'multi_tenant': {'enabled': True, 'opcos': ['KE', 'MW', 'ZM', 'CG'], 'preload': []}},
+        'MW': same_override, 'CG': same_override,
+    })
+
+    for opco in ('MW', 'CG', 'ZM'):
+        result = fi.get_id_orientation({'opco': opco, 'id_front_image': encode_card()})
+        assert result['id_orientation']['status'] == 200
+
+    ocr_components = {key for key in fi.health_check()['component_status'] if key.startswith('rapid_ocr')}
+    shared_key = processor._get_component_key('MW', 'rapid_ocr')
+    assert ocr_components == {'rapid_ocr', shared_key}
+    assert shared_key.startswith('rapid_ocr_') and processor._get_component_key('CG', 'rapid_ocr') == shared_key
+    assert processor._get_component_key('ZM', 'rapid_ocr') == 'rapid_ocr'
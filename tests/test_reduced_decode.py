@@ -0,0 +1,26 @@
+import cv2
+import numpy as np
+
+
+def test_decode_factor_keeps_every_stage_covered(fi):
+    # 4000x3000 upload, OCR needs a 960 long side and the classifiers a 480 short side
+    assert fi.choose_decode_factor((4000, 3000), 960, 480) == 4
+    assert fi.choose_decode_factor((4000, 3000), 960, 600) == 4
+    assert fi.choose_decode_factor((4000, 3000), 960, 760) == 2
+    assert fi.choose_decode_factor((4000, 3000), 2100, 0) == 1
+
+
+def test_decode_factor_leaves_small_or_unknown_images_alone(fi):
+    assert fi.choose_decode_factor((1010, 640), 960, 480) == 1
+    assert fi.choose_decode_factor(None, 960, 480) == 1
+
+
+def test_reduced_decode_matches_the_chosen_factor(fi):
+    image = np.random.default_rng(0).integers(0, 255, (1200, 1600, 3), dtype=np.uint8)
+    encoded = cv2.imencode('.jpg', image)[1].tobytes()
+
+    assert fi.read_image_size(encoded) == (1600, 1200)
+    factor = fi.choose_decode_factor(fi.read_image_size(encoded), 640, 300)
+    assert factor == 2
+    assert fi.decode_image(encoded, factor).shape == (600, 800, 3)
+    assert fi.decode_image(encoded).shape == (1200, 1600, 3)
@@ -0,0 +1,207 @@
+import numpy as np
+import pytest
+from onnxruntime.capi.onnxruntime_pybind11_state import RuntimeException
+
+from src.idImage.retinaface_detector import retinaface_detection
+from src.idImage.retinaface_detector.retinaface_detection import RetinaFaceDetectionONNX
+
+
+def draw_faces(shape, boxes):
+    """Black image with a red square per 'face'."""
+    image = np.zeros(shape + (3,), dtype=np.uint8)
+    for x1, y1, x2, y2 in boxes:
+        image[y1:y2, x1:x2] = (0, 0, 255)
+    return image
+
+
+@pytest.fixture
+def images():
+    return [
+        draw_faces((480, 640), [(64, 64, 192, 192)]),
+        draw_faces((600, 400), [(200, 300, 360, 460), (16, 16, 96, 96)]),
+        draw_faces((320, 320), []),
+    ]
+
+
+def assert_same_detections(expected, actual):
+    for (det, kpss), (batch_det, batch_kpss) in zip(expected, actual):
+        if det is None:
+            assert batch_det is None and batch_kpss is None
+            continue
+        np.testing.assert_allclose(batch_det, det, rtol=1e-5, atol=1e-3)
+        np.testing.assert_allclose(batch_kpss, kpss, rtol=1e-5, atol=1e-3)
+
+
+@pytest.mark.parametrize("input_size", [(640, 640), (320, 320)])
+def test_batch_matches_one_image_at_a_time(toy_batched_face_model, images, input_size):
+    detector = RetinaFaceDetectionONNX(model_path=str(toy_batched_face_model))
+    assert detector.supports_batch
+
+    expected = [detector.detect_faces(image, input_size) for image in images]
+    assert expected[0][0] is not None and expected[2][0] is None
+
+    assert_same_detections(expected, detector.detect_faces_batch(images, input_size))
+
+
+def test_fixed_batch_export_falls_back_to_one_run_per_image(toy_face_model, images):
+    detector = RetinaFaceDetectionONNX(model_path=str(toy_face_model))
+    assert not detector.supports_batch
+
+    expected = [detector.detect_faces(image) for image in images]
+    assert_same_detections(expected, detector.detect_faces_batch(images))
+
+
+class SingleImageSession:
+    """Session of an export that declares a batch axis but fails on batches, as some Reshape-heavy exports do."""
+
+    def __init__(self, session):
+        self.session = session
+        self.batch_sizes = []
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    def run(self, output_names, feed):
+        batch = next(iter(feed.values())).shape[0]
+        self.batch_sizes.append(batch)
+        if batch > 1:
+            raise RuntimeException("Reshape: input shape does not match the requested shape")
+        return self.session.run(output_names, feed)
+
+
+def test_batch_probe_at_load_turns_batching_off(toy_batched_face_model, images, monkeypatch):
+    create = retinaface_detection.create_inference_session
+    monkeypatch.setattr(retinaface_detection, 'create_inference_session',
+                        lambda *args: SingleImageSession(create(*args)))
+    detector = RetinaFaceDetectionONNX(model_path=str(toy_batched_face_model))
+
+    assert not detector.supports_batch and detector.session.batch_sizes == [2]
+    expected = [detector.detect_faces(image) for image in images]
+    assert_same_detections(expected, detector.detect_faces_batch(images))
+    assert max(detector.session.batch_sizes[1:]) == 1
+
+
+def test_errors_of_a_batched_run_are_raised(toy_batched_face_model, images, monkeypatch):
+    detector = RetinaFaceDetectionONNX(model_path=str(toy_batched_face_model))
+    assert detector.supports_batch
+
+    def out_of_memory(*args):
+        raise MemoryError("arena exhausted")
+
+    monkeypatch.setattr(detector, 'session', SingleImageSession(detector.session))
+    monkeypatch.setattr(detector.session, 'run', out_of_memory)
+    with pytest.raises(MemoryError):
+        detector.detect_faces_batch(images)
+    # One failed request does not turn batching off for the next ones
+    assert detector.supports_batch
+
+
+def reference_nms(dets, thresh):
+    """The per-candidate greedy NMS loop from the insightface reference code."""
+    x1, y1, x2, y2, scores = dets.T
+    areas = (x2 - x1 + 1) * (y2 - y1 + 1)
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        xx1 = np.maximum(x1[i], x1[order[1:]])
+        yy1 = np.maximum(y1[i], y1[order[1:]])
+        xx2 = np.minimum(x2[i], x2[order[1:]])
+        yy2 = np.minimum(y2[i], y2[order[1:]])
+        inter = np.maximum(0.0, xx2 - xx1 + 1) * np.maximum(0.0, yy2 - yy1 + 1)
+        ovr = inter / (areas[i] + areas[order[1:]] - inter)
+        order = order[np.where(ovr <= thresh)[0] + 1]
+    return keep
+
+
+def test_nms_keeps_what_the_reference_loop_keeps(toy_face_model):
+    detector = RetinaFaceDetectionONNX(model_path=str(toy_face_model))
+    rng = np.random.default_rng(2)
+    corners = rng.uniform(0, 300, (200, 2))
+    dets = np.hstack([corners, corners + rng.uniform(20, 80, (200, 2)), rng.random((200, 1))]).astype(np.float32)
+
+    assert list(detector.nms(dets)) == reference_nms(dets, detector.nms_thresh)
+
+
+def test_landmarks_decode_relative_to_their_anchor():
+    from src.idImage.retinaface_detector.retinaface_detection import distance2kps
+
+    points = np.array([[8.0, 16.0], [24.0, 0.0]])
+    distance = np.arange(20, dtype=np.float64).reshape(2, 10)
+
+    expected = np.stack([
+        np.stack([points[:, 0] + distance[:, i], points[:, 1] + distance[:, i + 1]], axis=-1)
+        for i in range(0, 10, 2)
+    ], axis=1).reshape(2, 10)
+    np.testing.assert_array_equal(distance2kps(points, distance), expected)
+
+
+def test_image_without_faces_gives_no_detections(toy_face_model):
+    detector = RetinaFaceDetectionONNX(model_path=str(toy_face_model))
+
+    assert detector.detect_faces(draw_faces((480, 640), [])) == (None, None)
+
+
+def test_detections_land_on_the_drawn_face(toy_face_model):
+    detector = RetinaFaceDetectionONNX(model_path=str(toy_face_model))
+
+    det, kpss = detector.detect_faces(draw_faces((480, 640), [(64, 64, 192, 192)]), max_num=1)
+
+    assert det.shape == (1, 5) and kpss.shape == (1, 5, 2)
+    assert det[0, 4] > detector.det_thresh
+    assert np.all((kpss[0] >= 64) & (kpss[0] <= 192))
+
+
+def draw_face_with_peak(shape, face, peak):
+    """A dim red face with one fully red block, so a single anchor scores highest."""
+    image = draw_faces(shape, [])
+    x1, y1, x2, y2 = face
+    image[y1:y2, x1:x2] = (0, 0, 160)
+    x1, y1, x2, y2 = peak
+    image[y1:y2, x1:x2] = (0, 0, 255)
+    return image
+
+
+@pytest.mark.parametrize("image", [
+    draw_face_with_peak((480, 640), (96, 96, 224, 224), (128, 136, 136, 144)),
+    # Letterboxed at half scale, the peak lands on one stride-8 cell again
+    draw_face_with_peak((960, 1280), (192, 192, 448, 448), (256, 272, 272, 288)),
+])
+def test_primary_face_is_the_first_row_of_detect_faces(toy_face_model, image):
+    detector = RetinaFaceDetectionONNX(model_path=str(toy_face_model))
+
+    det, kpss = detector.detect_faces(image)
+    primary_det, primary_kpss = detector.detect_primary_face(image, with_landmarks=True)
+
+    assert primary_det.shape == (1, 5) and primary_kpss.shape == (1, 5, 2)
+    np.testing.assert_allclose(primary_det[0], det[0], rtol=1e-5, atol=1e-3)
+    np.testing.assert_allclose(primary_kpss[0], kpss[0], rtol=1e-5, atol=1e-3)
+
+
+def test_primary_face_decodes_landmarks_only_on_request(toy_face_model):
+    detector = RetinaFaceDetectionONNX(model_path=str(toy_face_model))
+    image = draw_face_with_peak((480, 640), (96, 96, 224, 224), (128, 136, 136, 144))
+
+    det, kpss = detector.detect_primary_face(image)
+
+    assert det is not None and kpss is None
+    assert detector.detect_primary_face(draw_faces((480, 640), []), with_landmarks=True) == (None, None)
+
+
+def test_buffers_are_kept_for_a_bounded_number_of_shapes(toy_face_model):
+    detector = RetinaFaceDetectionONNX(model_path=str(toy_face_model))
+    image = draw_faces((480, 640), [(64, 64, 192, 192)])
+    expected = detector.detect_faces(image, input_size=(640, 640))
+    canvas = detector.get_canvas((640, 640))
+
+    # Every caller-chosen canvas size is a new shape
+    for side in range(96, 96 + 32 * 2 * detector.max_buffers, 32):
+        detector.detect_faces(image, input_size=(side, side))
+
+    assert len(detector.canvas_buffers) == len(detector.blob_buffers) == detector.max_buffers
+    assert detector.get_canvas((640, 640)) is canvas
+    # Shapes past the limit still detect, on one-off buffers
+    fresh = RetinaFaceDetectionONNX(model_path=str(toy_face_model))
+    assert_same_detections([expected, fresh.detect_faces(image, input_size=(1024, 1024))],
+                           [detector.detect_faces(image, input_size=size) for size in [(640, 640), (1024, 1024)]])
@@ -0,0 +1,55 @@
+import threading
+
+from conftest import FakeClassifier, FakeFaceDetector, encode_card
+
+CARD = {'id_front_image': encode_card()}
+
+
+def test_stage_waits_only_for_its_own_components(fi, make_processor):
+    gate = threading.Event()
+    # The detector stays in its warmup, so it is not ready, until the gate opens
+    face_detector = FakeFaceDetector(lambda image, input_size: gate.wait(30) and (None, None))
+    try:
+        processor = make_processor({'KE': {'loader': {'background': True, 'wait_timeout': 0.1}}},
+                                   face_detector=face_detector)
+        for name in ['KE_id_orientation', 'KE_id_type']:
+            assert processor.component_events[name].wait(30)
+
+        assert fi.get_id_type(CARD)['id_type']['status'] == 200
+        quality = fi.get_id_quality(CARD)['id_quality']
+        assert quality['status'] == 503 and 'face_detector' in quality['message']
+        assert fi.health_check()['component_status']['face_detector'] == 'loading'
+    finally:
+        gate.set()
+
+
+def test_failed_orientation_model_leaves_other_stages_serving(fi, make_processor):
+    make_processor(classifiers={
+        'id_quality': FakeClassifier([0.0, 8.0]), 'id_type': FakeClassifier([0.0, 8.0, 0.0, 0.0]),
+    })
+
+    assert fi.get_id_quality(CARD)['id_quality']['status'] == 200
+    id_type = fi.get_id_type(CARD)['id_type']
+    assert id_type['status'] == 200 and id_type['result']['labels'] == "National ID"
+    orientation = fi.get_id_orientation(CARD)['id_orientation']
+    assert orientation['status'] == 0 and 'KE_id_orientation failed to load' in orientation['message']
+    assert fi.health_check()['component_status']['KE_id_orientation'] == 'failed'
+
+
+def test_failed_orientation_model_is_not_loaded_again_per_request(fi, make_processor, classifier_loads):
+    make_processor(classifiers={'id_type': FakeClassifier([0.0, 8.0, 0.0, 0.0])})
+    assert classifier_loads.count('id_orientation') == 1
+
+    for colour in [(235, 235, 235), (200, 200, 200)]:
+        assert fi.get_id_type({'id_front_image': encode_card(colour=colour)})['id_type']['status'] == 200
+
+    assert classifier_loads.count('id_orientation') == 1
+    assert set(fi._processor.orientation_cache.values()) == {"0"}
+
+
+def test_other_failed_components_still_fail_their_stage(fi, make_processor):
+    make_processor(face_detector=RuntimeError("detection.onnx missing"))
+
+    quality = fi.get_id_quality(CARD)['id_quality']
+    assert quality['status'] == 0 and 'face_detector failed to load' in quality['message']
+    assert fi.get_id_type(CARD)['id_type']['status'] == 200
@@ -0,0 +1,56 @@
+import pytest
+from conftest import FakeClassifier, FakeOCR, draw_text_lines, encode_card
+
+
+def ocr_switches(fi, make_processor, skip_margin, orientation):
+    """use_cls RapidOCR got for a front and back read with the given orientation classifier."""
+    ocr_engine = FakeOCR()
+    classifiers = {'id_quality': FakeClassifier([0.0, 8.0]), 'id_type': FakeClassifier([0.0, 8.0, 0.0, 0.0])}
+    if orientation is not None:
+        classifiers['id_orientation'] = orientation
+    make_processor({'KE': {'models': {'id_orientation': {'ocr_cls_skip_margin': skip_margin}}}},
+                   classifiers=classifiers, ocr_engine=ocr_engine)
+    ocr_engine.use_cls.clear()
+
+    fi.get_id_demographic_details({
+        'opco': 'KE', 'id_front_image': encode_card(), 'id_back_image': encode_card(colour=(200, 200, 200)),
+    })
+    return ocr_engine.use_cls
+
+
+@pytest.mark.parametrize("logits, use_cls", [
+    ([8.0, 0.0, 0.0, 0.0], [False, False]),
+    ([1.0, 0.8, 0.0, 0.0], [True, True]),
+])
+def test_angle_classifier_follows_the_orientation_margin(fi, make_processor, logits, use_cls):
+    assert ocr_switches(fi, make_processor, 0.9, FakeClassifier(logits)) == [use_cls]
+
+
+def test_failed_orientation_keeps_the_angle_classifier(fi, make_processor):
+    # Cards count as upright with an unknown margin
+    assert ocr_switches(fi, make_processor, 0.9, None) == [[True, True]]
+
+
+def test_without_a_threshold_the_ocr_config_decides(fi, make_processor):
+    assert ocr_switches(fi, make_processor, None, FakeClassifier([8.0, 0.0, 0.0, 0.0])) == [[None, None]]
+
+
+def test_angle_classifier_runs_only_for_flagged_images(ocr_engine, monkeypatch):
+    text_cls = ocr_engine.rapid_ocr.text_cls
+    classified = []
+
+    def spy(crops):
+        classified.append(len(crops))
+        return text_cls(crops)
+
+    monkeypatch.setattr(ocr_engine.rapid_ocr, 'text_cls', spy)
+    images = [draw_text_lines(["IDENTITY CARD"]), draw_text_lines(["SURNAME SAMPLE", "GIVEN NAMES JOHN"])]
+
+    skipped = ocr_engine.detect_batch(images, use_cls=[False, None])
+    assert classified == [2]
+    ocr_engine.detect_batch(images, use_cls=False)
+    assert classified == [2]
+
+    # Skipping cls leaves upright crops as they are
+    assert [len(crops) for crops, _ in skipped] == [1, 2]
+    assert [crop.shape for crop in skipped[0][0]] == [crop.shape for crop in ocr_engine.detect(images[0])[0]]
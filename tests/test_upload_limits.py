@@ -0,0 +1,66 @@
+import base64
+
+import cv2
+import numpy as np
+import pytest
+
+
+def encode(width, height, ext='.jpg'):
+    return cv2.imencode(ext, np.zeros((height, width, 3), dtype=np.uint8))[1].tobytes()
+
+
+def make_limited_processor(make_processor, **limits):
+    # Only the limits may shrink the decode
+    return make_processor({'runtime': {'upload_limits': {'enabled': True, **limits},
+                                       'image_decoding': {'reduced': False}}})
+
+
+def orientation_of(fi, image):
+    return fi.get_id_orientation({'id_front_image': image})['id_orientation']
+
+
+def test_pixel_limit_factor_is_the_smallest_that_fits(fi):
+    assert fi.choose_pixel_limit_factor((1000, 1000), 1_000_000) == 1
+    assert fi.choose_pixel_limit_factor((4000, 3000), 4_000_000) == 2
+    assert fi.choose_pixel_limit_factor((4000, 3000), 1_000_000) == 4
+    assert fi.choose_pixel_limit_factor((40000, 30000), 1_000_000) is None
+
+
+def test_oversized_file_is_rejected_before_it_is_decoded(fi):
+    fi.check_file_size(1024, None)
+    fi.check_file_size(1024, 1024)
+    with pytest.raises(fi.UploadRejectedError) as error:
+        fi.check_file_size(1025, 1024)
+    assert error.value.reason == 'file_size'
+
+    payload = base64.b64encode(encode(64, 48)).decode()
+    with pytest.raises(fi.UploadRejectedError):
+        fi.read_image_source(payload, max_bytes=100)
+
+
+def test_large_jpeg_is_downscaled_while_decoding(fi, make_processor):
+    processor = make_limited_processor(make_processor, max_pixels=1_000_000)
+    large = encode(2000, 1500)
+
+    assert orientation_of(fi, encode(800, 600))['status'] == 200
+    assert orientation_of(fi, large)['status'] == 200
+
+    assert processor.image_cache[fi.generate_image_hash(large)].shape == (750, 1000, 3)
+    stats = fi.health_check()['upload_stats']
+    assert stats['inspected'] == 2 and stats['downscaled'] == 1 and stats['rejected'] == {}
+
+
+@pytest.mark.parametrize("limits, image, reason", [
+    ({'max_pixels': 1_000_000}, encode(2000, 1500, '.png'), 'pixels'),
+    ({'max_pixels': 1_000_000, 'oversize_action': 'reject'}, encode(2000, 1500), 'pixels'),
+    ({'allowed_formats': ['jpeg']}, encode(64, 48, '.png'), 'format'),
+    ({}, b'\xff\xd8\xff' + b'\x00' * 32, 'malformed'),
+    ({'max_file_size_mb': 0.0001}, encode(640, 480, '.png'), 'file_size'),
+])
+def test_uploads_outside_the_limits_are_rejected(fi, make_processor, limits, image, reason):
+    make_limited_processor(make_processor, **limits)
+
+    result = orientation_of(fi, image)
+
+    assert result['status'] == 0 and result['result']['id_front_orientation'] is None
+    assert fi.health_check()['upload_stats']['rejected'] == {reason: 1}
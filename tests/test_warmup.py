@@ -0,0 +1,49 @@
+import numpy as np
+from conftest import FakeClassifier, FakeFaceDetector
+
+
+def test_warmup_image_looks_like_a_card(fi):
+    image = fi.make_warmup_image()
+
+    assert image.shape == (640, 1010, 3) and image.dtype == np.uint8
+    # Printed text and a portrait block on a light background
+    assert image.min() < 50 and np.median(image) > 200
+
+
+def test_warmup_runs_every_iteration_and_records_time(fi, make_processor):
+    orientation = FakeClassifier([8.0, 0.0, 0.0, 0.0])
+    face_detector = FakeFaceDetector()
+    make_processor({'KE': {'warmup': {'iterations': 3}}}, classifiers={
+        'id_orientation': orientation, 'id_quality': FakeClassifier([0.0, 8.0]),
+        'id_type': FakeClassifier([0.0, 8.0, 0.0, 0.0]),
+    }, face_detector=face_detector)
+
+    assert orientation.input_sizes == [480] * 3
+    assert face_detector.calls == [((640, 1010), (640, 640))] * 3
+    timings = fi.health_check()['warmup_timings']
+    assert set(timings) == {'KE_id_orientation', 'face_detector', 'KE_id_quality', 'KE_id_type', 'rapid_ocr'}
+    assert all(timing >= 0 for timing in timings.values())
+
+
+def test_failed_warmup_is_recorded_without_failing_the_component(fi, make_processor):
+    def engine_broke(image, input_size):
+        raise RuntimeError("engine broke")
+
+    make_processor(face_detector=FakeFaceDetector(engine_broke))
+
+    health = fi.health_check()
+    assert health['warmup_timings']['face_detector'] is None
+    assert health['component_status']['face_detector'] == 'ready'
+
+
+def test_disabled_warmup_skips_the_models(fi, make_processor):
+    orientation = FakeClassifier([8.0, 0.0, 0.0, 0.0])
+    make_processor({'KE': {'warmup': {'enabled': False}}}, classifiers={'id_orientation': orientation})
+
+    assert orientation.input_sizes == []
+    assert fi.health_check()['warmup_timings'] == {}
+
+
+def test_warmup_image_is_the_same_for_every_opco(fi):
+    # Nothing in the image depends on the OPCO being warmed up
+    assert np.array_equal(fi.make_warmup_image(), fi.make_warmup_image())
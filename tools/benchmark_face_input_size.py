@@ -0,0 +1,117 @@
+"""Compare RetinaFace input sizes against the 640 canvas on a local image set.
+
+Run from the repository root:
+
+    python -m tools.benchmark_face_input_size --images ./samples/KE/front --sizes 320 480
+
+Every face found at the reference size counts towards recall when a detection at
+the candidate size overlaps it with IoU >= --iou. "Primary" is the share of images
+where the best box, the one get_id_quality crops, is still found at the same place.
+Use uprighted front images of one OPCO, then set face_detector_input_size for that
+OPCO in config.yaml only where both numbers stay at the reference level.
+"""
+import argparse
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from src.idImage.retinaface_detector.retinaface_detection import RetinaFaceDetectionONNX
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp', '.tif', '.tiff')
+
+
+def box_iou(box, boxes):
+    """IoU of one [x1, y1, x2, y2] box against an (N, 4+) array of boxes."""
+    xx1 = np.maximum(box[0], boxes[:, 0])
+    yy1 = np.maximum(box[1], boxes[:, 1])
+    xx2 = np.minimum(box[2], boxes[:, 2])
+    yy2 = np.minimum(box[3], boxes[:, 3])
+    inter = np.maximum(0.0, xx2 - xx1) * np.maximum(0.0, yy2 - yy1)
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return inter / (areas + (box[2] - box[0]) * (box[3] - box[1]) - inter)
+
+
+def is_matched(box, dets, iou_thresh):
+    return dets is not None and len(dets) > 0 and bool((box_iou(box, dets) >= iou_thresh).any())
+
+
+def load_images(image_dir):
+    paths = sorted(p for p in Path(image_dir).rglob('*') if p.suffix.lower() in IMAGE_EXTENSIONS)
+    for path in paths:
+        image = cv2.imread(str(path))
+        if image is not None:
+            yield path, image
+
+
+def run_benchmark(detector, image_dir, sizes, reference_size=640, iou_thresh=0.5):
+    """Recall, primary-face agreement and latency of each size against reference_size."""
+    all_sizes = [reference_size] + [size for size in sizes if size != reference_size]
+    stats = {size: {'faces': 0, 'primary': 0, 'seconds': 0.0} for size in all_sizes}
+    images = reference_faces = reference_primaries = 0
+
+    for path, image in load_images(image_dir):
+        images += 1
+        results = {}
+        for size in all_sizes:
+            start = time.perf_counter()
+            results[size] = detector.detect_faces(image, input_size=(size, size))[0]
+            stats[size]['seconds'] += time.perf_counter() - start
+
+        reference = results[reference_size]
+        if reference is None:
+            continue
+        reference_faces += len(reference)
+        reference_primaries += 1
+        for size in all_sizes:
+            dets = results[size]
+            stats[size]['faces'] += sum(is_matched(box, dets, iou_thresh) for box in reference)
+            # detect_faces sorts by score, so row 0 is what detect_primary_face returns
+            if is_matched(reference[0], None if dets is None else dets[:1], iou_thresh):
+                stats[size]['primary'] += 1
+
+    return {
+        'images': images,
+        'reference_faces': reference_faces,
+        'sizes': {
+            size: {
+                'recall': stats[size]['faces'] / reference_faces if reference_faces else None,
+                'primary_agreement': stats[size]['primary'] / reference_primaries if reference_primaries else None,
+                'mean_ms': 1000 * stats[size]['seconds'] / images if images else None,
+                'relative_flops': (size / reference_size) ** 2,
+            }
+            for size in all_sizes
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', required=True, help='Directory of uprighted ID fronts, searched recursively')
+    parser.add_argument('--model', default='./models/idImage/retinaface_detector/detection.onnx')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[320, 480])
+    parser.add_argument('--reference-size', type=int, default=640)
+    parser.add_argument('--iou', type=float, default=0.5)
+    parser.add_argument('--threshold', type=float, default=0.5, help='Detector score threshold')
+    args = parser.parse_args()
+
+    for size in [args.reference_size] + args.sizes:
+        if size <= 0 or size % 32:
+            parser.error(f"input sizes must be positive multiples of 32, got {size}")
+
+    detector = RetinaFaceDetectionONNX(args.model)
+    detector.det_thresh = args.threshold
+    report = run_benchmark(detector, args.images, args.sizes, args.reference_size, args.iou)
+
+    print(f"{report['images']} images, {report['reference_faces']} faces at {args.reference_size}")
+    print(f"{'size':>6} {'recall':>8} {'primary':>8} {'mean ms':>9} {'FLOPs':>7}")
+    for size, row in report['sizes'].items():
+        recall = '-' if row['recall'] is None else f"{row['recall']:.3f}"
+        primary = '-' if row['primary_agreement'] is None else f"{row['primary_agreement']:.3f}"
+        mean_ms = '-' if row['mean_ms'] is None else f"{row['mean_ms']:.1f}"
+        print(f"{size:>6} {recall:>8} {primary:>8} {mean_ms:>9} {row['relative_flops']:>6.2f}x")
+
+
+if __name__ == '__main__':
+    main()